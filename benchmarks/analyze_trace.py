@@ -0,0 +1,77 @@
+"""Critical-path report for a traced research run.
+
+Reads a JSON-lines trace written by tracing.Tracer (trace_run or
+DEEP_RESEARCH_TRACE_FILE) and prints where the run's wall time went: time on
+the critical path per span kind, the spans that dominated it, and for every
+parallel fan-out (each supervisor_tools iteration) the straggler branch and
+what held it up.
+
+Usage:
+    # Trace a run, then analyze it
+    DEEP_RESEARCH_TRACE_FILE=trace.jsonl uv run python benchmarks/run_with_cassette.py replay cassettes/full_agent.jsonl
+    uv run python benchmarks/analyze_trace.py trace.jsonl
+
+    # Analyze a specific run of a file holding several, as JSON
+    uv run python benchmarks/analyze_trace.py trace.jsonl --trace-id <id> --json
+"""
+
+import argparse
+import json
+
+from deep_research_from_scratch.critical_path import (
+    analyze,
+    format_report,
+    load_trace,
+    span_label,
+)
+
+
+def report_as_json(report: dict) -> dict:
+    """Replace span records in a report with their ids and labels."""
+    def ref(span: dict) -> dict:
+        return {"span_id": span["span_id"], "label": span_label(span), "seconds": span["duration"]}
+
+    return {
+        "trace_id": report.get("trace_id"),
+        "wall_seconds": report["wall_seconds"],
+        "by_kind": report["by_kind"],
+        "critical_path": [
+            {**ref(segment["span"]), "start": segment["start"], "end": segment["end"], "seconds": segment["seconds"]}
+            for segment in report["critical_path"]
+        ],
+        "contributors": [{**ref(entry["span"]), "seconds": entry["seconds"]} for entry in report["contributors"]],
+        "edges": report["edges"],
+        "barriers": [
+            {
+                "barrier": ref(barrier["span"]),
+                "iteration": barrier["iteration"],
+                "branches": [{**ref(branch["span"]), "finished_after": branch["finished_after"]} for branch in barrier["branches"]],
+                "straggler": ref(barrier["straggler"]),
+                "straggler_lead": barrier["straggler_lead"],
+                "idle_branch_seconds": barrier["idle_branch_seconds"],
+                "median_branch_seconds": barrier["median_branch_seconds"],
+                "straggler_contributors": [
+                    {**ref(entry["span"]), "seconds": entry["seconds"]} for entry in barrier["straggler_contributors"]
+                ],
+            }
+            for barrier in report["barriers"]
+        ],
+    }
+
+def main() -> None:
+    """Analyze a trace file and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="JSON-lines trace file")
+    parser.add_argument("--trace-id", help="Run to analyze (default: the most recent run in the file)")
+    parser.add_argument("--top", type=int, default=10, help="Critical-path contributors to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = analyze(load_trace(args.trace, args.trace_id))
+    if args.json:
+        print(json.dumps(report_as_json(report), indent=2))
+    else:
+        print(format_report(report, args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark for the boilerplate stripping stage.
+
+Reports, for each page, how many bytes of raw content clean_search_results
+removes before summarization and whether the page skips summarization.
+
+Usage:
+    # Built-in sample pages (research files wrapped in typical site chrome)
+    uv run python benchmarks/bench_content_cleaning.py
+
+    # Saved Tavily responses (a JSON list of responses, or a single response)
+    uv run python benchmarks/bench_content_cleaning.py results.json [more.json ...]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from deep_research_from_scratch.content_processing import clean_search_results
+
+FILES_DIR = Path(__file__).resolve().parent.parent / "src" / "deep_research_from_scratch" / "files"
+
+SITE_HEADER = """Skip to main content
+[Home](https://example.com/) [News](https://example.com/news) [Guides](https://example.com/guides) [About](https://example.com/about) [Contact](https://example.com/contact)
+Toggle navigation
+Sign in
+We use cookies to improve your experience. Accept all | Manage preferences
+"""
+
+SITE_FOOTER = """
+Share on Twitter
+Subscribe to our newsletter
+## Related articles
+- [Best espresso machines](https://example.com/espresso)
+- [How to roast coffee at home](https://example.com/roast)
+- [Coffee origins explained](https://example.com/origins)
+
+[Home](https://example.com/) [News](https://example.com/news) [Guides](https://example.com/guides) [About](https://example.com/about) [Contact](https://example.com/contact)
+Privacy Policy | Terms of Use | Cookie settings
+© 2025 Example Media. All rights reserved.
+Back to top
+"""
+
+def sample_results() -> dict:
+    """Build sample search results from the bundled research files wrapped in site chrome."""
+    results = {}
+    for path in sorted(FILES_DIR.glob("*.md")):
+        url = f"https://example.com/{path.stem}"
+        results[url] = {
+            "url": url,
+            "title": path.stem,
+            "content": "",
+            "raw_content": SITE_HEADER + path.read_text() + SITE_FOOTER,
+        }
+    # A page that is nothing but chrome, which should skip summarization
+    results["https://example.com/empty"] = {
+        "url": "https://example.com/empty",
+        "title": "empty",
+        "content": "",
+        "raw_content": SITE_HEADER + "Please enable JavaScript to view this page." + SITE_FOOTER,
+    }
+    return results
+
+def load_results(paths: list[str]) -> dict:
+    """Load search results from saved Tavily responses, keyed by URL."""
+    results = {}
+    for path in paths:
+        data = json.loads(Path(path).read_text())
+        responses = data if isinstance(data, list) else [data]
+        for response in responses:
+            for result in response.get("results", []):
+                if result.get("raw_content"):
+                    results.setdefault(result["url"], result)
+    return results
+
+def main() -> None:
+    """Run the benchmark and print a per-page report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", help="JSON files with saved Tavily responses")
+    args = parser.parse_args()
+
+    results = load_results(args.inputs) if args.inputs else sample_results()
+
+    start = time.perf_counter()
+    cleaned = clean_search_results(results)
+    elapsed = time.perf_counter() - start
+
+    total_before = total_after = 0
+    print(f"{'bytes before':>12} {'bytes after':>12} {'removed':>8}  url")
+    for url, result in results.items():
+        before = len(result["raw_content"].encode("utf-8"))
+        raw_after = cleaned[url].get("raw_content")
+        after = len(raw_after.encode("utf-8")) if raw_after else 0
+        total_before += before
+        total_after += after
+        note = "  (skips summarization)" if raw_after is None else ""
+        print(f"{before:>12} {after:>12} {1 - after / before:>8.1%}  {url}{note}")
+
+    if total_before:
+        print(f"\nTotal: {total_before} -> {total_after} bytes ({1 - total_after / total_before:.1%} removed) "
+              f"across {len(results)} pages in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""End-to-end benchmark for every graph registered in langgraph.json.
+
+Runs each graph against the offline stand-ins (fake search, chat models and
+MCP server, with injected latency) and reports wall time, per-node latency,
+LLM call counts, tokens (including prompt-cache reads and writes), search
+calls and peak RSS. Each graph runs in its
+own subprocess so peak RSS, caches and the model registry are isolated.
+
+Results are written as JSON so runs can be compared across commits; with
+--baseline, metrics that grew beyond the thresholds are flagged and the
+script exits with status 1.
+
+Usage:
+    uv run python benchmarks/bench_graphs.py --output results.json
+    uv run python benchmarks/bench_graphs.py --graph research_agent --repeat 5
+    uv run python benchmarks/bench_graphs.py --output new.json --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_QUERY = "Compare the coffee quality of the best specialty coffee shops in San Francisco."
+
+# Metrics checked against the baseline: (name, getter, threshold argument)
+REGRESSION_METRICS = [
+    ("wall_seconds", lambda result: result["wall_seconds"], "time_threshold"),
+    ("llm_calls", lambda result: result["llm_calls"]["total"], "threshold"),
+    ("total_tokens", lambda result: result["tokens"]["total"], "threshold"),
+    ("search_calls", lambda result: result["search_calls"], "threshold"),
+    ("peak_rss_mb", lambda result: result["peak_rss_mb"], "threshold"),
+]
+
+def registered_graphs() -> dict:
+    """Read the graphs registered in langgraph.json as {graph id: (module path, attribute)}."""
+    config = json.loads((ROOT / "langgraph.json").read_text())
+    graphs = {}
+    for graph_id, spec in config["graphs"].items():
+        path, attribute = spec.rsplit(":", 1)
+        graphs[graph_id] = (path, attribute)
+    return graphs
+
+def graph_input(attribute: str, query: str) -> dict:
+    """Build the input state for a graph."""
+    from langchain_core.messages import HumanMessage
+
+    message = HumanMessage(content=query)
+    if attribute in ("researcher_agent", "agent_mcp"):
+        return {"researcher_messages": [message]}
+    if attribute == "supervisor_agent":
+        return {"supervisor_messages": [message], "research_brief": query}
+    return {"messages": [message]}
+
+# ===== MEASUREMENT (child process) =====
+
+def make_collector():
+    """Create a callback handler collecting node spans and LLM usage."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class Collector(BaseCallbackHandler):
+        """Collects per-node latencies and LLM calls and tokens from callbacks."""
+
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.started: dict = {}
+            self.nodes = defaultdict(list)
+            self.llm_calls = defaultdict(int)
+            self.tokens = {"input": 0, "output": 0, "total": 0, "cache_read": 0, "cache_creation": 0}
+
+        def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, name=None, **kwargs):
+            metadata = metadata or {}
+            node = metadata.get("langgraph_node")
+            if node and name == node:
+                # Prefix nested graph nodes with their parents, e.g. supervisor_tools/llm_call;
+                # parallel subgraph runs (numbered namespace segments) are aggregated
+                namespace = metadata.get("langgraph_checkpoint_ns", "")
+                parts = [part.split(":")[0] for part in namespace.split("|") if part]
+                label = "/".join(part for part in parts if not part.isdigit()) or node
+                with self.lock:
+                    self.started[run_id] = (label, time.perf_counter())
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            with self.lock:
+                span = self.started.pop(run_id, None)
+                if span:
+                    self.nodes[span[0]].append(time.perf_counter() - span[1])
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self.on_chain_end(None, run_id=run_id)
+
+        def on_chat_model_start(self, serialized, messages, *, metadata=None, **kwargs):
+            model = (metadata or {}).get("ls_model_name") or "unknown"
+            with self.lock:
+                self.llm_calls[model] += 1
+
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    details = usage.get("input_token_details") or {}
+                    with self.lock:
+                        self.tokens["input"] += usage.get("input_tokens", 0)
+                        self.tokens["output"] += usage.get("output_tokens", 0)
+                        self.tokens["total"] += usage.get("total_tokens", 0)
+                        self.tokens["cache_read"] += details.get("cache_read", 0)
+                        self.tokens["cache_creation"] += details.get("cache_creation", 0)
+
+    return Collector()
+
+def run_graph(args: argparse.Namespace) -> dict:
+    """Run one graph once against the offline stand-ins and measure it."""
+    import importlib
+
+    from deep_research_from_scratch.offline import install_offline_stand_ins
+    from deep_research_from_scratch.scheduler import get_scheduler
+
+    install_offline_stand_ins(
+        model_options={"latency_median": args.model_latency, "latency_sigma": args.latency_sigma, "seed": args.seed},
+        search_options={"latency_median": args.search_latency, "latency_sigma": args.latency_sigma, "seed": args.seed},
+    )
+
+    path, attribute = registered_graphs()[args.child]
+    graph = getattr(importlib.import_module(f"deep_research_from_scratch.{Path(path).stem}"), attribute)
+
+    collector = make_collector()
+    start = time.perf_counter()
+    asyncio.run(graph.ainvoke(
+        graph_input(attribute, args.query),
+        config={"callbacks": [collector], "configurable": {"thread_id": "bench"}, "recursion_limit": 100},
+    ))
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "graph": attribute,
+        "wall_seconds": wall_seconds,
+        "nodes": {
+            label: {
+                "calls": len(durations),
+                "total_seconds": sum(durations),
+                "mean_seconds": statistics.mean(durations),
+                "max_seconds": max(durations),
+            }
+            for label, durations in sorted(collector.nodes.items())
+        },
+        "llm_calls": {"total": sum(collector.llm_calls.values()), "by_model": dict(collector.llm_calls)},
+        "tokens": collector.tokens,
+        "search_calls": get_scheduler("tavily").stats()["admitted"],
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }
+
+# ===== ORCHESTRATION (parent process) =====
+
+def run_in_subprocess(graph_id: str, args: argparse.Namespace) -> dict:
+    """Run one graph in a fresh interpreter with empty caches and return its measurements."""
+    command = [
+        sys.executable, __file__, "--child", graph_id, "--query", args.query,
+        "--model-latency", str(args.model_latency), "--search-latency", str(args.search_latency),
+        "--latency-sigma", str(args.latency_sigma), "--seed", str(args.seed),
+    ]
+    with tempfile.TemporaryDirectory(prefix="deep_research_bench_") as cache_dir:
+        env = {**os.environ, "DEEP_RESEARCH_CACHE_DIR": cache_dir}
+        for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "TAVILY_API_KEY", "LANGSMITH_TRACING"):
+            env.pop(name, None)
+        completed = subprocess.run(command, env=env, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{graph_id} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def summarize_runs(runs: list[dict]) -> dict:
+    """Combine repeated runs, keeping the run with the median wall time and all wall times."""
+    runs = sorted(runs, key=lambda run: run["wall_seconds"])
+    median = dict(runs[len(runs) // 2])
+    median["wall_seconds_runs"] = [run["wall_seconds"] for run in runs]
+    median["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    return median
+
+def git_commit() -> str:
+    """Return the current commit hash, or "unknown" outside a git checkout."""
+    completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return completed.stdout.strip() or "unknown"
+
+def check_regressions(results: dict, baseline: dict, args: argparse.Namespace) -> list[str]:
+    """List metrics that grew beyond their threshold relative to the baseline."""
+    regressions = []
+    for graph_id, result in results["graphs"].items():
+        previous = baseline.get("graphs", {}).get(graph_id)
+        if previous is None:
+            continue
+        for metric, get, threshold_name in REGRESSION_METRICS:
+            old, new = get(previous), get(result)
+            threshold = getattr(args, threshold_name)
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(f"{graph_id}: {metric} {old:.3f} -> {new:.3f} (+{new / old - 1:.1%}, threshold {threshold:.0%})")
+    return regressions
+
+def print_report(results: dict) -> None:
+    """Print a per-graph summary with per-node latencies."""
+    for graph_id, result in results["graphs"].items():
+        print(f"\n{graph_id} ({result['graph']}): {result['wall_seconds']:.2f}s wall, "
+              f"{result['llm_calls']['total']} LLM calls, {result['tokens']['total']} tokens "
+              f"({result['tokens'].get('cache_read', 0)} cache read, {result['tokens'].get('cache_creation', 0)} cache write), "
+              f"{result['search_calls']} searches, {result['peak_rss_mb']:.0f} MB peak RSS")
+        for label, node in result["nodes"].items():
+            print(f"  {label:<40} {node['calls']:>4} calls {node['total_seconds']:>8.3f}s total {node['max_seconds']:>8.3f}s max")
+
+def main() -> None:
+    """Run the benchmark for the selected graphs."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graph", action="append", help="Graph id from langgraph.json (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per graph (the median run is reported)")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Research request given to every graph")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Median fake model latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Median fake search latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Spread of the lognormal latency distribution")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency distributions")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative growth of counts, tokens and RSS")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="Allowed relative growth of wall time")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_graph(args)))
+        return
+
+    graph_ids = args.graph or list(registered_graphs())
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "query": args.query, "repeat": args.repeat, "model_latency": args.model_latency,
+            "search_latency": args.search_latency, "latency_sigma": args.latency_sigma, "seed": args.seed,
+        },
+        "graphs": {
+            graph_id: summarize_runs([run_in_subprocess(graph_id, args) for _ in range(args.repeat)])
+            for graph_id in graph_ids
+        },
+    }
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = check_regressions(results, json.loads(Path(args.baseline).read_text()), args)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark for import time of the package modules.
+
+Imports each module in a fresh interpreter several times and reports the
+median wall-clock import time, and whether the import succeeds without any
+API keys set (models and clients should only be built on first use).
+
+Usage:
+    uv run python benchmarks/bench_import_time.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "deep_research_from_scratch.utils",
+    "deep_research_from_scratch.research_agent",
+    "deep_research_from_scratch.research_agent_scope",
+    "deep_research_from_scratch.multi_agent_supervisor",
+    "deep_research_from_scratch.research_agent_full",
+    "deep_research_from_scratch.research_agent_mcp",
+]
+
+API_KEYS = ["OPENAI_API_KEY", "ANTHROPIC_API_KEY", "TAVILY_API_KEY"]
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+def time_import(module: str, env: dict) -> float:
+    """Import a module in a fresh interpreter and return the import time in ms.
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return float(completed.stdout.strip())
+
+def main() -> None:
+    """Run the benchmark and print a per-module report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-interpreter imports per module")
+    args = parser.parse_args()
+
+    env_without_keys = {name: value for name, value in os.environ.items() if name not in API_KEYS}
+
+    print(f"{'median ms':>10} {'min ms':>8}  {'no API keys':<12} module")
+    for module in MODULES:
+        try:
+            timings = [time_import(module, env_without_keys) for _ in range(args.repeat)]
+            print(f"{statistics.median(timings):>10.0f} {min(timings):>8.0f}  {'ok':<12} {module}")
+        except RuntimeError as e:
+            print(f"{'-':>10} {'-':>8}  {'FAILED':<12} {module}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark for concurrent researcher throughput with async-native nodes.
+
+Runs N researcher graphs at once (as supervisor_tools does) against the
+offline stand-ins and reports wall time and researchers per minute for three
+node styles:
+
+- async:         the current nodes, awaiting model calls with ainvoke
+- threaded:      synchronous nodes calling invoke, which LangGraph runs in its
+                 default thread pool (the researcher and scope nodes before
+                 they were made async)
+- loop-blocking: async nodes calling the synchronous invoke, which stalls the
+                 event loop for the whole call (research_agent_mcp.llm_call
+                 before it was made async)
+
+Every researcher gets its own topic, so searches and summaries never hit the
+caches, and the provider schedulers' limits are lifted so only the node style
+bounds concurrency. Unless DEEP_RESEARCH_CACHE_DIR is set, the offline
+stand-ins keep the caches in a temporary directory removed at exit.
+
+Usage:
+    uv run python benchmarks/bench_researcher_throughput.py
+    uv run python benchmarks/bench_researcher_throughput.py --concurrency 1 8 32 --model-latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage, filter_messages
+from langgraph.graph import END, START, StateGraph
+
+from deep_research_from_scratch import research_agent, scheduler
+from deep_research_from_scratch.models import get_chat_model, get_model_with_tools
+from deep_research_from_scratch.offline import install_offline_stand_ins
+from deep_research_from_scratch.prompts import (
+    compress_research_human_message,
+    compress_research_system_prompt,
+    research_agent_prompt,
+)
+from deep_research_from_scratch.state_research import (
+    ResearcherOutputState,
+    ResearcherState,
+)
+from deep_research_from_scratch.utils import get_today_str
+
+# ===== NODE STYLES =====
+
+def threaded_llm_call(state: ResearcherState):
+    """Call the model synchronously; LangGraph runs this node in a worker thread."""
+    model_with_tools = get_model_with_tools(research_agent.tools, priority="critical", **research_agent.research_model_config)
+    return {"researcher_messages": [
+        model_with_tools.invoke([SystemMessage(content=research_agent_prompt)] + state["researcher_messages"])
+    ]}
+
+def threaded_compress_research(state: ResearcherState) -> dict:
+    """Compress the research synchronously; LangGraph runs this node in a worker thread."""
+    messages = (
+        [SystemMessage(content=compress_research_system_prompt.format(date=get_today_str()))]
+        + state.get("researcher_messages", [])
+        + [HumanMessage(content=compress_research_human_message)]
+    )
+    response = get_chat_model(priority="bulk", **research_agent.compress_model_config).invoke(messages)
+    raw_notes = [str(m.content) for m in filter_messages(state["researcher_messages"], include_types=["tool", "ai"])]
+    return {"compressed_research": str(response.content), "raw_notes": ["\n".join(raw_notes)]}
+
+async def loop_blocking_llm_call(state: ResearcherState):
+    """Async llm_call that calls the synchronous invoke, blocking the event loop."""
+    return threaded_llm_call(state)
+
+async def loop_blocking_compress_research(state: ResearcherState) -> dict:
+    """Async compress_research that calls the synchronous invoke, blocking the event loop."""
+    return threaded_compress_research(state)
+
+def build_researcher(llm_call, compress_research):
+    """Build the researcher graph of research_agent with the given model nodes."""
+    builder = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
+    builder.add_node("llm_call", llm_call)
+    builder.add_node("tool_node", research_agent.tool_node)
+    builder.add_node("compress_research", compress_research)
+    builder.add_edge(START, "llm_call")
+    builder.add_conditional_edges(
+        "llm_call",
+        research_agent.should_continue,
+        {"tool_node": "tool_node", "compress_research": "compress_research"},
+    )
+    builder.add_conditional_edges(
+        "tool_node",
+        research_agent.should_resume,
+        {"llm_call": "llm_call", "compress_research": "compress_research"},
+    )
+    builder.add_edge("compress_research", END)
+    return builder.compile()
+
+NODE_STYLES = {
+    "async": lambda: research_agent.researcher_agent,
+    "threaded": lambda: build_researcher(threaded_llm_call, threaded_compress_research),
+    "loop-blocking": lambda: build_researcher(loop_blocking_llm_call, loop_blocking_compress_research),
+}
+
+# ===== MEASUREMENT =====
+
+async def run_researchers(graph, style: str, concurrency: int) -> float:
+    """Run concurrent researchers on distinct topics and return the wall time."""
+    async def research(i: int) -> None:
+        topic = f"Specialty coffee in San Francisco, {style} researcher {concurrency}-{i}"
+        await graph.ainvoke(
+            {"researcher_messages": [HumanMessage(content=topic)], "research_topic": topic},
+            config={"configurable": {"thread_id": f"{style}-{concurrency}-{i}"}, "recursion_limit": 50},
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(research(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+def main() -> None:
+    """Run every node style at every concurrency level and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32], help="Researchers run at once")
+    parser.add_argument("--style", choices=list(NODE_STYLES), action="append", help="Node styles to run (default: all)")
+    parser.add_argument("--model-latency", type=float, default=0.1, help="Median fake model latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="Median fake search latency in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency distributions")
+    args = parser.parse_args()
+
+    install_offline_stand_ins(
+        model_options={"latency_median": args.model_latency, "latency_sigma": 0.1, "seed": args.seed},
+        search_options={"latency_median": args.search_latency, "latency_sigma": 0.1, "seed": args.seed},
+    )
+    # Lift provider limits so only the node style bounds concurrency
+    for limits in scheduler.rate_limits.values():
+        limits.update(requests_per_minute=None, tokens_per_minute=None, max_concurrent_requests=None)
+
+    print(f"{'style':<14} {'researchers':>11} {'wall':>8} {'researchers/min':>16} {'speedup':>8}")
+    for style in args.style or list(NODE_STYLES):
+        graph = NODE_STYLES[style]()
+        for concurrency in args.concurrency:
+            wall = asyncio.run(run_researchers(graph, style, concurrency))
+            if concurrency == args.concurrency[0]:
+                baseline = wall / concurrency
+            print(f"{style:<14} {concurrency:>11} {wall:>7.2f}s {concurrency / wall * 60:>16.1f} "
+                  f"{baseline * concurrency / wall:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
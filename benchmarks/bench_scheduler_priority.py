@@ -0,0 +1,68 @@
+"""Benchmark for priority dispatch in the request scheduler.
+
+Simulates one provider under contention: a burst of bulk requests (page
+summarizations) competes for a limited number of concurrent slots with a
+chain of sequential critical-path requests (supervisor / researcher turns).
+Reports the critical chain's latency and the bulk makespan with priority
+classes enabled and with every request treated alike.
+
+Usage:
+    uv run python benchmarks/bench_scheduler_priority.py
+    uv run python benchmarks/bench_scheduler_priority.py --bulk 200 --critical 10 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+from deep_research_from_scratch.scheduler import ProviderScheduler
+
+
+async def fake_request(latency: float) -> None:
+    """Stand-in for a model call."""
+    await asyncio.sleep(latency)
+
+async def simulate(args: argparse.Namespace, use_priorities: bool) -> dict:
+    """Run one contention scenario and return its latencies in seconds."""
+    scheduler = ProviderScheduler("simulated", max_concurrent_requests=args.concurrency)
+    critical = "critical" if use_priorities else "normal"
+    bulk = "bulk" if use_priorities else "normal"
+    start = time.perf_counter()
+
+    async def bulk_request() -> None:
+        await scheduler.arun(lambda: fake_request(args.latency), priority=bulk)
+
+    async def critical_chain() -> float:
+        # Each turn depends on the previous one, like a researcher's llm_call loop
+        for _ in range(args.critical):
+            await scheduler.arun(lambda: fake_request(args.latency), priority=critical)
+        return time.perf_counter() - start
+
+    bulk_tasks = [asyncio.create_task(bulk_request()) for _ in range(args.bulk)]
+    await asyncio.sleep(0)
+    critical_latency = await critical_chain()
+    await asyncio.gather(*bulk_tasks)
+
+    return {
+        "critical_chain_seconds": critical_latency,
+        "total_seconds": time.perf_counter() - start,
+        "max_queue_depth": scheduler.stats()["max_queue_depth"],
+    }
+
+def main() -> None:
+    """Run both scenarios and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bulk", type=int, default=100, help="Number of bulk requests")
+    parser.add_argument("--critical", type=int, default=5, help="Length of the critical request chain")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent request slots")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated request")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12} {'critical chain':>15} {'total':>8} {'max queue':>10}")
+    for name, use_priorities in (("fifo", False), ("priority", True)):
+        result = asyncio.run(simulate(args, use_priorities))
+        print(f"{name:<12} {result['critical_chain_seconds']:>14.2f}s {result['total_seconds']:>7.2f}s "
+              f"{result['max_queue_depth']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Record or replay a run of the full research agent with a cassette.
+
+Recording needs API keys and sends real requests; replay needs neither and
+serves the recorded responses, optionally with their recorded latencies.
+Caches are pointed at a fresh temporary directory, so every request of the
+run reaches the cassette, and researchers run one after another, so requests
+are sent in the same order when recording and replaying (see
+deep_research_from_scratch.cassette). Pass --concurrent-researchers to replay
+with concurrent researchers; requests whose content depends on their
+completion order may then miss.
+
+Usage:
+    # Record a real run
+    uv run python benchmarks/run_with_cassette.py record cassettes/full_agent.jsonl
+
+    # Replay it instantly, or with the recorded latencies
+    uv run python benchmarks/run_with_cassette.py replay cassettes/full_agent.jsonl
+    uv run python benchmarks/run_with_cassette.py replay cassettes/full_agent.jsonl --latency
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DEFAULT_QUERY = "Compare the coffee quality of the best specialty coffee shops in San Francisco."
+
+def main() -> None:
+    """Run the full agent under a cassette and print timing and cassette statistics."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay", "auto"])
+    parser.add_argument("cassette", help="Cassette file (JSON lines)")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Research request for the agent")
+    parser.add_argument("--latency", action="store_true", help="Replay the recorded latencies")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to replayed latencies")
+    parser.add_argument("--concurrent-researchers", action="store_true", help="Run researchers concurrently")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="deep_research_cassette_") as cache_dir:
+        # Set before the package is imported, so the caches start empty
+        os.environ["DEEP_RESEARCH_CACHE_DIR"] = cache_dir
+
+        from langchain_core.messages import HumanMessage
+
+        from deep_research_from_scratch import multi_agent_supervisor
+        from deep_research_from_scratch.cassette import use_cassette
+        from deep_research_from_scratch.research_agent_full import agent
+
+        multi_agent_supervisor.serialize_researchers = not args.concurrent_researchers
+
+        with use_cassette(
+            args.cassette, args.mode, replay_latency=args.latency, latency_scale=args.latency_scale
+        ) as cassette:
+            start = time.perf_counter()
+            result = asyncio.run(agent.ainvoke(
+                {"messages": [HumanMessage(content=args.query)]},
+                config={"configurable": {"thread_id": "cassette"}, "recursion_limit": 50},
+            ))
+            elapsed = time.perf_counter() - start
+
+    print(result.get("final_report", "")[:1000])
+    print(f"\n{args.mode}: {elapsed:.2f}s, {cassette.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,16 @@
-"""Deep Research From Scratch - Tutorial implementation."""
\ No newline at end of file
+"""Deep Research From Scratch - Tutorial implementation."""
+
+import os
+
+# Run every graph against the offline stand-ins (no API keys or network needed)
+if os.getenv("DEEP_RESEARCH_OFFLINE"):
+    from deep_research_from_scratch.offline import install_offline_stand_ins
+
+    install_offline_stand_ins()
+
+# Trace every run to a JSON-lines file, and serve Prometheus metrics
+if os.getenv("DEEP_RESEARCH_TRACE_FILE") or os.getenv("DEEP_RESEARCH_METRICS_PORT"):
+    from deep_research_from_scratch import tracing
+
+    if tracing.metrics_port:
+        tracing.start_metrics_server()
@@ -0,0 +1,463 @@
+"""Persistent Caches for Search Results and Webpage Summaries.
+
+This module provides the caches placed in front of the two most repeated
+external calls in the research pipeline:
+
+- SearchCache: an on-disk SQLite cache of Tavily responses. Identical searches
+  recur both within a run (the supervisor re-delegates similar topics) and
+  across runs (users re-ask questions). Entries are keyed by the normalized
+  query plus search parameters, expire after a topic-aware TTL, and the store
+  is capped in size with LRU eviction.
+- SummaryCache: a content-addressed cache of webpage summaries, keyed by a hash
+  of the raw content, the summarization prompt and the model name. A bounded
+  in-memory LRU tier sits in front of a bounded SQLite tier, so a page that
+  was already summarized is returned without an LLM call.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from typing_extensions import Optional
+
+# ===== CONFIGURATION =====
+
+# Directory holding the on-disk caches (override with DEEP_RESEARCH_CACHE_DIR)
+cache_dir = Path(
+    os.environ.get("DEEP_RESEARCH_CACHE_DIR", Path.home() / ".cache" / "deep_research_from_scratch")
+)
+
+# Time-to-live for cached searches, per Tavily topic (seconds)
+search_cache_ttl = {
+    "news": 60 * 60,  # News goes stale quickly
+    "finance": 6 * 60 * 60,
+    "general": 7 * 24 * 60 * 60,
+}
+
+# Maximum number of cached searches kept on disk before LRU eviction
+search_cache_max_entries = 5000
+
+# Maximum number of summaries kept in the in-memory tier before LRU eviction
+summary_cache_max_memory_entries = 1024
+
+# Maximum number of summaries kept in the on-disk tier before LRU eviction
+summary_cache_max_disk_entries = 20000
+
+# ===== UTILITY FUNCTIONS =====
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache key.
+
+    Args:
+        query: Raw search query
+
+    Returns:
+        Lower-cased query with surrounding and repeated whitespace collapsed
+    """
+    return " ".join(query.lower().split())
+
+def search_cache_key(query: str, max_results: int, topic: str, include_raw_content: bool) -> str:
+    """Build the cache key for a single Tavily search.
+
+    Args:
+        query: Search query (normalized before hashing)
+        max_results: Maximum number of results requested
+        topic: Topic filter for the search
+        include_raw_content: Whether raw webpage content was requested
+
+    Returns:
+        Hex digest identifying the search
+    """
+    payload = json.dumps(
+        [normalize_query(query), max_results, topic, include_raw_content],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def summary_cache_key(webpage_content: str, prompt: str, model_name: str) -> str:
+    """Build the content-addressed key for a webpage summary.
+
+    The full prompt template is hashed rather than a hand-maintained version
+    number, so any edit to the summarization prompt invalidates old entries.
+
+    Args:
+        webpage_content: Raw content that is being summarized
+        prompt: Summarization prompt template
+        model_name: Identifier of the summarization model
+
+    Returns:
+        Hex digest identifying the summary
+    """
+    digest = hashlib.sha256()
+    for part in (model_name, prompt, webpage_content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+# ===== SEARCH CACHE =====
+
+class SearchCache:
+    """SQLite-backed cache of Tavily search responses with TTL and LRU eviction.
+
+    The cache is safe to share between threads and keeps hit/miss counters for
+    the lifetime of the process, along with an estimate of the search latency
+    saved by each hit. Lookups only read: the access times that drive LRU
+    eviction are kept in memory and written with the next put. Async callers
+    use aget/aput, which run the SQLite work in a worker thread.
+    """
+
+    def __init__(self, path: Path, max_entries: int = search_cache_max_entries):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite database file
+            max_entries: Maximum number of entries kept before LRU eviction
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                response TEXT NOT NULL,
+                latency REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_last_accessed ON search_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, query: str, max_results: int, topic: str, include_raw_content: bool) -> Optional[dict]:
+        """Look up a cached search response.
+
+        Args:
+            query: Search query
+            max_results: Maximum number of results requested
+            topic: Topic filter for the search
+            include_raw_content: Whether raw webpage content was requested
+
+        Returns:
+            The cached Tavily response, or None on a miss or expired entry
+        """
+        key = search_cache_key(query, max_results, topic, include_raw_content)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            # Expired entries are left for the next put to delete
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return None
+
+            self._accessed[key] = now
+            self.hits += 1
+            self.saved_seconds += row[1]
+
+        return json.loads(row[0])
+
+    async def aget(self, query: str, max_results: int, topic: str, include_raw_content: bool) -> Optional[dict]:
+        """Look up a cached search response without blocking the event loop (see get)."""
+        return await asyncio.to_thread(self.get, query, max_results, topic, include_raw_content)
+
+    def put(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+        response: dict,
+        latency: float = 0.0,
+    ) -> None:
+        """Store a search response and evict the least recently used entries if over capacity.
+
+        Args:
+            query: Search query
+            max_results: Maximum number of results requested
+            topic: Topic filter for the search
+            include_raw_content: Whether raw webpage content was requested
+            response: Tavily response to cache
+            latency: Seconds the live search took, credited back on each hit
+        """
+        key = search_cache_key(query, max_results, topic, include_raw_content)
+        now = time.time()
+        ttl = search_cache_ttl.get(topic, search_cache_ttl["general"])
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_query(query), topic, json.dumps(response), latency, now + ttl, now),
+            )
+            # Write the access times recorded by lookups since the last put
+            self._conn.executemany(
+                "UPDATE search_cache SET last_accessed = ? WHERE key = ?",
+                [(accessed, accessed_key) for accessed_key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+            # Drop expired entries first, then the least recently used ones over the cap
+            self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN "
+                    "(SELECT key FROM search_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    async def aput(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+        response: dict,
+        latency: float = 0.0,
+    ) -> None:
+        """Store a search response without blocking the event loop (see put)."""
+        await asyncio.to_thread(self.put, query, max_results, topic, include_raw_content, response, latency)
+
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+            self._accessed.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.saved_seconds = 0.0
+
+    def stats(self) -> dict:
+        """Report cache effectiveness since the process started.
+
+        Returns:
+            Dictionary with hit/miss/eviction counts, hit rate, number of stored
+            entries and the estimated search latency saved
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+# ===== SUMMARY CACHE =====
+
+class SummaryCache:
+    """Two-tier content-addressed cache of webpage summaries.
+
+    Lookups check a bounded in-memory LRU first and fall back to a bounded
+    SQLite store, promoting disk hits into memory. Values are the structured
+    summary fields, so callers can format them however they need. As in
+    SearchCache, disk hits record their access time in memory for the next put
+    to write, and async callers use aget/aput.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_memory_entries: int = summary_cache_max_memory_entries,
+        max_disk_entries: int = summary_cache_max_disk_entries,
+    ):
+        """Open (or create) the on-disk tier and an empty memory tier.
+
+        Args:
+            path: Location of the SQLite database file
+            max_memory_entries: Maximum number of summaries held in memory
+            max_disk_entries: Maximum number of summaries held on disk
+        """
+        self.path = Path(path)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS summary_cache_last_accessed ON summary_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    def _remember(self, key: str, summary: dict) -> None:
+        """Insert into the memory tier, evicting the least recently used entry if full."""
+        self._memory[key] = summary
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str) -> Optional[dict]:
+        """Look up the memory tier; the caller holds the lock."""
+        summary = self._memory.get(key)
+        if summary is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        return summary
+
+    def get(self, key: str) -> Optional[dict]:
+        """Look up a cached summary.
+
+        Args:
+            key: Key built with summary_cache_key
+
+        Returns:
+            Dictionary with "summary" and "key_excerpts", or None on a miss
+        """
+        with self._lock:
+            summary = self._memory_get(key)
+            if summary is not None:
+                return summary
+
+            row = self._conn.execute(
+                "SELECT summary FROM summary_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._accessed[key] = time.time()
+            summary = json.loads(row[0])
+            self._remember(key, summary)
+            self.disk_hits += 1
+            return summary
+
+    async def aget(self, key: str) -> Optional[dict]:
+        """Look up a cached summary without blocking the event loop (see get).
+
+        Memory hits are answered directly; only the disk tier is read in a worker thread.
+        """
+        with self._lock:
+            summary = self._memory_get(key)
+        if summary is not None:
+            return summary
+        return await asyncio.to_thread(self.get, key)
+
+    def put(self, key: str, summary: dict) -> None:
+        """Store a summary in both tiers.
+
+        Args:
+            key: Key built with summary_cache_key
+            summary: Dictionary with "summary" and "key_excerpts"
+        """
+        with self._lock:
+            self._remember(key, summary)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_cache VALUES (?, ?, ?)",
+                (key, json.dumps(summary), time.time()),
+            )
+            # Write the access times recorded by lookups since the last put
+            self._conn.executemany(
+                "UPDATE summary_cache SET last_accessed = ? WHERE key = ?",
+                [(accessed, accessed_key) for accessed_key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()
+            overflow = count - self.max_disk_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM summary_cache WHERE key IN "
+                    "(SELECT key FROM summary_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    async def aput(self, key: str, summary: dict) -> None:
+        """Store a summary without blocking the event loop (see put)."""
+        await asyncio.to_thread(self.put, key, summary)
+
+    def clear(self) -> None:
+        """Remove every cached summary from both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM summary_cache")
+            self._conn.commit()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Report cache effectiveness since the process started.
+
+        Returns:
+            Dictionary with per-tier hit counts, misses, hit rate and tier sizes
+        """
+        with self._lock:
+            (disk_entries,) = self._conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()
+            memory_entries = len(self._memory)
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+        }
+
+# ===== CACHE ACCESS =====
+
+# Global cache instances - will be initialized lazily
+_search_cache = None
+_summary_cache = None
+_caches_lock = threading.Lock()
+
+def get_search_cache() -> SearchCache:
+    """Get or initialize the process-wide search cache lazily."""
+    global _search_cache
+    if _search_cache is None:
+        with _caches_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache(cache_dir / "search_cache.sqlite")
+    return _search_cache
+
+def get_summary_cache() -> SummaryCache:
+    """Get or initialize the process-wide webpage summary cache lazily."""
+    global _summary_cache
+    if _summary_cache is None:
+        with _caches_lock:
+            if _summary_cache is None:
+                _summary_cache = SummaryCache(cache_dir / "summary_cache.sqlite")
+    return _summary_cache
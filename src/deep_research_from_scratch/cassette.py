@@ -0,0 +1,285 @@
+"""Record/Replay Cassettes for Model and Search Calls.
+
+A cassette captures every HTTP request the model clients and the Tavily
+client send through the shared transport (see http_transport), together with
+the response and its latency, in a JSON-lines file. Replaying the cassette
+serves the recorded responses back without network access or API keys, so a
+real run of research_agent_full.agent can be repeated deterministically for
+regression tests and performance comparisons.
+
+Requests are keyed by their normalized content: method, host, path and JSON
+body, with values that change between runs (today's date in the prompts,
+source ids and citation numbers, API keys) masked. Identical requests recorded
+several times are replayed in recording order. Replay can also wait for the
+recorded latency of each response, so wall-clock benchmarks stay realistic.
+
+Caches answer some requests before they reach the network, so record with a
+fresh DEEP_RESEARCH_CACHE_DIR to capture every call.
+
+Concurrent researchers still make some requests depend on the order in which
+they finish: which short pages share a packed summarization request depends on
+what other researchers have already summarized or are summarizing. Record and
+replay with multi_agent_supervisor.serialize_researchers set, as
+benchmarks/run_with_cassette.py does, so those requests match.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+from typing_extensions import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    Literal,
+    Optional,
+    Union,
+)
+
+from deep_research_from_scratch import http_transport
+
+# ===== CONFIGURATION =====
+
+# Patterns masked before keying requests, so values that change between runs do not break replay
+volatile_patterns = [
+    # Today's date as written into the prompts by get_today_str, e.g. "Sat Oct 17, 2026"
+    (re.compile(r"\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) \d{1,2}, \d{4}\b"), "<date>"),
+    # Source ids from the run's source index, which follow the order researchers register pages in
+    (re.compile(r"--- SOURCE \d+:"), "--- SOURCE <id>:"),
+    (re.compile(r"\[\d+\]"), "[<id>]"),
+]
+
+# JSON body fields left out of request keys
+ignored_body_fields = {"api_key"}
+
+# Response headers not stored, since the stored body is already decoded
+dropped_response_headers = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+# Placeholder API keys set during replay, so clients can be built without real keys
+replay_api_keys = {"OPENAI_API_KEY": "replay", "ANTHROPIC_API_KEY": "replay", "TAVILY_API_KEY": "replay"}
+
+# ===== REQUEST NORMALIZATION =====
+
+def _mask(value: Any) -> Any:
+    """Mask volatile values in strings nested anywhere in a JSON value."""
+    if isinstance(value, str):
+        for pattern, replacement in volatile_patterns:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, list):
+        return [_mask(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _mask(item) for key, item in value.items() if key not in ignored_body_fields}
+    return value
+
+def normalize_request(request: httpx.Request) -> dict:
+    """Reduce a request to the content that identifies it.
+
+    Args:
+        request: Outgoing HTTP request
+
+    Returns:
+        Dictionary with method, url (host and path) and masked body
+    """
+    content = request.content.decode("utf-8", errors="replace")
+    try:
+        body = json.loads(content) if content else None
+    except json.JSONDecodeError:
+        body = content
+    return {
+        "method": request.method,
+        "url": f"{request.url.host}{request.url.path}",
+        "body": _mask(body),
+    }
+
+def request_key(normalized: dict) -> str:
+    """Hash a normalized request into a cassette key."""
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+# ===== CASSETTE =====
+
+class Cassette:
+    """Records responses to, or replays them from, a JSON-lines file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: Literal["record", "replay", "auto"] = "replay",
+        replay_latency: bool = False,
+        latency_scale: float = 1.0,
+    ):
+        """Open a cassette.
+
+        Args:
+            path: Cassette file
+            mode: "record" sends every request and appends it to the cassette,
+                "replay" serves recorded responses only, "auto" replays what
+                was recorded and records the rest
+            replay_latency: Wait for each response's recorded latency when replaying
+            latency_scale: Factor applied to replayed latencies
+        """
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self._entries: dict[str, list[dict]] = defaultdict(list)
+        self._served: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+        elif self.path.exists():
+            for line in self.path.read_text().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def __len__(self) -> int:
+        """Return the number of recorded interactions."""
+        return sum(len(entries) for entries in self._entries.values())
+
+    # --- replay ---
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Return the next recorded entry for a key (the last one repeats once exhausted)."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self._stats["misses"] += 1
+                return None
+            index = min(self._served[key], len(entries) - 1)
+            self._served[key] += 1
+            self._stats["replayed"] += 1
+            return entries[index]
+
+    def _replayed_response(self, request: httpx.Request, entry: Optional[dict], normalized: dict) -> httpx.Response:
+        if entry is None:
+            # A non-retryable client error, so SDKs and the scheduler fail fast
+            message = f"No recorded response in cassette {self.path} for {normalized['method']} {normalized['url']}"
+            return httpx.Response(404, json={"error": {"type": "cassette_miss", "message": message}}, request=request)
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+    # --- recording ---
+
+    def record(self, normalized: dict, response: httpx.Response, latency: float) -> None:
+        """Append a request's response to the cassette."""
+        entry = {
+            "key": request_key(normalized),
+            "request": normalized,
+            "status": response.status_code,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in dropped_response_headers
+            },
+            "body": response.content.decode("utf-8", errors="replace"),
+            "latency": latency,
+        }
+        with self._lock:
+            self._entries[entry["key"]].append(entry)
+            self._served[entry["key"]] += 1
+            self._stats["recorded"] += 1
+            with self.path.open("a") as file:
+                file.write(json.dumps(entry) + "\n")
+
+    # --- transport interception ---
+
+    def _should_replay(self, key: str) -> bool:
+        if self.mode == "replay":
+            return True
+        if self.mode == "auto":
+            with self._lock:
+                return self._served[key] < len(self._entries.get(key, []))
+        return False
+
+    def handle_request(self, request: httpx.Request, send: Callable[[httpx.Request], httpx.Response]) -> httpx.Response:
+        """Serve a synchronous request from the cassette, or send and record it."""
+        normalized = normalize_request(request)
+        key = request_key(normalized)
+        if self._should_replay(key):
+            entry = self.lookup(key)
+            if entry is not None and self.replay_latency:
+                time.sleep(entry["latency"] * self.latency_scale)
+            return self._replayed_response(request, entry, normalized)
+
+        start = time.perf_counter()
+        response = send(request)
+        response.read()
+        self.record(normalized, response, time.perf_counter() - start)
+        return response
+
+    async def handle_async_request(
+        self, request: httpx.Request, send: Callable[[httpx.Request], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Serve an asynchronous request from the cassette, or send and record it."""
+        normalized = normalize_request(request)
+        key = request_key(normalized)
+        if self._should_replay(key):
+            entry = self.lookup(key)
+            if entry is not None and self.replay_latency:
+                await asyncio.sleep(entry["latency"] * self.latency_scale)
+            return self._replayed_response(request, entry, normalized)
+
+        start = time.perf_counter()
+        response = await send(request)
+        await response.aread()
+        self.record(normalized, response, time.perf_counter() - start)
+        return response
+
+    def stats(self) -> dict:
+        """Return recorded, replayed and missed request counts."""
+        with self._lock:
+            return dict(self._stats)
+
+@contextmanager
+def use_cassette(
+    path: Union[str, Path],
+    mode: Literal["record", "replay", "auto"] = "replay",
+    replay_latency: bool = False,
+    latency_scale: float = 1.0,
+) -> Iterator[Cassette]:
+    """Record or replay every model and search request made inside the block.
+
+    Requires the shared HTTP transport (models.share_http_transport).
+
+    Args:
+        path: Cassette file
+        mode: "record", "replay" or "auto" (see Cassette)
+        replay_latency: Wait for each response's recorded latency when replaying
+        latency_scale: Factor applied to replayed latencies
+
+    Yields:
+        The open cassette
+    """
+    cassette = Cassette(path, mode, replay_latency, latency_scale)
+
+    added_keys = []
+    if mode == "replay":
+        for name, value in replay_api_keys.items():
+            if not os.getenv(name):
+                os.environ[name] = value
+                added_keys.append(name)
+
+    previous = http_transport.interceptor
+    http_transport.interceptor = cassette
+    try:
+        yield cassette
+    finally:
+        http_transport.interceptor = previous
+        for name in added_keys:
+            os.environ.pop(name, None)
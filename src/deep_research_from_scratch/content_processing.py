@@ -0,0 +1,501 @@
+"""Webpage Content Processing.
+
+This module holds the deterministic, LLM-free stages that run on search
+results before summarization. Every stage here exists to avoid paying for
+summarization work that adds nothing to the research.
+
+Stages:
+- Boilerplate stripping: navigation menus, cookie banners, footers and link
+  lists are removed from the raw content, and pages left with too little
+  useful text skip summarization entirely.
+- Near-duplicate detection: mirrors, syndicated articles and AMP/print versions
+  of a page are collapsed to a single representative using SimHash
+  fingerprints over the raw content, with the other URLs kept as aliases.
+- Token-aware chunking: oversized pages are split on paragraph boundaries into
+  chunks that can be summarized independently.
+- Relevance pre-filtering: passages of each page are ranked against the search
+  query with BM25 and only the best ones, up to a token budget, are kept for
+  summarization.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from typing_extensions import Dict, List, Optional
+
+# ===== CONFIGURATION =====
+
+# Short lines consisting entirely of one of these patterns (plus trailing punctuation)
+# are treated as site chrome and removed
+boilerplate_patterns = [
+    r"(we|this (site|website)) uses? cookies( to .*)?",
+    r"(cookie|privacy) (policy|settings|preferences|consent|notice)",
+    r"(accept|reject|manage) (all( cookies)?|cookies|preferences|settings)",
+    r"terms (of|and) (use|service|conditions)",
+    r"[^.]{0,60}\ball rights reserved",
+    r"(©|\(c\)|copyright) ?\d{4}( ?[-–] ?\d{4})?( [\w&,' ]+)?(\. all rights reserved)?",
+    r"skip to (main )?(content|navigation)",
+    r"(toggle|open|close) (navigation|menu)",
+    r"back to top",
+    r"(subscribe|sign up) (to|for) (our|the) newsletter",
+    r"(sign|log) ?(in|up|out)",
+    r"(share|follow us)( (on|this)\b.*|:.*)?",
+    r"advertisement|sponsored content",
+    r"(previous|next) (article|post|page)(:.*)?",
+    r"(related|recommended|trending|popular) (articles|posts|stories|content)",
+    r"(please )?enable javascript.*|javascript (is )?(disabled|required).*",
+]
+
+# Lines longer than this are kept even if they match a boilerplate pattern
+boilerplate_max_line_chars = 80
+
+# Lines where at least this fraction of the text is link text count as link lines
+link_density_threshold = 0.5
+
+# Runs of at least this many consecutive link lines are treated as link lists and removed
+link_list_min_lines = 3
+
+# Pages with less cleaned content than this skip summarization and use the search snippet
+min_useful_content_chars = 400
+
+# Maximum Hamming distance between SimHash fingerprints for two pages to count as near-duplicates
+near_duplicate_max_distance = 3
+
+# Pages shorter than this many tokens are allowed a proportionally larger distance, since a
+# few changed tokens (leftover site chrome) move a short page's fingerprint further
+near_duplicate_reference_tokens = 1000
+
+# Largest distance allowed for short pages
+near_duplicate_short_page_max_distance = 8
+
+# Pages with fewer tokens than this are too short to fingerprint reliably and are never collapsed
+near_duplicate_min_tokens = 50
+
+# Number of consecutive tokens per shingle when fingerprinting
+simhash_shingle_size = 3
+
+# Maximum tokens of page content kept by the relevance pre-filter (None disables it).
+# Pages are filtered before utils decides whether to map-reduce them, so only pages
+# summarized without a query can still exceed utils.summarization_chunking_threshold.
+relevance_filter_token_budget = 4000
+
+# Passages longer than this are split further before ranking
+relevance_passage_max_tokens = 400
+
+# BM25 term-frequency saturation and length normalization parameters
+bm25_k1 = 1.5
+bm25_b = 0.75
+
+# Tokenizer used to measure content size (the summarization model's encoding)
+token_encoding_name = "o200k_base"
+
+# ===== BOILERPLATE STRIPPING =====
+
+_boilerplate_regex = re.compile(
+    "^(?:" + "|".join(f"(?:{pattern})" for pattern in boilerplate_patterns) + r")[\s.!:|]*$",
+    re.IGNORECASE,
+)
+_markdown_link_pattern = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_bare_url_pattern = re.compile(r"https?://\S+")
+
+def link_density(block: str) -> float:
+    """Compute the fraction of a text block that is link text or URLs.
+
+    Args:
+        block: Block of text, possibly containing markdown links
+
+    Returns:
+        Fraction between 0 and 1
+    """
+    text_length = len(block.strip())
+    if not text_length:
+        return 0.0
+    link_length = sum(len(match.group(0)) for match in _markdown_link_pattern.finditer(block))
+    link_length += sum(len(match.group(0)) for match in _bare_url_pattern.finditer(_markdown_link_pattern.sub("", block)))
+    return min(1.0, link_length / text_length)
+
+def strip_boilerplate(text: str) -> str:
+    """Remove site chrome from raw webpage content.
+
+    Drops short lines made up of a known boilerplate phrase, repeated lines (menus
+    and footers that appear more than once), navigation bars made of several
+    links, and runs of consecutive lines that are mostly links.
+
+    Args:
+        text: Raw webpage content
+
+    Returns:
+        Cleaned content
+    """
+    seen_lines = set()
+    kept_lines = []
+    for line in text.splitlines():
+        normalized = " ".join(line.split()).lower()
+        if not normalized:
+            kept_lines.append("")
+            continue
+        # Match patterns against the text itself, without markdown heading/list/quote markers
+        bare = normalized.lstrip("#>*-+|` ")
+        if len(bare) <= boilerplate_max_line_chars and _boilerplate_regex.match(bare):
+            continue
+        # Drop repeats of any line made of more than punctuation (keeps markdown table rules)
+        if re.search(r"\w", normalized):
+            if normalized in seen_lines:
+                continue
+            seen_lines.add(normalized)
+        kept_lines.append(line.rstrip())
+
+    is_link_line = [bool(line) and link_density(line) >= link_density_threshold for line in kept_lines]
+    cleaned_lines = []
+    start = 0
+    while start < len(kept_lines):
+        end = start + 1
+        if is_link_line[start]:
+            while end < len(kept_lines) and is_link_line[end]:
+                end += 1
+            run = kept_lines[start:end]
+            is_link_list = len(run) >= link_list_min_lines
+            is_nav_bar = any(len(_markdown_link_pattern.findall(line)) > 1 for line in run)
+            if not (is_link_list or is_nav_bar):
+                cleaned_lines.extend(run)
+        else:
+            cleaned_lines.append(kept_lines[start])
+        start = end
+
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(cleaned_lines)).strip()
+
+def clean_search_results(unique_results: Dict[str, dict]) -> Dict[str, dict]:
+    """Strip boilerplate from the raw content of each search result.
+
+    Results whose cleaned content is shorter than min_useful_content_chars lose
+    their raw content, so summarization is skipped and the search snippet is
+    used instead.
+
+    Args:
+        unique_results: Dictionary mapping URLs to search results
+
+    Returns:
+        Dictionary mapping URLs to results with cleaned raw content
+    """
+    cleaned_results = {}
+    for url, result in unique_results.items():
+        if result.get("raw_content"):
+            cleaned = strip_boilerplate(result["raw_content"])
+            result = {**result, "raw_content": cleaned if len(cleaned) >= min_useful_content_chars else None}
+        cleaned_results[url] = result
+    return cleaned_results
+
+# ===== TOKEN ESTIMATION =====
+
+@lru_cache(maxsize=1)
+def get_token_encoding():
+    """Load the tiktoken encoding once, or return None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(token_encoding_name)
+    except Exception:
+        # tiktoken not installed, or its encoding files cannot be downloaded
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text, falling back to a 4-characters-per-token estimate.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of tokens
+    """
+    encoding = get_token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def chunk_text(text: str, chunk_tokens: int) -> List[str]:
+    """Split text into chunks of at most roughly chunk_tokens tokens.
+
+    Chunks are built from whole paragraphs where possible; a paragraph that is
+    larger than a chunk on its own is split on word boundaries.
+
+    Args:
+        text: Text to split
+        chunk_tokens: Target maximum number of tokens per chunk
+
+    Returns:
+        List of chunks in document order
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        paragraph_tokens = count_tokens(paragraph)
+        if paragraph_tokens <= chunk_tokens:
+            pieces.append((paragraph, paragraph_tokens))
+            continue
+        # Oversized paragraph: cut it into word-aligned slices of about chunk_tokens each
+        words = paragraph.split()
+        words_per_slice = max(1, len(words) * chunk_tokens // paragraph_tokens)
+        for start in range(0, len(words), words_per_slice):
+            piece = " ".join(words[start:start + words_per_slice])
+            pieces.append((piece, count_tokens(piece)))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece, piece_tokens in pieces:
+        if current and current_tokens + piece_tokens > chunk_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+# ===== NEAR-DUPLICATE DETECTION =====
+
+SIMHASH_BITS = 64
+
+_token_pattern = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-cased word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of word tokens
+    """
+    return _token_pattern.findall(text.lower())
+
+def simhash(tokens: List[str], shingle_size: int = simhash_shingle_size) -> int:
+    """Compute a 64-bit SimHash fingerprint from word shingles.
+
+    Similar documents produce fingerprints with a small Hamming distance.
+
+    Args:
+        tokens: Word tokens of the document
+        shingle_size: Number of consecutive tokens per shingle
+
+    Returns:
+        64-bit fingerprint
+    """
+    shingles = {
+        " ".join(tokens[i:i + shingle_size])
+        for i in range(max(1, len(tokens) - shingle_size + 1))
+    }
+    digests = [hashlib.blake2b(shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest() for shingle in shingles]
+
+    # Tally set bits per position one byte column at a time, which is much
+    # cheaper in pure Python than testing all 64 bits of every hash
+    bit_counts = [0] * SIMHASH_BITS
+    for byte_index in range(SIMHASH_BITS // 8):
+        for value, count in Counter(digest[byte_index] for digest in digests).items():
+            for bit in range(8):
+                if (value >> bit) & 1:
+                    bit_counts[byte_index * 8 + bit] += count
+
+    threshold = len(digests) / 2
+    fingerprint = 0
+    for position, count in enumerate(bit_counts):
+        if count > threshold:
+            fingerprint |= 1 << position
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """Count the differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+def near_duplicate_distance(num_tokens: int, max_distance: int = near_duplicate_max_distance) -> int:
+    """Return the maximum Hamming distance for pages of the given length to count as near-duplicates.
+
+    Args:
+        num_tokens: Length of the shorter page of the pair, in word tokens
+        max_distance: Distance allowed for pages of near_duplicate_reference_tokens or more
+
+    Returns:
+        Allowed distance, between max_distance and near_duplicate_short_page_max_distance
+    """
+    scaled = round(max_distance * near_duplicate_reference_tokens / max(1, num_tokens))
+    return max(max_distance, min(near_duplicate_short_page_max_distance, scaled))
+
+def collapse_near_duplicates(
+    unique_results: Dict[str, dict],
+    max_distance: int = near_duplicate_max_distance,
+) -> Dict[str, dict]:
+    """Collapse search results whose raw content is nearly identical.
+
+    The first result of each cluster (in search ranking order) is kept as its
+    representative, and the URLs of the other members are recorded on it under
+    "aliases" so they can still be cited. Results without raw content, or too
+    short to fingerprint, are passed through untouched. Shorter pages are
+    allowed a larger distance (see near_duplicate_distance), so mirrors of a
+    short article that keep a line or two of site chrome are still collapsed.
+
+    Candidates are found by splitting each fingerprint into one band more than
+    the largest allowed distance: two fingerprints within that many bits must
+    agree exactly on at least one band, so only pages sharing a band bucket are
+    compared. This keeps the pass linear in the number of results.
+
+    Args:
+        unique_results: Dictionary mapping URLs to search results
+        max_distance: Maximum Hamming distance for two long pages to be near-duplicates
+
+    Returns:
+        Dictionary mapping representative URLs to results, in the original order
+    """
+    num_bands = max(max_distance, near_duplicate_short_page_max_distance) + 1
+    band_width = SIMHASH_BITS // num_bands
+    band_mask = (1 << band_width) - 1
+
+    buckets: Dict[tuple, List[str]] = {}
+    fingerprints: Dict[str, int] = {}
+    lengths: Dict[str, int] = {}
+    collapsed: Dict[str, dict] = {}
+
+    for url, result in unique_results.items():
+        tokens = tokenize(result.get("raw_content") or "")
+        if len(tokens) < near_duplicate_min_tokens:
+            collapsed[url] = result
+            continue
+
+        fingerprint = simhash(tokens)
+        bands = [(band, (fingerprint >> (band * band_width)) & band_mask) for band in range(num_bands)]
+
+        representative = next(
+            (
+                candidate
+                for band in bands
+                for candidate in buckets.get(band, [])
+                if hamming_distance(fingerprint, fingerprints[candidate])
+                <= near_duplicate_distance(min(len(tokens), lengths[candidate]), max_distance)
+            ),
+            None,
+        )
+
+        if representative is not None:
+            kept = collapsed[representative]
+            collapsed[representative] = {**kept, "aliases": kept.get("aliases", []) + [url]}
+            continue
+
+        fingerprints[url] = fingerprint
+        lengths[url] = len(tokens)
+        collapsed[url] = result
+        for band in bands:
+            buckets.setdefault(band, []).append(url)
+
+    return collapsed
+
+# ===== RELEVANCE PRE-FILTERING =====
+
+def split_passages(text: str, max_passage_tokens: int = relevance_passage_max_tokens) -> List[str]:
+    """Split page content into passages for ranking.
+
+    Args:
+        text: Page content
+        max_passage_tokens: Passages longer than this are split further
+
+    Returns:
+        List of passages in document order
+    """
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) > max_passage_tokens:
+            passages.extend(chunk_text(paragraph, max_passage_tokens))
+        else:
+            passages.append(paragraph)
+    return passages
+
+def bm25_scores(passage_tokens: List[List[str]], query_tokens: List[str]) -> List[float]:
+    """Score passages against a query with Okapi BM25, using the passages as the corpus.
+
+    Args:
+        passage_tokens: Tokenized passages
+        query_tokens: Tokenized query
+
+    Returns:
+        BM25 score for each passage
+    """
+    num_passages = len(passage_tokens)
+    if not num_passages:
+        return []
+
+    average_length = sum(len(tokens) for tokens in passage_tokens) / num_passages or 1.0
+    document_frequency = Counter(term for tokens in passage_tokens for term in set(tokens))
+    query_terms = set(query_tokens)
+    idf = {
+        term: math.log(1 + (num_passages - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in query_terms
+    }
+
+    scores = []
+    for tokens in passage_tokens:
+        term_frequency = Counter(tokens)
+        length_norm = bm25_k1 * (1 - bm25_b + bm25_b * len(tokens) / average_length)
+        scores.append(sum(
+            idf[term] * term_frequency[term] * (bm25_k1 + 1) / (term_frequency[term] + length_norm)
+            for term in query_terms
+            if term_frequency[term]
+        ))
+    return scores
+
+def select_relevant_passages(text: str, query: str, token_budget: int) -> str:
+    """Keep only the passages of a page that are most relevant to the query.
+
+    The opening passage is always kept for context. The remaining passages are
+    taken in descending BM25 order until the token budget is spent; passages
+    that share no terms with the query are dropped. Selected passages are
+    returned in their original order.
+
+    Args:
+        text: Page content
+        query: Search query the page was retrieved for
+        token_budget: Maximum number of tokens to keep
+
+    Returns:
+        Filtered content, or the original content if it already fits the budget
+    """
+    if count_tokens(text) <= token_budget:
+        return text
+
+    passages = split_passages(text)
+    if not passages:
+        return text
+    scores = bm25_scores([tokenize(passage) for passage in passages], tokenize(query))
+
+    selected, used_tokens = set(), 0
+    ranked = [0] + sorted(range(1, len(passages)), key=lambda i: (-scores[i], i))
+    for i in ranked:
+        if i and scores[i] <= 0:
+            break
+        passage_tokens = count_tokens(passages[i])
+        if used_tokens + passage_tokens > token_budget:
+            continue
+        selected.add(i)
+        used_tokens += passage_tokens
+
+    return "\n\n".join(passages[i] for i in sorted(selected))
+
+def filter_page_content(text: str, query: Optional[str], token_budget: Optional[int] = None) -> str:
+    """Trim one page's content to its passages most relevant to the query.
+
+    Args:
+        text: Page content
+        query: Search query the page was retrieved for (None skips filtering)
+        token_budget: Maximum tokens of content kept
+            (defaults to relevance_filter_token_budget; None there disables filtering)
+
+    Returns:
+        Filtered content
+    """
+    token_budget = token_budget or relevance_filter_token_budget
+    if not token_budget or not query:
+        return text
+    return select_relevant_passages(text, query, token_budget)
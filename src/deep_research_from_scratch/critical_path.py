@@ -0,0 +1,289 @@
+"""Critical-Path Analysis of Traced Runs.
+
+Rebuilds the dependency graph of one run from its span trace (see tracing)
+and finds the chain of spans that determined its wall time. Spans nest
+(a node contains its model and tool calls, supervisor_tools contains one
+subgraph per researcher), and siblings either run one after another or
+overlap; a span depends on the latest sibling that finished before it
+started, and on the children it contains.
+
+The critical path is found by walking backwards from the end of the run:
+within each span, the child that finished last before the cursor is the one
+the span was waiting on; the walk descends into it, then continues from its
+start. Time no child covers is the span's own time (Python work, scheduler
+queueing, state handling).
+
+Every node whose children overlap in time ends at a barrier: it cannot
+finish before its slowest branch. For each such barrier - above all each
+supervisor_tools iteration, whose researchers asyncio.gather awaits - the
+report names the straggler, how long the other branches sat idle waiting for
+it, and which model, search or tool call held it up.
+
+Usage:
+    report = analyze(load_trace("trace.jsonl"))
+    print(format_report(report))
+"""
+
+import json
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+from typing_extensions import Optional, Union
+
+# ===== CONFIGURATION =====
+
+# Tolerance when deciding whether one span finished before another started, in seconds
+overlap_tolerance = 0.001
+
+# Number of critical-path contributors listed per barrier straggler
+straggler_contributors = 3
+
+# ===== LOADING =====
+
+def load_trace(path: Union[str, Path], trace_id: Optional[str] = None) -> list[dict]:
+    """Read the spans of one run from a JSON-lines trace file.
+
+    Args:
+        path: Trace file written by tracing.Tracer
+        trace_id: Run to read (defaults to the most recently started run in the file)
+
+    Returns:
+        The run's spans
+    """
+    traces = defaultdict(list)
+    for line in Path(path).read_text().splitlines():
+        if line.strip():
+            span = json.loads(line)
+            traces[span["trace_id"]].append(span)
+    if not traces:
+        return []
+    if trace_id is None:
+        trace_id = max(traces, key=lambda key: min(span["start"] for span in traces[key]))
+    return traces.get(trace_id, [])
+
+# ===== DEPENDENCY GRAPH =====
+
+def build_tree(spans: list[dict]) -> tuple[list[dict], dict[str, list[dict]]]:
+    """Index spans by parent.
+
+    Spans whose parent is missing from the trace (e.g. a run cut short) are
+    treated as roots.
+
+    Returns:
+        Root spans and a mapping from span id to its children, both ordered by start time
+    """
+    ids = {span["span_id"] for span in spans}
+    roots, children = [], defaultdict(list)
+    for span in sorted(spans, key=lambda span: span["start"]):
+        if span["parent_id"] in ids:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+    return roots, children
+
+def dependency_edges(spans: list[dict], children: dict[str, list[dict]]) -> list[tuple[str, str]]:
+    """List the run's dependency edges as (prerequisite span id, dependent span id).
+
+    A parent depends on each child it contains, and a span depends on the
+    latest sibling that finished before it started. Overlapping siblings ran
+    in parallel and have no edge between them.
+    """
+    edges = []
+    for span in spans:
+        siblings = children.get(span["span_id"], [])
+        for child in siblings:
+            edges.append((child["span_id"], span["span_id"]))
+            finished_before = [
+                other for other in siblings
+                if other is not child and other["end"] <= child["start"] + overlap_tolerance
+            ]
+            if finished_before:
+                edges.append((max(finished_before, key=lambda other: other["end"])["span_id"], child["span_id"]))
+    return edges
+
+# ===== CRITICAL PATH =====
+
+def critical_path(span: dict, children: dict[str, list[dict]], end: Optional[float] = None) -> list[dict]:
+    """Find the chain of spans that determined a span's end time.
+
+    Args:
+        span: Span to analyze (usually the run's root)
+        children: Mapping from span id to children (see build_tree)
+        end: Point in time the walk starts from (defaults to the span's end)
+
+    Returns:
+        Segments in chronological order, each {"span", "start", "end", "seconds"},
+        attributing every moment of the span to the innermost span on the path
+    """
+    segments = []
+    cursor = span["end"] if end is None else end
+    pending = list(children.get(span["span_id"], []))
+
+    while True:
+        # The child the span was waiting on at the cursor: the last to finish before it
+        candidates = [child for child in pending if child["start"] < cursor - overlap_tolerance]
+        if not candidates:
+            break
+        blocking = max(candidates, key=lambda child: min(child["end"], cursor))
+        blocking_end = min(blocking["end"], cursor)
+        if blocking_end < cursor:
+            segments.append({"span": span, "start": blocking_end, "end": cursor})
+        segments.extend(reversed(critical_path(blocking, children, blocking_end)))
+        cursor = max(blocking["start"], span["start"])
+        pending = [child for child in pending if child is not blocking and child["end"] <= cursor + overlap_tolerance]
+
+    if span["start"] < cursor:
+        segments.append({"span": span, "start": span["start"], "end": cursor})
+
+    segments.reverse()
+    for segment in segments:
+        segment["seconds"] = segment["end"] - segment["start"]
+    return segments
+
+def span_label(span: dict) -> str:
+    """Describe a span for reports, e.g. "llm anthropic:claude-sonnet-4 @ supervisor_tools/llm_call"."""
+    label = f"{span['kind']} {span['name']}"
+    if span["attributes"].get("research_topic"):
+        label += f" [{span['attributes']['research_topic'][:80]}]"
+    if span["kind"] != "node" and span.get("path"):
+        label += f" @ {span['path']}"
+    return label
+
+def summarize_path(segments: list[dict]) -> list[dict]:
+    """Merge consecutive segments of the same span and rank spans by time on the critical path."""
+    totals = defaultdict(float)
+    spans = {}
+    for segment in segments:
+        totals[segment["span"]["span_id"]] += segment["seconds"]
+        spans[segment["span"]["span_id"]] = segment["span"]
+    return sorted(
+        ({"span": spans[span_id], "seconds": seconds} for span_id, seconds in totals.items()),
+        key=lambda entry: entry["seconds"],
+        reverse=True,
+    )
+
+# ===== BARRIERS =====
+
+def find_barriers(spans: list[dict], children: dict[str, list[dict]]) -> list[dict]:
+    """Analyze every span whose children ran in parallel.
+
+    Args:
+        spans: Spans of the run
+        children: Mapping from span id to children (see build_tree)
+
+    Returns:
+        One entry per barrier, in start order, with its branches, the straggler,
+        the straggler's lead over the next branch, the branch time spent idle
+        waiting, and the spans that held the straggler up
+    """
+    iterations = defaultdict(int)
+    barriers = []
+    for span in sorted(spans, key=lambda span: span["start"]):
+        branches = children.get(span["span_id"], [])
+        if len(branches) < 2 or span["kind"] not in ("node", "tool"):
+            continue
+        # Branches are in start order; parallel if one starts before an earlier one ended
+        if not any(
+            branch["start"] < max(earlier["end"] for earlier in branches[:i]) - overlap_tolerance
+            for i, branch in enumerate(branches[1:], 1)
+        ):
+            continue
+
+        # Iterations are counted per graph run, e.g. supervisor_tools #1, #2 of one supervisor
+        key = (span["parent_id"], span["path"] or span["name"])
+        iterations[key] += 1
+        ordered = sorted(branches, key=lambda branch: branch["end"])
+        straggler = ordered[-1]
+        # What held the straggler up: the spans on its own critical path, excluding its overhead
+        contributors = [
+            entry for entry in summarize_path(critical_path(straggler, children))
+            if entry["span"] is not straggler
+        ][:straggler_contributors]
+
+        barriers.append({
+            "span": span,
+            "iteration": iterations[key],
+            "branches": [
+                {"span": branch, "seconds": branch["duration"], "finished_after": branch["end"] - span["start"]}
+                for branch in branches
+            ],
+            "straggler": straggler,
+            "straggler_lead": straggler["end"] - ordered[-2]["end"],
+            "idle_branch_seconds": sum(straggler["end"] - branch["end"] for branch in ordered[:-1]),
+            "median_branch_seconds": statistics.median(branch["duration"] for branch in branches),
+            "straggler_contributors": contributors,
+        })
+    return barriers
+
+# ===== REPORT =====
+
+def analyze(spans: list[dict]) -> dict:
+    """Compute the critical path and barrier stragglers of one run.
+
+    Args:
+        spans: Spans of one run (see load_trace)
+
+    Returns:
+        Report with the run's wall time, the critical path segments and its
+        ranked contributors, critical versus total time per span kind, the
+        dependency edges and the barriers
+    """
+    roots, children = build_tree(spans)
+    if not roots:
+        return {"wall_seconds": 0.0, "critical_path": [], "contributors": [], "by_kind": {}, "edges": [], "barriers": []}
+    root = max(roots, key=lambda span: span["duration"])
+
+    segments = critical_path(root, children)
+    by_kind = defaultdict(lambda: {"critical_seconds": 0.0, "total_seconds": 0.0, "spans": 0})
+    for segment in segments:
+        by_kind[segment["span"]["kind"]]["critical_seconds"] += segment["seconds"]
+    for span in spans:
+        by_kind[span["kind"]]["total_seconds"] += span["duration"]
+        by_kind[span["kind"]]["spans"] += 1
+
+    return {
+        "trace_id": root["trace_id"],
+        "wall_seconds": root["duration"],
+        "critical_path": segments,
+        "contributors": summarize_path(segments),
+        "by_kind": dict(by_kind),
+        "edges": dependency_edges(spans, children),
+        "barriers": find_barriers(spans, children),
+    }
+
+def format_report(report: dict, top: int = 10) -> str:
+    """Render an analysis report as text.
+
+    Args:
+        report: Report from analyze
+        top: Number of critical-path contributors listed
+
+    Returns:
+        Multi-line report
+    """
+    wall = report["wall_seconds"] or 1.0
+    lines = [f"Run {report.get('trace_id', '?')}: {report['wall_seconds']:.2f}s wall", "", "Critical path by span kind (own time on the path / summed span time):"]
+    for kind, totals in sorted(report["by_kind"].items(), key=lambda item: -item[1]["critical_seconds"]):
+        lines.append(
+            f"  {kind:<14} {totals['critical_seconds']:>8.2f}s ({totals['critical_seconds'] / wall:>5.1%})"
+            f"  of {totals['total_seconds']:>8.2f}s in {totals['spans']} spans"
+        )
+
+    lines += ["", f"Top {top} spans on the critical path:"]
+    for entry in report["contributors"][:top]:
+        lines.append(f"  {entry['seconds']:>8.2f}s  {span_label(entry['span'])}")
+
+    if report["barriers"]:
+        lines += ["", "Barriers (parallel branches awaited together):"]
+    for barrier in report["barriers"]:
+        span = barrier["span"]
+        lines.append(
+            f"  {span['path'] or span['name']} #{barrier['iteration']}: {len(barrier['branches'])} branches, "
+            f"median {barrier['median_branch_seconds']:.2f}s, straggler {barrier['straggler']['duration']:.2f}s "
+            f"(+{barrier['straggler_lead']:.2f}s after the next branch, {barrier['idle_branch_seconds']:.2f}s branch time idle)"
+        )
+        lines.append(f"    straggler: {span_label(barrier['straggler'])}")
+        for entry in barrier["straggler_contributors"]:
+            lines.append(f"      {entry['seconds']:>8.2f}s  {span_label(entry['span'])}")
+    return "\n".join(lines)
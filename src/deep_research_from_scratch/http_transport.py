@@ -0,0 +1,259 @@
+"""Shared Pooled HTTP Transport.
+
+One process-wide pair of httpx clients (sync and async) carries the HTTP
+traffic of the Tavily client and every chat model built by the model registry.
+Connections are kept alive and reused across calls and researchers instead of
+each client paying its own TLS handshakes.
+
+Async connections belong to the event loop that opened them, so the async
+transport keeps one connection pool per running loop. Per-host request and
+connection counts are available from connection_pool_stats().
+
+The provider adapters and the pool statistics rely on private attributes of
+the Tavily SDK and httpcore; when those change, the Tavily client keeps its
+stock transport and the statistics report no connections.
+"""
+
+import asyncio
+import os
+import threading
+from collections import Counter
+
+import httpx
+from typing_extensions import Any, Optional
+
+# ===== CONFIGURATION =====
+
+# Maximum number of open connections per pool
+http_max_connections = 100
+
+# Maximum number of idle keep-alive connections retained per pool
+http_max_keepalive_connections = 20
+
+# Seconds an idle keep-alive connection is retained
+http_keepalive_expiry = 30.0
+
+# Default timeouts for requests that do not set their own
+http_timeout = httpx.Timeout(60.0, connect=10.0)
+
+# Optional interceptor wrapping every request sent through the shared clients
+# (e.g. a record/replay cassette); see cassette.use_cassette
+interceptor = None
+
+# ===== TRANSPORTS =====
+
+def pool_limits() -> httpx.Limits:
+    """Build the connection pool limits from the module configuration."""
+    return httpx.Limits(
+        max_connections=http_max_connections,
+        max_keepalive_connections=http_max_keepalive_connections,
+        keepalive_expiry=http_keepalive_expiry,
+    )
+
+# Requests sent through the shared transports, per host
+_requests_by_host: Counter = Counter()
+_requests_lock = threading.Lock()
+
+def _record_request(request: httpx.Request) -> None:
+    with _requests_lock:
+        _requests_by_host[request.url.host] += 1
+
+class PooledTransport(httpx.BaseTransport):
+    """Synchronous pooled transport that records requests per host."""
+
+    def __init__(self):
+        """Create the underlying connection pool."""
+        self.transport = httpx.HTTPTransport(limits=pool_limits())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over a pooled connection."""
+        _record_request(request)
+        if interceptor is not None:
+            return interceptor.handle_request(request, self.transport.handle_request)
+        return self.transport.handle_request(request)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.transport.close()
+
+class LoopLocalPooledTransport(httpx.AsyncBaseTransport):
+    """Asynchronous pooled transport keeping one connection pool per event loop."""
+
+    def __init__(self):
+        """Create an empty mapping of event loops to connection pools."""
+        self.transports: dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def prune_closed_loops(self) -> None:
+        """Drop the pools of event loops that have been closed.
+
+        Their connections can no longer be used or closed cleanly; dropping the
+        pool lets them be garbage collected with the loop.
+        """
+        with self._lock:
+            for loop in [loop for loop in self.transports if loop.is_closed()]:
+                del self.transports[loop]
+
+    def transport_for_current_loop(self) -> httpx.AsyncHTTPTransport:
+        """Get the connection pool for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        self.prune_closed_loops()
+        with self._lock:
+            transport = self.transports.get(loop)
+            if transport is None:
+                transport = self.transports[loop] = httpx.AsyncHTTPTransport(limits=pool_limits())
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over a pooled connection of the running loop."""
+        _record_request(request)
+        transport = self.transport_for_current_loop()
+        if interceptor is not None:
+            return await interceptor.handle_async_request(request, transport.handle_async_request)
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the connection pool of the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self.transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+# ===== SHARED CLIENTS =====
+
+# Global clients - will be initialized lazily
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """Get or initialize the process-wide synchronous HTTP client."""
+    global _http_client
+    with _clients_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(transport=PooledTransport(), timeout=http_timeout)
+        return _http_client
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get or initialize the process-wide asynchronous HTTP client."""
+    global _async_http_client
+    with _clients_lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(transport=LoopLocalPooledTransport(), timeout=http_timeout)
+        return _async_http_client
+
+def connection_pool_stats() -> dict:
+    """Report pooled connections and requests per host.
+
+    Returns:
+        Dictionary mapping hosts to their request count and the number of open
+        and idle pooled connections, summed over all pools (connection counts
+        stay at zero if httpcore's internals are not as expected)
+    """
+    with _requests_lock:
+        stats = {
+            host: {"requests": count, "connections": 0, "idle_connections": 0}
+            for host, count in _requests_by_host.items()
+        }
+
+    # The pools and each connection's origin are httpcore internals
+    try:
+        pools = []
+        if _http_client is not None:
+            pools.append(_http_client._transport.transport._pool)
+        if _async_http_client is not None:
+            _async_http_client._transport.prune_closed_loops()
+            pools.extend(transport._pool for transport in list(_async_http_client._transport.transports.values()))
+
+        connections = {}
+        for pool in pools:
+            for connection in list(pool.connections):
+                host = connection._origin.host.decode("ascii")
+                host_stats = connections.setdefault(host, {"connections": 0, "idle_connections": 0})
+                host_stats["connections"] += 1
+                host_stats["idle_connections"] += int(connection.is_idle())
+    except (AttributeError, TypeError):
+        return stats
+
+    for host, host_stats in connections.items():
+        stats.setdefault(host, {"requests": 0, "connections": 0, "idle_connections": 0}).update(host_stats)
+    return stats
+
+# ===== PROVIDER CLIENT ADAPTERS =====
+
+def attach_anthropic_http_clients(model: Any) -> Any:
+    """Make a ChatAnthropic model send its requests through the shared clients.
+
+    ChatAnthropic has no http_client option; it builds its SDK clients lazily
+    in cached properties, so those are pre-populated here with SDK clients
+    using the shared transport.
+
+    Args:
+        model: ChatAnthropic instance
+
+    Returns:
+        The same model
+    """
+    import anthropic
+
+    client_params = model._client_params
+    model.__dict__["_client"] = anthropic.Client(**client_params, http_client=get_http_client())
+    model.__dict__["_async_client"] = anthropic.AsyncClient(**client_params, http_client=get_async_http_client())
+    return model
+
+class SharedClientSession:
+    """Stand-in for the per-request httpx.AsyncClient built by AsyncTavilyClient.
+
+    Used as an async context manager like the client it replaces, but sends
+    requests through the shared client and never closes it.
+    """
+
+    def __init__(self, base_url: str, headers: dict):
+        """Store the base URL and headers the Tavily client would have used."""
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+
+    async def __aenter__(self) -> "SharedClientSession":
+        """Return the session itself; the shared client is already open."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Leave the shared client open for reuse."""
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request relative to the Tavily base URL."""
+        return await get_async_http_client().post(self.base_url + url, headers=self.headers, **kwargs)
+
+def attach_tavily_http_client(client: Any) -> Any:
+    """Make an AsyncTavilyClient send its requests through the shared async client.
+
+    AsyncTavilyClient opens and closes a new httpx client for every request.
+    The shared session sends the headers of that stock client, so requests carry
+    the API key the Tavily client was built with. Clients configured with proxies,
+    or SDK versions without the expected private attributes, are left unchanged.
+
+    Args:
+        client: AsyncTavilyClient instance
+
+    Returns:
+        The same client
+    """
+    if os.getenv("TAVILY_HTTP_PROXY") or os.getenv("TAVILY_HTTPS_PROXY"):
+        return client
+
+    create_client = getattr(client, "_client_creator", None)
+    base_url = getattr(client, "_api_base_url", None)
+    if create_client is None or base_url is None:
+        return client
+    stock_client = create_client()
+    if not isinstance(stock_client, httpx.AsyncClient) or "Authorization" not in stock_client.headers:
+        return client
+
+    headers = {
+        name: stock_client.headers[name]
+        for name in ("Content-Type", "Authorization", "X-Client-Source")
+        if name in stock_client.headers
+    }
+    client._client_creator = lambda: SharedClientSession(base_url, headers)
+    return client
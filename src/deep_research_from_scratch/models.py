@@ -0,0 +1,220 @@
+"""Lazy Model and Client Registry.
+
+Chat models, structured-output runnables, tool-bound models and Tavily clients
+are built on first use and memoized, keyed by their configuration. Importing
+a graph module therefore no longer builds models or requires API keys, and a
+worker only pays for the models it actually uses.
+
+The factories used to build models and clients are module-level settings, so
+alternative implementations (e.g. offline stand-ins for benchmarking) can be
+swapped in without touching the graph code.
+
+Prompts sent to Anthropic models can be marked with prompt-cache breakpoints
+(see add_cache_breakpoints), so a stable prefix resent on every turn is read
+from the provider's cache instead of being processed again.
+"""
+
+import threading
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+from tavily import AsyncTavilyClient, TavilyClient
+from typing_extensions import Any, Callable, Sequence
+
+from deep_research_from_scratch.http_transport import (
+    attach_anthropic_http_clients,
+    attach_tavily_http_client,
+    get_async_http_client,
+    get_http_client,
+)
+from deep_research_from_scratch.scheduler import ScheduledRunnable, get_scheduler
+
+# ===== CONFIGURATION =====
+
+# Factory building chat models from a model spec, e.g. init_chat_model(model="openai:gpt-4.1")
+chat_model_factory: Callable[..., BaseChatModel] = init_chat_model
+
+# Factories building the sync and async Tavily clients
+tavily_client_factory: Callable[[], Any] = TavilyClient
+async_tavily_client_factory: Callable[[], Any] = AsyncTavilyClient
+
+# Route model and Tavily requests through the shared pooled HTTP transport
+share_http_transport = True
+
+# Send model requests through the per-provider rate-limit scheduler
+schedule_model_requests = True
+
+# Mark prompt-cache breakpoints on prompts sent to Anthropic models (OpenAI caches
+# long prompt prefixes automatically and needs no markers)
+prompt_caching = True
+
+# ===== REGISTRY =====
+
+_registry: dict[tuple, Any] = {}
+_registry_lock = threading.RLock()
+
+def _config_key(model_config: dict) -> tuple:
+    """Turn a model configuration into a hashable registry key."""
+    return tuple(sorted((name, repr(value)) for name, value in model_config.items()))
+
+def _get_or_build(key: tuple, build: Callable[[], Any]) -> Any:
+    """Return the registry entry for key, building it on first use."""
+    entry = _registry.get(key)
+    if entry is None:
+        with _registry_lock:
+            entry = _registry.get(key)
+            if entry is None:
+                entry = _registry[key] = build()
+    return entry
+
+def _model_provider(model_config: dict) -> str:
+    """Infer the provider of a model configuration, e.g. "openai" for "openai:gpt-4.1"."""
+    return model_config.get("model_provider") or model_config["model"].partition(":")[0]
+
+def _build_chat_model(model_config: dict) -> BaseChatModel:
+    """Build a chat model, attaching the shared HTTP clients for known providers."""
+    if chat_model_factory is not init_chat_model:
+        return chat_model_factory(**model_config)
+
+    provider = _model_provider(model_config)
+    if schedule_model_requests and provider in ("openai", "anthropic"):
+        # The scheduler retries throttled requests for the whole provider at once
+        model_config = {"max_retries": 0, **model_config}
+    if not share_http_transport:
+        return init_chat_model(**model_config)
+
+    if provider == "openai":
+        return init_chat_model(
+            **model_config, http_client=get_http_client(), http_async_client=get_async_http_client()
+        )
+
+    model = init_chat_model(**model_config)
+    if provider == "anthropic":
+        attach_anthropic_http_clients(model)
+    return model
+
+def _get_base_chat_model(model_config: dict) -> BaseChatModel:
+    """Get the memoized chat model for a configuration, without scheduling."""
+    return _get_or_build(("chat", _config_key(model_config)), lambda: _build_chat_model(model_config))
+
+def _scheduled(runnable: Runnable, model_config: dict, priority: str) -> Runnable:
+    """Route a model runnable's invocations through its provider's scheduler."""
+    if not schedule_model_requests:
+        return runnable
+    return ScheduledRunnable(runnable, get_scheduler(_model_provider(model_config)), priority)
+
+def get_chat_model(priority: str = "normal", **model_config) -> Runnable:
+    """Get the chat model for a configuration, building it on first use.
+
+    Args:
+        priority: Scheduling priority class ("critical", "normal" or "bulk")
+        **model_config: Keyword arguments for the chat model factory,
+            e.g. model="openai:gpt-4.1", max_tokens=32000
+
+    Returns:
+        Memoized chat model, scheduled per provider
+    """
+    return _get_or_build(
+        ("scheduled", priority, _config_key(model_config)),
+        lambda: _scheduled(_get_base_chat_model(model_config), model_config, priority),
+    )
+
+def get_structured_output_model(schema: type, priority: str = "normal", **model_config) -> Runnable:
+    """Get a chat model bound to a structured output schema.
+
+    Args:
+        schema: Pydantic model describing the output
+        priority: Scheduling priority class ("critical", "normal" or "bulk")
+        **model_config: Keyword arguments for the chat model factory
+
+    Returns:
+        Memoized structured-output runnable
+    """
+    return _get_or_build(
+        ("structured", schema, priority, _config_key(model_config)),
+        lambda: _scheduled(
+            _get_base_chat_model(model_config).with_structured_output(schema), model_config, priority
+        ),
+    )
+
+def get_model_with_tools(tools: Sequence, priority: str = "normal", **model_config) -> Runnable:
+    """Get a chat model bound to a set of tools.
+
+    Bindings are keyed by tool name, so tool objects that are rebuilt between
+    calls (e.g. MCP tools) reuse the same binding.
+
+    Args:
+        tools: Tools (or tool schemas) to bind
+        priority: Scheduling priority class ("critical", "normal" or "bulk")
+        **model_config: Keyword arguments for the chat model factory
+
+    Returns:
+        Memoized tool-bound runnable
+    """
+    tool_names = tuple(getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool)) for tool in tools)
+    return _get_or_build(
+        ("tools", tool_names, priority, _config_key(model_config)),
+        lambda: _scheduled(_get_base_chat_model(model_config).bind_tools(list(tools)), model_config, priority),
+    )
+
+def get_tavily_client() -> Any:
+    """Get the synchronous Tavily client, building it on first use."""
+    return _get_or_build(("client", "tavily"), lambda: tavily_client_factory())
+
+def get_async_tavily_client() -> Any:
+    """Get the asynchronous Tavily client, building it on first use."""
+    def build() -> Any:
+        client = async_tavily_client_factory()
+        if share_http_transport and isinstance(client, AsyncTavilyClient):
+            attach_tavily_http_client(client)
+        return client
+
+    return _get_or_build(("client", "async_tavily"), build)
+
+def clear_registry() -> None:
+    """Drop every memoized model and client, e.g. after changing a factory."""
+    with _registry_lock:
+        _registry.clear()
+
+# ===== PROMPT CACHING =====
+
+def _with_cache_control(message: BaseMessage) -> BaseMessage:
+    """Copy a message with a cache breakpoint on its last content block."""
+    content = message.content
+    blocks = [{"type": "text", "text": content}] if isinstance(content, str) else [
+        block if isinstance(block, dict) else {"type": "text", "text": block} for block in content
+    ]
+    # Anthropic rejects cache_control on empty text blocks (e.g. a tool-calling turn without text)
+    if not blocks or blocks[-1].get("type") == "text" and not blocks[-1].get("text"):
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+    return message.model_copy(update={"content": blocks})
+
+def add_cache_breakpoints(messages: Sequence[BaseMessage], **model_config) -> list[BaseMessage]:
+    """Mark prompt-cache breakpoints on a prompt for Anthropic models.
+
+    Two breakpoints are set: after the system prompt, which caches the tool
+    definitions and system prompt shared by every call of an agent, and after
+    the last message, which caches the conversation so far for the agent's
+    next turn. Anthropic reads the longest cached prefix ending at a
+    breakpoint, so each turn of a loop reads the previous turn's prompt from
+    the cache and only writes what was added since.
+
+    Args:
+        messages: Prompt, system message first
+        **model_config: Configuration of the model the prompt is sent to
+
+    Returns:
+        The marked prompt; messages is returned unchanged for other providers,
+        empty messages or when prompt_caching is off
+    """
+    messages = list(messages)
+    if not prompt_caching or _model_provider(model_config) != "anthropic":
+        return messages
+    if messages and messages[0].type == "system":
+        messages[0] = _with_cache_control(messages[0])
+    if len(messages) > 1:
+        messages[-1] = _with_cache_control(messages[-1])
+    return messages
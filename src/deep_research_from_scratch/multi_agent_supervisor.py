@@ -14,7 +14,6 @@ import asyncio
 
 from typing_extensions import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     HumanMessage, 
     BaseMessage, 
@@ -25,6 +24,7 @@ from langchain_core.messages import (
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
+from deep_research_from_scratch.models import add_cache_breakpoints, get_model_with_tools
 from deep_research_from_scratch.prompts import lead_researcher_prompt
 from deep_research_from_scratch.research_agent import researcher_agent
 from deep_research_from_scratch.state_multi_agent_supervisor import (
@@ -67,9 +67,10 @@ except ImportError:
 
 # ===== CONFIGURATION =====
 
-supervisor_tools = [ConductResearch, ResearchComplete, think_tool]
-supervisor_model = init_chat_model(model="anthropic:claude-sonnet-4-20250514")
-supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
+# Tools bound to the supervisor model (named apart from the supervisor_tools node below)
+supervisor_tool_list = [ConductResearch, ResearchComplete, think_tool]
+# Model configuration (the model is built lazily by the model registry on first use)
+supervisor_model_config = {"model": "anthropic:claude-sonnet-4-20250514"}
 
 # System constants
 # Maximum number of tool call iterations for individual researcher agents
@@ -80,6 +81,10 @@ max_researcher_iterations = 6 # Calls to think_tool + ConductResearch
 # This is passed to the lead_researcher_prompt to limit parallel research tasks
 max_concurrent_researchers = 3
 
+# Run each round's researchers one after another instead of concurrently, so requests
+# are sent in a reproducible order (e.g. when recording cassettes)
+serialize_researchers = False
+
 # ===== SUPERVISOR NODES =====
 
 async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tools"]]:
@@ -98,22 +103,29 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
     """
     supervisor_messages = state.get("supervisor_messages", [])
 
-    # Prepare system message with current date and constraints
+    # Prepare system message with the run's date and constraints; the date is fixed
+    # on the first turn so the system prompt stays identical, and cacheable, all run
+    research_date = state.get("research_date") or get_today_str()
     system_message = lead_researcher_prompt.format(
-        date=get_today_str(), 
+        date=research_date,
         max_concurrent_research_units=max_concurrent_researchers,
         max_researcher_iterations=max_researcher_iterations
     )
-    messages = [SystemMessage(content=system_message)] + supervisor_messages
+    # Cache breakpoints let each turn read the previous turn's prompt from the provider's cache
+    messages = add_cache_breakpoints(
+        [SystemMessage(content=system_message)] + supervisor_messages, **supervisor_model_config
+    )
 
     # Make decision about next research steps
+    supervisor_model_with_tools = get_model_with_tools(supervisor_tool_list, priority="critical", **supervisor_model_config)
     response = await supervisor_model_with_tools.ainvoke(messages)
 
     return Command(
         goto="supervisor_tools",
         update={
             "supervisor_messages": [response],
-            "research_iterations": state.get("research_iterations", 0) + 1
+            "research_iterations": state.get("research_iterations", 0) + 1,
+            "research_date": research_date
         }
     )
 
@@ -168,9 +180,9 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                 if tool_call["name"] == "ConductResearch"
             ]
 
-            # Handle think_tool calls (synchronous)
+            # Handle think_tool calls
             for tool_call in think_tool_calls:
-                observation = think_tool.invoke(tool_call["args"])
+                observation = await think_tool.ainvoke(tool_call["args"])
                 tool_messages.append(
                     ToolMessage(
                         content=observation,
@@ -181,27 +193,40 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
             # Handle ConductResearch calls (asynchronous)
             if conduct_research_calls:
-                # Launch parallel research agents
+                # Launch parallel research agents, each named and tagged with its
+                # topic so traces can tell the researchers apart
                 coros = [
-                    researcher_agent.ainvoke({
+                    researcher_agent.with_config(
+                        run_name="researcher",
+                        metadata={"research_topic": tool_call["args"]["research_topic"]},
+                    ).ainvoke({
                         "researcher_messages": [
                             HumanMessage(content=tool_call["args"]["research_topic"])
                         ],
-                        "research_topic": tool_call["args"]["research_topic"]
+                        "research_topic": tool_call["args"]["research_topic"],
+                        "research_date": state.get("research_date") or get_today_str()
                     }) 
                     for tool_call in conduct_research_calls
                 ]
 
                 # Wait for all research to complete
-                tool_results = await asyncio.gather(*coros)
+                if serialize_researchers:
+                    tool_results = [await coro for coro in coros]
+                else:
+                    tool_results = await asyncio.gather(*coros)
 
                 # Format research results as tool messages
                 # Each sub-agent returns compressed research findings in result["compressed_research"]
                 # We write this compressed research as the content of a ToolMessage, which allows
                 # the supervisor to later retrieve these findings via get_notes_from_tool_calls()
+                # A researcher stopped by one of its budgets returns partial findings,
+                # which is flagged so the supervisor can decide whether to follow up
                 research_tool_messages = [
                     ToolMessage(
-                        content=result.get("compressed_research", "Error synthesizing research report"),
+                        content=result.get("compressed_research", "Error synthesizing research report") + (
+                            f"\n\n[Partial research: the researcher's {result['budget_exhausted']} budget ran out]"
+                            if result.get("budget_exhausted") else ""
+                        ),
                         name=tool_call["name"],
                         tool_call_id=tool_call["id"]
                     ) for result, tool_call in zip(tool_results, conduct_research_calls)
@@ -0,0 +1,705 @@
+"""Offline Stand-Ins for Tavily, Chat Models and the MCP Filesystem Server.
+
+Drop-in fakes behind the interfaces the graphs already use, so every graph in
+langgraph.json runs end to end without API keys, network access or credits:
+
+- FakeTavilyClient / FakeAsyncTavilyClient serve search results from a fixture
+  corpus, with configurable raw-content sizes and injected latency
+- FakeChatModel plays the agents' scripted tool calls (supervisor delegation,
+  search / reflection rounds, file reads), answers structured-output requests
+  for the package's schemas and writes text responses citing the sources it
+  was shown, with a configurable latency distribution; prompts carrying
+  cache breakpoints report simulated prompt-cache reads and writes
+- OfflineMCPClient serves the filesystem tools the MCP agent expects from the
+  local research files directory
+
+Use offline_mode() as a context manager, call install_offline_stand_ins(), or
+set DEEP_RESEARCH_OFFLINE=1 before importing the package (e.g. for langgraph dev).
+Unless DEEP_RESEARCH_CACHE_DIR is set, offline runs use throwaway search and
+summary caches, so fake results never reach the persistent ones.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+from typing_extensions import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from deep_research_from_scratch import cache, models
+from deep_research_from_scratch.content_processing import count_tokens, tokenize
+
+# ===== CONFIGURATION =====
+
+# Fixture corpus served by the fake search clients
+search_corpus_path = Path(__file__).parent / "fixtures" / "search_corpus.json"
+
+# Site chrome wrapped around fake raw content when include_boilerplate is set
+fake_page_header = """Skip to main content
+[Home](https://example.com/) [News](https://example.com/news) [Guides](https://example.com/guides) [About](https://example.com/about)
+We use cookies to improve your experience. Accept all | Manage preferences
+"""
+fake_page_footer = """
+Subscribe to our newsletter
+Privacy Policy | Terms of Use | Cookie settings
+© 2025 Example Media. All rights reserved.
+"""
+
+# ===== LATENCY =====
+
+def sample_latency(rng: random.Random, median: float, sigma: float) -> float:
+    """Draw a latency in seconds from a lognormal distribution around median.
+
+    Args:
+        rng: Random number generator
+        median: Median latency in seconds (0 disables latency)
+        sigma: Spread of the distribution (0 gives a fixed latency)
+
+    Returns:
+        Latency in seconds
+    """
+    if median <= 0:
+        return 0.0
+    return rng.lognormvariate(0.0, sigma) * median if sigma > 0 else median
+
+def _stable_seed(*parts: Any) -> int:
+    """Derive a deterministic seed from values (independent of PYTHONHASHSEED)."""
+    return int(hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:12], 16)
+
+# ===== FAKE SEARCH =====
+
+class FakeTavilyClient:
+    """Stand-in for TavilyClient serving results from the fixture corpus."""
+
+    def __init__(
+        self,
+        corpus_path: Optional[Path] = None,
+        raw_content_tokens: Union[int, Tuple[int, int]] = (1500, 6000),
+        include_boilerplate: bool = True,
+        latency_median: float = 0.0,
+        latency_sigma: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """Load the corpus.
+
+        Args:
+            corpus_path: JSON list of documents with url, title, keywords and paragraphs
+            raw_content_tokens: Size of each page's raw content in tokens, or a
+                (min, max) range sampled per page
+            include_boilerplate: Whether to wrap raw content in site chrome
+            latency_median: Median latency per search in seconds
+            latency_sigma: Spread of the lognormal latency distribution
+            seed: Seed for latency sampling
+        """
+        self.corpus = json.loads(Path(corpus_path or search_corpus_path).read_text())
+        self.raw_content_tokens = raw_content_tokens
+        self.include_boilerplate = include_boilerplate
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.rng = random.Random(seed)
+        self.document_tokens = [
+            set(tokenize(" ".join([document["title"], document.get("keywords", "")] + document["paragraphs"])))
+            for document in self.corpus
+        ]
+
+    def raw_content(self, document: dict) -> str:
+        """Build the raw content of a page, identical every time the page is served."""
+        rng = random.Random(_stable_seed(document["url"], self.raw_content_tokens))
+        if isinstance(self.raw_content_tokens, int):
+            target_chars = self.raw_content_tokens * 4
+        else:
+            target_chars = rng.randint(*self.raw_content_tokens) * 4
+
+        sections = [f"# {document['title']}", *document["paragraphs"]]
+        section = 1
+        while sum(len(part) + 2 for part in sections) < target_chars:
+            section += 1
+            paragraphs = list(document["paragraphs"])
+            rng.shuffle(paragraphs)
+            sections.append(f"## {document['title']}, part {section}")
+            sections.extend(paragraphs)
+        content = "\n\n".join(sections)[:target_chars]
+
+        if self.include_boilerplate:
+            content = fake_page_header + content + fake_page_footer
+        return content
+
+    def _search(
+        self,
+        query: str,
+        max_results: int = 5,
+        include_raw_content: bool = False,
+        **kwargs: Any,
+    ) -> dict:
+        """Rank corpus documents by query term overlap and build a Tavily response."""
+        query_tokens = set(tokenize(query))
+        ranked = sorted(
+            range(len(self.corpus)),
+            key=lambda i: (
+                -len(query_tokens & self.document_tokens[i]),
+                _stable_seed(query, self.corpus[i]["url"]),
+            ),
+        )
+
+        results = []
+        for rank, i in enumerate(ranked[:max_results]):
+            document = self.corpus[i]
+            results.append({
+                "url": document["url"],
+                "title": document["title"],
+                "content": document["paragraphs"][0],
+                "score": round(1.0 / (rank + 1), 4),
+                "raw_content": self.raw_content(document) if include_raw_content else None,
+            })
+
+        return {
+            "query": query,
+            "follow_up_questions": None,
+            "answer": None,
+            "images": [],
+            "results": results,
+            "response_time": 0.0,
+        }
+
+    def search(self, query: str, **kwargs: Any) -> dict:
+        """Search the fixture corpus, sleeping for the injected latency."""
+        time.sleep(sample_latency(self.rng, self.latency_median, self.latency_sigma))
+        return self._search(query, **kwargs)
+
+class FakeAsyncTavilyClient(FakeTavilyClient):
+    """Stand-in for AsyncTavilyClient serving results from the fixture corpus."""
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        """Search the fixture corpus, awaiting the injected latency."""
+        await asyncio.sleep(sample_latency(self.rng, self.latency_median, self.latency_sigma))
+        return self._search(query, **kwargs)
+
+# ===== FAKE CHAT MODEL =====
+
+def _text(content: Any) -> str:
+    """Flatten message content (string or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return str(content)
+
+def _has_cache_breakpoint(content: Any) -> bool:
+    """Whether message content carries a prompt-cache breakpoint."""
+    return isinstance(content, list) and any(isinstance(block, dict) and "cache_control" in block for block in content)
+
+def _topic(messages: Sequence[BaseMessage]) -> str:
+    """Use the first line of the first human message as the topic of the conversation."""
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            for line in _text(message.content).splitlines():
+                if line.strip():
+                    return line.strip()[:160]
+    return "the research topic"
+
+def _sentences(text: str) -> List[str]:
+    """Split prose into sentences, skipping markup and very short fragments."""
+    sentences = []
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        sentence = " ".join(sentence.split())
+        if len(sentence) >= 40 and not re.search(r"[<>{}]|https?://|^#|^-{3,}", sentence):
+            sentences.append(sentence)
+    return sentences
+
+def synthesize_args(parameters: dict, text: str, required_only: bool = True) -> dict:
+    """Fill a JSON schema's properties with placeholder values.
+
+    Args:
+        parameters: JSON schema of the arguments
+        text: Value used for string fields
+        required_only: Only fill required properties
+
+    Returns:
+        Arguments matching the schema
+    """
+    properties = parameters.get("properties", {})
+    required = set(parameters.get("required", properties if not required_only else []))
+    args = {}
+    for name, schema in properties.items():
+        if name not in required:
+            continue
+        if "enum" in schema:
+            args[name] = schema["enum"][0]
+            continue
+        kind = schema.get("type")
+        if kind == "boolean":
+            args[name] = False
+        elif kind in ("integer", "number"):
+            args[name] = 1
+        elif kind == "array":
+            args[name] = []
+        elif kind == "object":
+            args[name] = {}
+        else:
+            args[name] = text
+    return args
+
+def _webpage_summary(messages: Sequence[BaseMessage]) -> dict:
+    text = _text(messages[-1].content)
+    match = re.search(r"<webpage_content>\s*(.*?)\s*</webpage_content>", text, re.DOTALL)
+    sentences = _sentences(match.group(1) if match else text)
+    summary = " ".join(sentences[:max(2, len(sentences) // 4)])[:1200]
+    return {"summary": summary or text[:500], "key_excerpts": ", ".join(sentences[:2])}
+
+def _packed_webpage_summaries(messages: Sequence[BaseMessage]) -> dict:
+    text = _text(messages[-1].content)
+    summaries = []
+    for page_id, content in re.findall(r'<webpage id="([^"]+)">\s*(.*?)\s*</webpage>', text, re.DOTALL):
+        sentences = _sentences(content)
+        summaries.append({
+            "page_id": page_id,
+            "summary": " ".join(sentences[:max(2, len(sentences) // 4)])[:1200] or content[:500],
+            "key_excerpts": ", ".join(sentences[:2]),
+        })
+    return {"summaries": summaries}
+
+def _research_question(messages: Sequence[BaseMessage]) -> dict:
+    requests = re.findall(r"^Human: (.+)$", _text(messages[-1].content), re.MULTILINE)
+    request = " ".join(requests) or _topic(messages)
+    return {"research_brief": f"I want a detailed, well-sourced report on the following request: {request}"}
+
+# Structured outputs for the package's schemas, keyed by schema name
+structured_output_scripts: Dict[str, Callable[[Sequence[BaseMessage]], dict]] = {
+    "ClarifyWithUser": lambda messages: {
+        "need_clarification": False,
+        "question": "",
+        "verification": "Thanks, I have enough information to start researching your request.",
+    },
+    "ResearchQuestion": _research_question,
+    "Summary": _webpage_summary,
+    "PageSummaries": _packed_webpage_summaries,
+}
+
+class FakeChatModel(BaseChatModel):
+    """Chat model stand-in producing scripted tool calls, structured outputs and text.
+
+    The script depends on the bound tools and on the conversation so far, so
+    one model drives every agent in the package:
+
+    - supervisor (ConductResearch bound): delegates research_fanout topics for
+      supervisor_rounds turns, then calls ResearchComplete
+    - search researcher (a *search* tool bound): alternates a search and a
+      think_tool reflection for search_rounds rounds, then stops
+    - MCP researcher (filesystem tools bound): lists the allowed directory,
+      reads up to file_reads files, reflects once, then stops
+    - structured output: answers from structured_outputs overrides or
+      structured_output_scripts, else placeholders from the schema
+    - plain text: a findings write-up citing the URLs in the conversation
+
+    Prompt caching is simulated the way Anthropic does it: the prefix up to
+    each cache breakpoint is written to a cache shared by every request to
+    the model, and a request reads the longest cached prefix of its prompt
+    that ends at or before its last breakpoint.
+    """
+
+    model: str = "fake"
+    latency_median: float = 0.0
+    latency_sigma: float = 0.0
+    seed: Optional[int] = None
+    search_rounds: int = 2
+    research_fanout: int = 2
+    supervisor_rounds: int = 1
+    file_reads: int = 3
+    response_tokens: int = 400
+    structured_outputs: Dict[str, Any] = {}
+
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+    _prompt_cache: set = PrivateAttr(default_factory=set)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Seed the latency generator."""
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        """Bind tools, passed to the model as OpenAI tool schemas."""
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return super().bind(tools=formatted_tools, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(sample_latency(self._rng, self.latency_median, self.latency_sigma))
+        return self._respond(messages, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(sample_latency(self._rng, self.latency_median, self.latency_sigma))
+        return self._respond(messages, **kwargs)
+
+    # --- responses ---
+
+    def _respond(
+        self,
+        messages: List[BaseMessage],
+        tools: Optional[List[dict]] = None,
+        tool_choice: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tool_specs = {tool["function"]["name"]: tool["function"] for tool in tools or []}
+
+        if tool_choice is not None and len(tool_specs) == 1:
+            # Structured output: a forced call of the schema's tool
+            name, spec = next(iter(tool_specs.items()))
+            calls = [(name, self.structured_args(name, spec.get("parameters", {}), messages))]
+        elif tool_specs:
+            calls = self.scripted_tool_calls(tool_specs, messages)
+        else:
+            calls = []
+
+        turn = sum(isinstance(message, AIMessage) for message in messages)
+        tool_calls = [
+            {
+                "name": name,
+                "args": args,
+                "id": "call_" + hashlib.sha1(repr((turn, i, name, args)).encode("utf-8")).hexdigest()[:16],
+                "type": "tool_call",
+            }
+            for i, (name, args) in enumerate(calls)
+        ]
+        content = "" if tool_calls else self.text_response(messages)
+
+        input_tokens = sum(count_tokens(_text(message.content)) for message in messages)
+        output_tokens = count_tokens(content + json.dumps([call["args"] for call in tool_calls]))
+        usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if any(_has_cache_breakpoint(message.content) for message in messages):
+            cache_read, cache_creation = self.prompt_cache_usage(messages, tools)
+            usage_metadata["input_token_details"] = {"cache_read": cache_read, "cache_creation": cache_creation}
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata=usage_metadata,
+            response_metadata={"model_name": self.model},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def prompt_cache_usage(self, messages: Sequence[BaseMessage], tools: Optional[List[dict]] = None) -> Tuple[int, int]:
+        """Simulate prompt caching for a prompt with cache breakpoints.
+
+        Returns:
+            Prompt tokens read from the cache and tokens written to it
+        """
+        # Prefix keys cover the tools, as Anthropic places tool definitions before the system prompt
+        digest = hashlib.sha1(json.dumps(tools or [], sort_keys=True).encode("utf-8"))
+        prefixes = []
+        tokens = 0
+        for message in messages:
+            text = _text(message.content)
+            digest.update(repr((message.type, text, getattr(message, "tool_calls", None))).encode("utf-8"))
+            tokens += count_tokens(text)
+            prefixes.append((digest.hexdigest(), tokens, _has_cache_breakpoint(message.content)))
+
+        last_breakpoint = max(i for i, (_, _, breakpoint) in enumerate(prefixes) if breakpoint)
+        cache_read = max((tokens for key, tokens, _ in prefixes[:last_breakpoint + 1] if key in self._prompt_cache), default=0)
+        self._prompt_cache.update(key for key, _, breakpoint in prefixes if breakpoint)
+        return cache_read, prefixes[last_breakpoint][1] - cache_read
+
+    def structured_args(self, name: str, parameters: dict, messages: Sequence[BaseMessage]) -> dict:
+        """Produce the arguments of a structured-output call for a schema."""
+        override = self.structured_outputs.get(name)
+        if override is not None:
+            return override(messages) if callable(override) else dict(override)
+        script = structured_output_scripts.get(name)
+        if script is not None:
+            return script(messages)
+        return synthesize_args(parameters, _topic(messages), required_only=False)
+
+    def scripted_tool_calls(self, tool_specs: Dict[str, dict], messages: Sequence[BaseMessage]) -> List[Tuple[str, dict]]:
+        """Decide the next tool calls of an agent from the bound tools and the conversation."""
+        topic = _topic(messages)
+        turn = sum(isinstance(message, AIMessage) for message in messages)
+
+        def call(name: str, text: str) -> Tuple[str, dict]:
+            return name, synthesize_args(tool_specs[name].get("parameters", {}), text)
+
+        if "ConductResearch" in tool_specs:
+            if turn < self.supervisor_rounds:
+                return [
+                    call("ConductResearch", f"{topic} (focus area {i + 1} of {self.research_fanout})")
+                    for i in range(self.research_fanout)
+                ]
+            return [call("ResearchComplete", "")] if "ResearchComplete" in tool_specs else []
+
+        if "list_directory" in tool_specs:
+            return self._file_tool_calls(tool_specs, messages, call)
+
+        search_tool = next((name for name in tool_specs if "search" in name), None)
+        if search_tool is not None:
+            if turn >= 2 * self.search_rounds:
+                return []
+            if turn % 2 == 1 and "think_tool" in tool_specs:
+                return [call("think_tool", f"Reflection after search round {turn // 2 + 1}: the results cover {topic}.")]
+            return [call(search_tool, f"{topic} {['overview', 'recent developments', 'expert analysis', 'statistics'][(turn // 2) % 4]}")]
+
+        # Unknown tools: call the first one once
+        if turn == 0:
+            name = next((name for name in tool_specs if name != "think_tool"), None)
+            return [call(name, topic)] if name else []
+        return []
+
+    def _file_tool_calls(self, tool_specs: Dict[str, dict], messages: Sequence[BaseMessage], call: Callable) -> List[Tuple[str, dict]]:
+        called = {
+            tool_call["name"]
+            for message in messages if isinstance(message, AIMessage)
+            for tool_call in message.tool_calls
+        }
+        outputs = {message.name: _text(message.content) for message in messages if isinstance(message, ToolMessage)}
+
+        if "list_allowed_directories" in tool_specs and "list_allowed_directories" not in called:
+            return [("list_allowed_directories", {})]
+        allowed = [line.strip() for line in outputs.get("list_allowed_directories", "").splitlines()[1:] if line.strip()]
+        directory = allowed[0] if allowed else "."
+
+        if "list_directory" not in called:
+            return [("list_directory", {"path": directory})]
+
+        read_tool = next((name for name in ("read_text_file", "read_file") if name in tool_specs), None)
+        if read_tool and read_tool not in called:
+            files = re.findall(r"^\[FILE\] (.+)$", outputs.get("list_directory", ""), re.MULTILINE)
+            if files:
+                return [(read_tool, {"path": f"{directory}/{name}"}) for name in files[:self.file_reads]]
+
+        if "think_tool" in tool_specs and "think_tool" not in called:
+            return [call("think_tool", f"Reflection: the local files cover {_topic(messages)}.")]
+        return []
+
+    def text_response(self, messages: Sequence[BaseMessage]) -> str:
+        """Write findings from the conversation's content, citing the URLs it contains."""
+        # Draw on tool results, else on findings embedded in the prompt, never on instructions
+        sources = [_text(message.content) for message in messages if isinstance(message, ToolMessage)]
+        if not sources:
+            sources = [
+                match
+                for message in messages if isinstance(message, HumanMessage)
+                for match in re.findall(r"<Findings>(.*?)</Findings>", _text(message.content), re.DOTALL)
+            ]
+
+        urls, sentences = [], []
+        for text in sources:
+            for url in re.findall(r"https?://[^\s<>()\[\]\"']+", text):
+                url = url.rstrip(".,;:")
+                if url not in urls:
+                    urls.append(url)
+            for sentence in _sentences(text):
+                if sentence not in sentences:
+                    sentences.append(sentence)
+
+        budget = self.response_tokens * 4
+        lines = [f"## Findings: {_topic(messages)}", ""]
+        for i, sentence in enumerate(sentences):
+            citation = f" [{i % len(urls) + 1}]" if urls else ""
+            lines.append(sentence + citation)
+            budget -= len(sentence)
+            if budget <= 0:
+                break
+        if urls:
+            lines += ["", "### Sources"] + [f"[{i}] {url}" for i, url in enumerate(urls[:10], 1)]
+        return "\n".join(lines)
+
+def fake_chat_model_factory(**options: Any) -> Callable[..., FakeChatModel]:
+    """Build a chat model factory with the same call signature as init_chat_model.
+
+    Args:
+        **options: FakeChatModel settings (latency, script sizes, structured outputs)
+
+    Returns:
+        Factory accepting a model spec (other model settings are ignored)
+    """
+    def build(model: str = "fake", **model_config: Any) -> FakeChatModel:
+        return FakeChatModel(model=model, **options)
+
+    return build
+
+# ===== FAKE MCP FILESYSTEM SERVER =====
+
+class OfflineMCPClient:
+    """Stand-in for MultiServerMCPClient serving filesystem tools from a local directory.
+
+    Provides the read-only subset of the MCP filesystem server used by the
+    MCP research agent, with the same tool names and output formats.
+    """
+
+    def __init__(self, connections: Optional[dict] = None, latency_median: float = 0.0, latency_sigma: float = 0.0, seed: Optional[int] = None):
+        """Take the served directory from the filesystem server's arguments.
+
+        Args:
+            connections: MCP server configuration (as passed to MultiServerMCPClient)
+            latency_median: Median latency per tool call in seconds
+            latency_sigma: Spread of the lognormal latency distribution
+            seed: Seed for latency sampling
+        """
+        args = (connections or {}).get("filesystem", {}).get("args") or [str(Path(__file__).parent / "files")]
+        self.root = Path(args[-1]).resolve()
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.rng = random.Random(seed)
+
+    def _resolve(self, path: str) -> Optional[Path]:
+        resolved = Path(path).expanduser().resolve()
+        return resolved if resolved == self.root or self.root in resolved.parents else None
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Return the filesystem tools."""
+        async def delay() -> None:
+            await asyncio.sleep(sample_latency(self.rng, self.latency_median, self.latency_sigma))
+
+        async def list_allowed_directories() -> str:
+            await delay()
+            return f"Allowed directories:\n{self.root}"
+
+        async def list_directory(path: str) -> str:
+            await delay()
+            directory = self._resolve(path)
+            if directory is None or not directory.is_dir():
+                return f"Error: Access denied or not a directory: {path}"
+            return "\n".join(
+                f"[{'DIR' if entry.is_dir() else 'FILE'}] {entry.name}" for entry in sorted(directory.iterdir())
+            )
+
+        async def read_file(path: str) -> str:
+            await delay()
+            file = self._resolve(path)
+            if file is None or not file.is_file():
+                return f"Error: Access denied or file not found: {path}"
+            return file.read_text()
+
+        return [
+            StructuredTool.from_function(
+                coroutine=list_allowed_directories,
+                name="list_allowed_directories",
+                description="Returns the list of directories that this server is allowed to access.",
+            ),
+            StructuredTool.from_function(
+                coroutine=list_directory,
+                name="list_directory",
+                description="Get a detailed listing of all files and directories in a specified path.",
+            ),
+            StructuredTool.from_function(
+                coroutine=read_file,
+                name="read_file",
+                description="Read the complete contents of a file from the file system.",
+            ),
+        ]
+
+# ===== INSTALLATION =====
+
+# Throwaway cache directories of the installed stand-ins, kept until they are
+# restored or the process exits (the DEEP_RESEARCH_OFFLINE hook never restores)
+_scratch_cache_dirs: List[tempfile.TemporaryDirectory] = []
+
+def install_offline_stand_ins(
+    model_options: Optional[dict] = None,
+    search_options: Optional[dict] = None,
+    mcp_options: Optional[dict] = None,
+) -> Callable[[], None]:
+    """Swap the model, Tavily and MCP factories for the offline stand-ins.
+
+    Unless DEEP_RESEARCH_CACHE_DIR is set, the search and summary caches are
+    also swapped for empty ones in a temporary directory.
+
+    Args:
+        model_options: FakeChatModel settings
+        search_options: FakeTavilyClient settings
+        mcp_options: OfflineMCPClient settings
+
+    Returns:
+        Function restoring the previous factories and caches
+    """
+    from deep_research_from_scratch import research_agent_mcp
+
+    saved = (
+        models.chat_model_factory,
+        models.tavily_client_factory,
+        models.async_tavily_client_factory,
+        research_agent_mcp.mcp_client_factory,
+    )
+    saved_caches = (cache.cache_dir, cache._search_cache, cache._summary_cache)
+    scratch_dir = None
+    if "DEEP_RESEARCH_CACHE_DIR" not in os.environ:
+        scratch_dir = tempfile.TemporaryDirectory(prefix="deep_research_offline_")
+        _scratch_cache_dirs.append(scratch_dir)
+        cache.cache_dir = Path(scratch_dir.name)
+        cache._search_cache = cache._summary_cache = None
+    search_options = search_options or {}
+    mcp_options = mcp_options or {}
+
+    models.chat_model_factory = fake_chat_model_factory(**(model_options or {}))
+    models.tavily_client_factory = lambda: FakeTavilyClient(**search_options)
+    models.async_tavily_client_factory = lambda: FakeAsyncTavilyClient(**search_options)
+    research_agent_mcp.mcp_client_factory = lambda connections: OfflineMCPClient(connections, **mcp_options)
+    models.clear_registry()
+    research_agent_mcp.reset_mcp_client()
+
+    def restore() -> None:
+        (
+            models.chat_model_factory,
+            models.tavily_client_factory,
+            models.async_tavily_client_factory,
+            research_agent_mcp.mcp_client_factory,
+        ) = saved
+        models.clear_registry()
+        research_agent_mcp.reset_mcp_client()
+        if scratch_dir is not None:
+            cache.cache_dir, cache._search_cache, cache._summary_cache = saved_caches
+            _scratch_cache_dirs.remove(scratch_dir)
+            scratch_dir.cleanup()
+
+    return restore
+
+@contextmanager
+def offline_mode(
+    model_options: Optional[dict] = None,
+    search_options: Optional[dict] = None,
+    mcp_options: Optional[dict] = None,
+) -> Iterator[None]:
+    """Run the code inside the block against the offline stand-ins.
+
+    Args:
+        model_options: FakeChatModel settings
+        search_options: FakeTavilyClient settings
+        mcp_options: OfflineMCPClient settings
+    """
+    restore = install_offline_stand_ins(model_options, search_options, mcp_options)
+    try:
+        yield
+    finally:
+        restore()
@@ -192,6 +192,67 @@ Remember, your goal is to create a summary that can be easily understood and uti
 Today's date is {date}.
 """
 
+reduce_webpage_summaries_prompt = """You are tasked with merging partial summaries of a single long webpage retrieved from a web search. The page was too large to summarize at once, so each consecutive section was summarized separately. Your goal is to combine these partial summaries into one summary of the whole page. This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
+
+Here are the partial summaries, in the order the sections appear on the page:
+
+<partial_summaries>
+{partial_summaries}
+</partial_summaries>
+
+Please follow these guidelines to create your merged summary:
+
+1. Identify and preserve the main topic or purpose of the webpage as a whole.
+2. Retain key facts, statistics, and data points from every section.
+3. Remove information that is repeated across sections, keeping it once.
+4. Maintain the order in which information appears on the page, unless a chronological order is clearer.
+5. Include relevant dates, names, and locations that are crucial to understanding the content.
+6. Select the most important key excerpts from the partial summaries, up to a maximum of 5, keeping them verbatim.
+
+Present your summary in the following format:
+
+```
+{{
+   "summary": "Your merged summary here, structured with appropriate paragraphs or bullet points as needed",
+   "key_excerpts": "First important quote or excerpt, Second important quote or excerpt, Third important quote or excerpt, ...Add more excerpts as needed, up to a maximum of 5"
+}}
+```
+
+Today's date is {date}.
+"""
+
+summarize_multiple_webpages_prompt = """You are tasked with summarizing the raw content of several webpages retrieved from a web search. Your goal is to create, for each webpage separately, a summary that preserves the most important information from that page. These summaries will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
+
+Here are the webpages, each wrapped in a tag with a unique id:
+
+{webpages}
+
+Please follow these guidelines for every webpage:
+
+1. Summarize each webpage independently. Never mix information from different webpages into one summary.
+2. Identify and preserve the main topic or purpose of the webpage.
+3. Retain key facts, statistics, and data points that are central to the content's message.
+4. Keep important quotes from credible sources or experts.
+5. Include relevant dates, names, and locations that are crucial to understanding the content.
+6. Aim for about 25-30 percent of the original length, unless the content is already concise.
+
+Return exactly one entry per webpage, in the order given, using this format:
+
+```
+{{
+   "summaries": [
+      {{
+         "page_id": "The id of the webpage, copied exactly",
+         "summary": "Your summary here, structured with appropriate paragraphs or bullet points as needed",
+         "key_excerpts": "First important quote or excerpt, Second important quote or excerpt, ...Add more excerpts as needed, up to a maximum of 5"
+      }}
+   ]
+}}
+```
+
+Today's date is {date}.
+"""
+
 # Research agent prompt for MCP (Model Context Protocol) file access
 research_agent_prompt_with_mcp = """You are a research assistant conducting research on the user's input topic using local files. For context, today's date is {date}.
 
@@ -5,83 +5,282 @@ This module implements a research agent that can perform iterative web searches
 and synthesis to answer complex research questions.
 """
 
+import asyncio
+import logging
+import re
+import time
+
 from pydantic import BaseModel, Field
 from typing_extensions import Literal
 
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
-from langchain.chat_models import init_chat_model
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, HumanMessage, ToolMessage, filter_messages
 
+from deep_research_from_scratch.content_processing import chunk_text, count_tokens
+from deep_research_from_scratch.models import add_cache_breakpoints, get_chat_model, get_model_with_tools
+from deep_research_from_scratch.scheduler import estimate_tokens, usage_tokens
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
 from deep_research_from_scratch.utils import tavily_search, get_today_str, think_tool
 from deep_research_from_scratch.prompts import research_agent_prompt, compress_research_system_prompt, compress_research_human_message
 
+logger = logging.getLogger(__name__)
+
 # ===== CONFIGURATION =====
 
 # Set up tools and model binding
 tools = [tavily_search, think_tool]
 tools_by_name = {tool.name: tool for tool in tools}
 
-# Initialize models
-model = init_chat_model(model="anthropic:claude-sonnet-4-20250514")
-model_with_tools = model.bind_tools(tools)
-summarization_model = init_chat_model(model="openai:gpt-4.1-mini")
-compress_model = init_chat_model(model="openai:gpt-4.1", max_tokens=32000) # model="anthropic:claude-sonnet-4-20250514", max_tokens=64000
+# Model configurations (models are built lazily by the model registry on first use)
+research_model_config = {"model": "anthropic:claude-sonnet-4-20250514"}
+compress_model_config = {"model": "openai:gpt-4.1", "max_tokens": 32000} # {"model": "anthropic:claude-sonnet-4-20250514", "max_tokens": 64000}
+
+# Maximum number of tool calls from one model turn executed at once
+max_concurrent_tool_calls = 4
+
+# Per-researcher budgets; once one is used up the researcher stops and compresses
+# what it has, so one runaway researcher cannot hold up the supervisor's barrier
+# Tool calls executed (searches and think_tool reflections)
+max_tool_calls = 12
+# Tokens of the researcher's own model turns (prompt plus completion, summed over turns)
+max_researcher_tokens = 150_000
+# Seconds from the researcher's first model turn until the research loop must stop
+researcher_deadline_seconds = 300.0
+
+# Context compaction: once the prompt of a model turn exceeds this many tokens, older
+# tool results are sent as digests (the state keeps them verbatim for compress_research)
+compaction_threshold_tokens = 24_000
+# Tool results at or below this many tokens are never worth compacting
+digest_max_tokens = 200
+# Characters kept of each source's summary in a search result digest
+digest_summary_chars = 200
+
+# ===== BUDGETS =====
+
+def exhausted_budget(tool_calls: int, tokens: int, deadline: float) -> str:
+    """Name the first budget a researcher has used up.
+
+    Args:
+        tool_calls: Tool calls executed so far
+        tokens: Tokens spent on model turns so far
+        deadline: Wall-clock time (time.time()) the research loop must stop by
+
+    Returns:
+        "tool_calls", "tokens" or "deadline", or an empty string while all budgets remain
+    """
+    if tool_calls >= max_tool_calls:
+        return "tool_calls"
+    if tokens >= max_researcher_tokens:
+        return "tokens"
+    if time.time() >= deadline:
+        return "deadline"
+    return ""
+
+# ===== CONTEXT COMPACTION =====
+
+_source_pattern = re.compile(r"^--- SOURCE [^\n]*---$\n^URL: [^\n]*$", re.MULTILINE)
+_summary_pattern = re.compile(r"<summary>\s*(.*?)\s*</summary>", re.DOTALL)
+
+def digest_tool_result(content: str) -> str:
+    """Shorten a tool result for resending in a later model turn.
+
+    Search results keep each source's header, URL and the start of its
+    summary, so the model still knows what it found and where; other results
+    keep their first digest_max_tokens tokens.
+    """
+    sources = list(_source_pattern.finditer(content))
+    if not sources:
+        return chunk_text(content, digest_max_tokens)[0] + "\n[... compacted]"
+
+    lines = ["[Compacted search results: sources found earlier, summaries shortened]"]
+    for source, following in zip(sources, sources[1:] + [None]):
+        block = content[source.end():following.start() if following else len(content)]
+        summary = _summary_pattern.search(block)
+        lines.append(source.group(0))
+        if summary:
+            text = " ".join(summary.group(1).split())
+            lines.append(text[:digest_summary_chars] + ("..." if len(text) > digest_summary_chars else ""))
+    return "\n".join(lines)
+
+def compact_messages(messages: list[BaseMessage], reserved_tokens: int = 0) -> list[BaseMessage]:
+    """Replace older tool results with digests once the history is too long.
+
+    Tool results are digested oldest first until the history, plus
+    reserved_tokens (e.g. the system prompt), fits compaction_threshold_tokens
+    or only the latest round is left. Because compaction always proceeds from
+    the oldest result, a result once digested stays digested as the history
+    grows, so the start of the prompt changes as rarely as possible.
+
+    The latest round (the tool results after the last AI message) is always
+    sent verbatim, and digested ToolMessages keep their tool_call_id, so
+    every tool call still has its result.
+
+    Args:
+        messages: Researcher message history
+        reserved_tokens: Tokens of the prompt outside the history
+
+    Returns:
+        The history to send to the model; the input is not modified
+    """
+    sizes = [count_tokens(str(message.content)) for message in messages]
+    total = reserved_tokens + sum(sizes)
+    if total <= compaction_threshold_tokens:
+        return messages
+
+    last_ai = max((i for i, message in enumerate(messages) if isinstance(message, AIMessage)), default=-1)
+    compacted = list(messages)
+    for i, message in enumerate(messages[:last_ai]):
+        if total <= compaction_threshold_tokens:
+            break
+        if isinstance(message, ToolMessage) and sizes[i] > digest_max_tokens:
+            digest = digest_tool_result(str(message.content))
+            compacted[i] = message.model_copy(update={"content": digest})
+            total -= sizes[i] - count_tokens(digest)
+    return compacted
 
 # ===== AGENT NODES =====
 
-def llm_call(state: ResearcherState):
+async def llm_call(state: ResearcherState):
     """Analyze current state and decide on next actions.
 
     The model analyzes the current conversation state and decides whether to:
     1. Call search tools to gather more information
     2. Provide a final answer based on gathered information
 
-    Returns updated state with the model's response.
+    The deadline starts with the first turn, and a turn still running at the
+    deadline is cancelled. Older tool results are sent as digests once the
+    history grows past compaction_threshold_tokens (see compact_messages).
+    The system prompt is dated once per run and the prompt carries
+    prompt-cache breakpoints, so each turn reads the previous turn's prompt
+    from the provider's cache.
+
+    Returns updated state with the model's response, the tokens spent so far
+    and the budget that has run out, if any.
     """
+    model_with_tools = get_model_with_tools(tools, priority="critical", **research_model_config)
+    deadline = state.get("deadline") or time.time() + researcher_deadline_seconds
+    research_date = state.get("research_date") or get_today_str()
+    system_prompt = research_agent_prompt.format(date=research_date)
+    messages = add_cache_breakpoints(
+        [SystemMessage(content=system_prompt)]
+        + compact_messages(state["researcher_messages"], reserved_tokens=count_tokens(system_prompt)),
+        **research_model_config,
+    )
+
+    try:
+        response = await asyncio.wait_for(model_with_tools.ainvoke(messages), max(0.0, deadline - time.time()))
+    except TimeoutError:
+        return {"deadline": deadline, "research_date": research_date, "budget_exhausted": "deadline"}
+
+    tokens_used = state.get("tokens_used", 0) + (usage_tokens(response) or estimate_tokens(messages + [response]))
+    # A turn without tool calls finishes the research, so no budget cut it short
+    budget_exhausted = (
+        exhausted_budget(state.get("tool_call_iterations", 0), tokens_used, deadline)
+        if response.tool_calls else ""
+    )
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": [response],
+        "tokens_used": tokens_used,
+        "deadline": deadline,
+        "research_date": research_date,
+        "budget_exhausted": budget_exhausted,
     }
 
-def tool_node(state: ResearcherState):
+async def tool_node(state: ResearcherState):
     """Execute all tool calls from the previous LLM response.
 
-    Executes all tool calls from the previous LLM responses.
-    Returns updated state with tool execution results.
+    Tool calls from one turn are independent, so they run concurrently, at
+    most max_concurrent_tool_calls at a time. A tool call that fails becomes
+    an error ToolMessage instead of aborting the turn, so the model can see
+    the failure and retry or move on. Calls beyond the remaining tool call
+    budget are skipped, and calls still running at the deadline are
+    cancelled; both are answered with error ToolMessages as well, so every
+    tool call keeps its ToolMessage.
+
+    Returns updated state with one ToolMessage per tool call, in call order,
+    the tool calls executed so far and the budget that has run out, if any.
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
+    semaphore = asyncio.Semaphore(max(1, max_concurrent_tool_calls))
+    executed = tool_calls[:max(0, max_tool_calls - state.get("tool_call_iterations", 0))]
+    deadline = state.get("deadline") or time.time() + researcher_deadline_seconds
 
-    # Execute all tool calls
-    observations = []
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observations.append(tool.invoke(tool_call["args"]))
+    def stopped(tool_call: dict, reason: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {tool_call['name']} not run: {reason}",
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+            status="error",
+        )
 
-    # Create tool message outputs
-    tool_outputs = [
-        ToolMessage(
+    async def execute_tool(tool_call: dict) -> ToolMessage:
+        async with semaphore:
+            try:
+                tool = tools_by_name[tool_call["name"]]
+                observation = await tool.ainvoke(tool_call["args"])
+            except Exception as e:
+                logger.warning("Tool %s failed: %r", tool_call["name"], e)
+                return ToolMessage(
+                    content=f"Error: {tool_call['name']} failed: {e!r}",
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                    status="error",
+                )
+
+        return ToolMessage(
             content=observation,
             name=tool_call["name"],
             tool_call_id=tool_call["id"]
-        ) for observation, tool_call in zip(observations, tool_calls)
-    ]
+        )
 
-    return {"researcher_messages": tool_outputs}
+    tasks = [asyncio.ensure_future(execute_tool(tool_call)) for tool_call in executed]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.time()))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
 
-def compress_research(state: ResearcherState) -> dict:
+    # Outputs follow call order regardless of completion order
+    tool_outputs = [
+        task.result() if not task.cancelled() else stopped(tool_call, "researcher deadline reached")
+        for task, tool_call in zip(tasks, executed)
+    ] + [stopped(tool_call, "tool call budget exhausted") for tool_call in tool_calls[len(executed):]]
+
+    tool_call_iterations = state.get("tool_call_iterations", 0) + len(executed)
+    return {
+        "researcher_messages": tool_outputs,
+        "tool_call_iterations": tool_call_iterations,
+        "budget_exhausted": exhausted_budget(tool_call_iterations, state.get("tokens_used", 0), deadline),
+    }
+
+async def compress_research(state: ResearcherState) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
     a compressed summary suitable for the supervisor's decision-making.
+    When a budget stopped the research, the summary is of the partial findings.
     """
 
-    system_message = compress_research_system_prompt.format(date=get_today_str())
-    messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
-    response = compress_model.invoke(messages)
+    researcher_messages = list(state.get("researcher_messages", []))
+    # A researcher stopped by a budget can end on a turn whose tool calls never ran;
+    # providers reject tool calls without results, so that turn is left out
+    if researcher_messages and getattr(researcher_messages[-1], "tool_calls", None):
+        researcher_messages = researcher_messages[:-1]
+
+    human_message = compress_research_human_message
+    if state.get("budget_exhausted"):
+        human_message += (
+            f"\n\nNote: the research was stopped early because its {state['budget_exhausted']} budget ran out. "
+            "Clean up the findings gathered so far and state what remains unresearched."
+        )
+
+    system_message = compress_research_system_prompt.format(date=state.get("research_date") or get_today_str())
+    messages = add_cache_breakpoints(
+        [SystemMessage(content=system_message)] + researcher_messages + [HumanMessage(content=human_message)],
+        **compress_model_config,
+    )
+    response = await get_chat_model(priority="bulk", **compress_model_config).ainvoke(messages)
 
     # Extract raw notes from tool and AI messages
     raw_notes = [
@@ -102,12 +301,17 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     """Determine whether to continue research or provide final answer.
 
     Determines whether the agent should continue the research loop or provide
-    a final answer based on whether the LLM made tool calls.
+    a final answer based on whether the LLM made tool calls and whether the
+    researcher's budgets allow another round.
 
     Returns:
         "tool_node": Continue to tool execution
         "compress_research": Stop and compress research
     """
+    # A used-up budget stops the loop even if the LLM asked for more tools
+    if state.get("budget_exhausted"):
+        return "compress_research"
+
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
@@ -117,6 +321,17 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     # Otherwise, we have a final answer
     return "compress_research"
 
+def should_resume(state: ResearcherState) -> Literal["llm_call", "compress_research"]:
+    """Determine whether to return to the LLM after tool execution.
+
+    Returns:
+        "llm_call": Continue the research loop
+        "compress_research": A budget ran out during tool execution; stop and compress research
+    """
+    if state.get("budget_exhausted"):
+        return "compress_research"
+    return "llm_call"
+
 # ===== GRAPH CONSTRUCTION =====
 
 # Build the agent workflow
@@ -137,7 +352,14 @@ agent_builder.add_conditional_edges(
         "compress_research": "compress_research", # Provide final answer
     },
 )
-agent_builder.add_edge("tool_node", "llm_call") # Loop back for more research
+agent_builder.add_conditional_edges(
+    "tool_node",
+    should_resume,
+    {
+        "llm_call": "llm_call", # Loop back for more research
+        "compress_research": "compress_research", # Budget used up
+    },
+)
 agent_builder.add_edge("compress_research", END)
 
 # Compile the agent
@@ -16,6 +16,7 @@ from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, START, END
 
 from deep_research_from_scratch.utils import get_today_str
+from deep_research_from_scratch.sources import unify_cited_urls
 from deep_research_from_scratch.prompts import final_report_generation_prompt
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import clarify_with_user, write_research_brief
@@ -23,8 +24,10 @@ from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
 
 # ===== Config =====
 
-from langchain.chat_models import init_chat_model
-writer_model = init_chat_model(model="openai:gpt-4.1", max_tokens=32000) # model="anthropic:claude-sonnet-4-20250514", max_tokens=64000
+from deep_research_from_scratch.models import get_chat_model
+
+# Model configuration (the model is built lazily by the model registry on first use)
+writer_model_config = {"model": "openai:gpt-4.1", "max_tokens": 32000} # {"model": "anthropic:claude-sonnet-4-20250514", "max_tokens": 64000}
 
 # ===== FINAL REPORT GENERATION =====
 
@@ -39,7 +42,8 @@ async def final_report_generation(state: AgentState):
 
     notes = state.get("notes", [])
 
-    findings = "\n".join(notes)
+    # Collapse URL variants of the same page so each source is cited once
+    findings = unify_cited_urls("\n".join(notes))
 
     final_report_prompt = final_report_generation_prompt.format(
         research_brief=state.get("research_brief", ""),
@@ -47,7 +51,7 @@ async def final_report_generation(state: AgentState):
         date=get_today_str()
     )
 
-    final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    final_report = await get_chat_model(**writer_model_config).ainvoke([HumanMessage(content=final_report_prompt)])
 
     return {
         "final_report": final_report.content, 
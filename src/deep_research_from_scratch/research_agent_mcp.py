@@ -18,11 +18,11 @@ import os
 
 from typing_extensions import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph, START, END
 
+from deep_research_from_scratch.models import get_chat_model, get_model_with_tools
 from deep_research_from_scratch.prompts import research_agent_prompt_with_mcp, compress_research_system_prompt, compress_research_human_message
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
 from deep_research_from_scratch.utils import get_today_str, think_tool, get_current_dir
@@ -42,6 +42,9 @@ mcp_config = {
     }
 }
 
+# Factory building the MCP client from mcp_config (swappable, e.g. for offline stand-ins)
+mcp_client_factory = MultiServerMCPClient
+
 # Global client variable - will be initialized lazily
 _client = None
 
@@ -49,12 +52,17 @@ def get_mcp_client():
     """Get or initialize MCP client lazily to avoid issues with LangGraph Platform."""
     global _client
     if _client is None:
-        _client = MultiServerMCPClient(mcp_config)
+        _client = mcp_client_factory(mcp_config)
     return _client
 
-# Initialize models
-compress_model = init_chat_model(model="openai:gpt-4.1", max_tokens=32000)
-model = init_chat_model(model="anthropic:claude-sonnet-4-20250514")
+def reset_mcp_client():
+    """Drop the MCP client so the next call builds it again, e.g. after changing the factory."""
+    global _client
+    _client = None
+
+# Model configurations (models are built lazily by the model registry on first use)
+compress_model_config = {"model": "openai:gpt-4.1", "max_tokens": 32000}
+research_model_config = {"model": "anthropic:claude-sonnet-4-20250514"}
 
 # ===== AGENT NODES =====
 
@@ -75,13 +83,13 @@ async def llm_call(state: ResearcherState):
     # Use MCP tools for local document access
     tools = mcp_tools + [think_tool]
 
-    # Initialize model with tool binding
-    model_with_tools = model.bind_tools(tools)
+    # Get model with tool binding (memoized by tool names)
+    model_with_tools = get_model_with_tools(tools, priority="critical", **research_model_config)
 
     # Process user input with system prompt
     return {
         "researcher_messages": [
-            model_with_tools.invoke(
+            await model_with_tools.ainvoke(
                 [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))] + state["researcher_messages"]
             )
         ]
@@ -112,13 +120,7 @@ async def tool_node(state: ResearcherState):
         observations = []
         for tool_call in tool_calls:
             tool = tools_by_name[tool_call["name"]]
-            if tool_call["name"] == "think_tool":
-                # think_tool is sync, use regular invoke
-                observation = tool.invoke(tool_call["args"])
-            else:
-                # MCP tools are async, use ainvoke
-                observation = await tool.ainvoke(tool_call["args"])
-            observations.append(observation)
+            observations.append(await tool.ainvoke(tool_call["args"]))
 
         # Format results as tool messages
         tool_outputs = [
@@ -136,7 +138,7 @@ async def tool_node(state: ResearcherState):
 
     return {"researcher_messages": messages}
 
-def compress_research(state: ResearcherState) -> dict:
+async def compress_research(state: ResearcherState) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
@@ -149,7 +151,7 @@ def compress_research(state: ResearcherState) -> dict:
     system_message = compress_research_system_prompt.format(date=get_today_str())
     messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
 
-    response = compress_model.invoke(messages)
+    response = await get_chat_model(priority="bulk", **compress_model_config).ainvoke(messages)
 
     # Extract raw notes from tool and AI messages
     raw_notes = [
@@ -12,11 +12,11 @@ whether sufficient context exists to proceed with research.
 from datetime import datetime
 from typing_extensions import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
+from deep_research_from_scratch.models import get_structured_output_model
 from deep_research_from_scratch.prompts import clarify_with_user_instructions, transform_messages_into_research_topic_prompt
 from deep_research_from_scratch.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, AgentInputState
 
@@ -28,12 +28,12 @@ def get_today_str() -> str:
 
 # ===== CONFIGURATION =====
 
-# Initialize model
-model = init_chat_model(model="openai:gpt-4.1", temperature=0.0)
+# Model configuration (the model is built lazily by the model registry on first use)
+model_config = {"model": "openai:gpt-4.1", "temperature": 0.0}
 
 # ===== WORKFLOW NODES =====
 
-def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brief", "__end__"]]:
+async def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brief", "__end__"]]:
     """
     Determine if the user's request contains sufficient information to proceed with research.
 
@@ -41,10 +41,10 @@ def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brie
     Routes to either research brief generation or ends with a clarification question.
     """
     # Set up structured output model
-    structured_output_model = model.with_structured_output(ClarifyWithUser)
+    structured_output_model = get_structured_output_model(ClarifyWithUser, **model_config)
 
     # Invoke the model with clarification instructions
-    response = structured_output_model.invoke([
+    response = await structured_output_model.ainvoke([
         HumanMessage(content=clarify_with_user_instructions.format(
             messages=get_buffer_string(messages=state["messages"]), 
             date=get_today_str()
@@ -63,7 +63,7 @@ def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brie
             update={"messages": [AIMessage(content=response.verification)]}
         )
 
-def write_research_brief(state: AgentState):
+async def write_research_brief(state: AgentState):
     """
     Transform the conversation history into a comprehensive research brief.
 
@@ -71,10 +71,10 @@ def write_research_brief(state: AgentState):
     and contains all necessary details for effective research.
     """
     # Set up structured output model
-    structured_output_model = model.with_structured_output(ResearchQuestion)
+    structured_output_model = get_structured_output_model(ResearchQuestion, **model_config)
 
     # Generate research brief from conversation history
-    response = structured_output_model.invoke([
+    response = await structured_output_model.ainvoke([
         HumanMessage(content=transform_messages_into_research_topic_prompt.format(
             messages=get_buffer_string(state.get("messages", [])),
             date=get_today_str()
@@ -0,0 +1,484 @@
+"""Rate-Limit-Aware Request Scheduler.
+
+Every model and search request goes through the scheduler of its provider
+(Anthropic, OpenAI, Tavily). Each scheduler admits requests through token
+buckets for requests per minute and tokens per minute, so parallel
+researchers share one budget instead of each discovering the limit with a
+429. When a provider still throttles, the whole provider backs off together,
+honoring Retry-After when the response carries one and otherwise using
+jittered exponential backoff, and the failed request is retried.
+
+Waiting requests are served by priority class (critical, normal, bulk) with
+aging, so critical-path calls overtake bulk summarization under contention.
+Schedulers are shared across threads and event loops: each waiter is woken
+through its own thread event or loop, never a shared loop-bound primitive.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from tavily.errors import UsageLimitExceededError
+from typing_extensions import Any, Awaitable, Callable, List, Optional
+
+from deep_research_from_scratch.content_processing import count_tokens
+
+# ===== CONFIGURATION =====
+
+# Requests-per-minute and tokens-per-minute limits per provider (None disables a limit),
+# and the maximum number of requests in flight at once
+rate_limits = {
+    "anthropic": {"requests_per_minute": 1000, "tokens_per_minute": 450000, "max_concurrent_requests": 8},
+    "openai": {"requests_per_minute": 5000, "tokens_per_minute": 450000, "max_concurrent_requests": 16},
+    "tavily": {"requests_per_minute": 100, "tokens_per_minute": None, "max_concurrent_requests": 10},
+}
+
+# Priority classes, served lowest value first: critical-path calls (supervisor,
+# researcher turns), ordinary calls, and bulk work that can wait (summaries, compression)
+priority_classes = {"critical": 0, "normal": 1, "bulk": 2}
+
+# Seconds of waiting after which a request is promoted by one priority class
+priority_aging_seconds = 10.0
+
+# Upper bound in seconds on how long a waiting request sleeps before re-checking the queue
+dispatch_poll_seconds = 1.0
+
+# Maximum number of retries for a throttled or failed request
+max_retries = 5
+
+# Base and maximum delay in seconds for exponential backoff
+backoff_base = 1.0
+backoff_max = 60.0
+
+# Status codes signalling the provider is throttling; the whole provider backs off
+throttle_status_codes = {429, 529}
+
+# Transient status codes retried with backoff for the failing request only
+retryable_status_codes = {500, 502, 503, 504}
+
+# ===== TOKEN BUCKETS =====
+
+class TokenBucket:
+    """Token bucket holding one minute of capacity, refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        """Create a full bucket.
+
+        Args:
+            per_minute: Capacity and refill rate per minute
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (amounts above capacity count as capacity)."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take amount from the bucket; a negative amount returns unused capacity."""
+        self.level = min(self.capacity, self.level - min(amount, self.capacity))
+
+# ===== ERROR CLASSIFICATION =====
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """Extract the HTTP status code of a provider error, if any."""
+    if isinstance(exc, UsageLimitExceededError):
+        return 429
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Read the delay requested by the provider from the error's response headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_connection_error(exc: BaseException) -> bool:
+    """Return whether an error is a transient connection failure or timeout."""
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout")
+
+def backoff_delay(attempt: int) -> float:
+    """Jittered exponential backoff for the given retry attempt (0-based)."""
+    cap = min(backoff_max, backoff_base * 2 ** attempt)
+    return cap / 2 + random.uniform(0, cap / 2)
+
+# ===== PROVIDER SCHEDULER =====
+
+class _Waiter:
+    """A request waiting for admission, woken from any thread or event loop."""
+
+    def __init__(self, priority: str, tokens: int, enqueued: float, asynchronous: bool):
+        """Create an ungranted waiter with an event for the caller's kind of wait."""
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = enqueued
+        self.granted = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop() if asynchronous else None
+        self.event: Any = asyncio.Event() if asynchronous else threading.Event()
+
+    def rank(self, now: float) -> float:
+        """Effective priority (lower is served first), improving as the request ages."""
+        return priority_classes[self.priority] - (now - self.enqueued) / priority_aging_seconds
+
+    def notify(self) -> None:
+        """Wake the waiting request."""
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.event.set)
+
+class ProviderScheduler:
+    """Admits, retries and accounts for the requests sent to one provider.
+
+    Waiting requests form a single dispatch queue served by priority class,
+    so critical-path calls go first whenever the concurrency limit, token
+    buckets or a throttling cooldown hold requests back. A waiting request is
+    promoted one class per priority_aging_seconds, so bulk work is never
+    starved.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrent_requests: Optional[int] = None,
+    ):
+        """Create a scheduler.
+
+        Args:
+            provider: Provider name, used in metrics
+            requests_per_minute: Request limit, or None for unlimited
+            tokens_per_minute: Token limit, or None for unlimited
+            max_concurrent_requests: Maximum requests in flight, or None for unlimited
+        """
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrent_requests = max_concurrent_requests
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "max_queue_depth": 0,
+            "admitted": 0,
+            "throttled": 0,
+            "retries": 0,
+            "wait_seconds": {priority: 0.0 for priority in priority_classes},
+        }
+
+    # --- admission ---
+
+    def _capacity_wait(self, tokens: int, now: float) -> float:
+        """Seconds until the buckets and cooldown allow a request of this size."""
+        wait = self.cooldown_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit waiting requests in priority order while capacity allows.
+
+        Must be called with the lock held.
+
+        Returns:
+            Seconds until capacity frees up for the next request, or None when
+            nothing is waiting or only a finishing request can free a slot
+        """
+        now = time.monotonic()
+        while self._waiters:
+            if self.max_concurrent_requests and self.in_flight >= self.max_concurrent_requests:
+                return None
+            head = min(self._waiters, key=lambda waiter: waiter.rank(now))
+            wait = self._capacity_wait(head.tokens, now)
+            if wait > 0:
+                return wait
+
+            self._waiters.remove(head)
+            if self.requests is not None:
+                self.requests.consume(1)
+            if self.tokens is not None and head.tokens:
+                self.tokens.consume(head.tokens)
+            self.in_flight += 1
+            self._stats["admitted"] += 1
+            self._stats["wait_seconds"][head.priority] += now - head.enqueued
+            head.granted = True
+            head.notify()
+        return None
+
+    def _enqueue(
+        self, priority: str, tokens: int, enqueued: Optional[float], asynchronous: bool
+    ) -> tuple[_Waiter, Optional[float]]:
+        if priority not in priority_classes:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {list(priority_classes)}")
+        waiter = _Waiter(priority, tokens, enqueued or time.monotonic(), asynchronous)
+        with self._lock:
+            self._waiters.append(waiter)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+            return waiter, self._dispatch()
+
+    def _poll(self, waiter: _Waiter) -> Optional[float]:
+        with self._lock:
+            return None if waiter.granted else self._dispatch()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Withdraw a waiter that gave up, returning its slot if it was already admitted."""
+        with self._lock:
+            if waiter.granted:
+                self.in_flight -= 1
+            else:
+                self._waiters.remove(waiter)
+            self._dispatch()
+
+    def acquire(self, priority: str = "normal", tokens: int = 0, enqueued: Optional[float] = None) -> None:
+        """Block until the request is admitted; pair with release()."""
+        waiter, wait = self._enqueue(priority, tokens, enqueued, asynchronous=False)
+        try:
+            while not waiter.granted:
+                waiter.event.wait(timeout=wait if wait is not None else dispatch_poll_seconds)
+                waiter.event.clear()
+                wait = self._poll(waiter)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def aacquire(self, priority: str = "normal", tokens: int = 0, enqueued: Optional[float] = None) -> None:
+        """Wait without blocking the event loop until the request is admitted; pair with release()."""
+        waiter, wait = self._enqueue(priority, tokens, enqueued, asynchronous=True)
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), wait if wait is not None else dispatch_poll_seconds)
+                except TimeoutError:
+                    pass
+                waiter.event.clear()
+                wait = self._poll(waiter)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self) -> None:
+        """Mark an admitted request as finished and admit the next waiting one."""
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the actual usage of a request is known."""
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.consume(actual_tokens - estimated_tokens)
+
+    # --- retries ---
+
+    def retry_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """Decide whether to retry a failed request.
+
+        Throttling errors put the whole provider into a cooldown; other
+        transient errors only delay the failing request.
+
+        Returns:
+            Seconds the failing request should sleep before retrying (0 when the
+            shared cooldown covers it), or None if it must not be retried
+        """
+        if attempt >= max_retries:
+            return None
+
+        status = error_status(exc)
+        if status in throttle_status_codes:
+            requested = retry_after(exc)
+            delay = requested + random.uniform(0, backoff_base) if requested is not None else backoff_delay(attempt)
+            with self._lock:
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+                self._stats["throttled"] += 1
+                self._stats["retries"] += 1
+            return 0.0
+
+        if status in retryable_status_codes or is_connection_error(exc):
+            with self._lock:
+                self._stats["retries"] += 1
+            return backoff_delay(attempt)
+
+        return None
+
+    def run(self, fn: Callable[[], Any], tokens: int = 0, priority: str = "normal") -> Any:
+        """Send a request through the scheduler, retrying throttled attempts.
+
+        Args:
+            fn: Function performing the request
+            tokens: Estimated tokens consumed by the request
+            priority: Priority class, one of priority_classes
+
+        Returns:
+            The function's result
+        """
+        # Retries keep their original position in the aging order
+        enqueued = time.monotonic()
+        attempt = 0
+        while True:
+            self.acquire(priority, tokens, enqueued)
+            try:
+                return fn()
+            except Exception as exc:
+                delay = self.retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def arun(self, fn: Callable[[], Awaitable[Any]], tokens: int = 0, priority: str = "normal") -> Any:
+        """Send an async request through the scheduler, retrying throttled attempts.
+
+        Args:
+            fn: Function returning a fresh awaitable for each attempt
+            tokens: Estimated tokens consumed by the request
+            priority: Priority class, one of priority_classes
+
+        Returns:
+            The awaited result
+        """
+        enqueued = time.monotonic()
+        attempt = 0
+        while True:
+            await self.aacquire(priority, tokens, enqueued)
+            try:
+                return await fn()
+            except Exception as exc:
+                delay = self.retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        """Return queue depth, admission, throttling, retry and per-priority wait counters."""
+        with self._lock:
+            queue_depth = {priority: 0 for priority in priority_classes}
+            for waiter in self._waiters:
+                queue_depth[waiter.priority] += 1
+            return {
+                "queue_depth": len(self._waiters),
+                "queue_depth_by_priority": queue_depth,
+                "in_flight": self.in_flight,
+                **self._stats,
+                "wait_seconds": dict(self._stats["wait_seconds"]),
+                "cooldown_seconds": max(0.0, self.cooldown_until - time.monotonic()),
+            }
+
+_schedulers: dict[str, ProviderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    """Get the process-wide scheduler for a provider, creating it on first use.
+
+    Providers without configured limits get a scheduler that only retries.
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            scheduler = _schedulers[provider] = ProviderScheduler(provider, **rate_limits.get(provider, {}))
+        return scheduler
+
+def scheduler_stats() -> dict:
+    """Return the metrics of every provider scheduler, keyed by provider."""
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {provider: scheduler.stats() for provider, scheduler in schedulers.items()}
+
+# ===== SCHEDULED MODELS =====
+
+def estimate_tokens(model_input: Any) -> int:
+    """Estimate the prompt tokens of a model input (string, messages or prompt value)."""
+    if hasattr(model_input, "to_messages"):
+        model_input = model_input.to_messages()
+    if isinstance(model_input, str):
+        return count_tokens(model_input)
+    if isinstance(model_input, list | tuple):
+        return sum(count_tokens(str(getattr(message, "content", message))) for message in model_input)
+    return count_tokens(str(model_input))
+
+def usage_tokens(output: Any) -> Optional[int]:
+    """Read the total tokens reported for a model response, if available."""
+    usage = getattr(output, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+class ScheduledRunnable(Runnable):
+    """Model runnable whose invocations go through a provider scheduler."""
+
+    def __init__(self, runnable: Runnable, scheduler: ProviderScheduler, priority: str = "normal"):
+        """Wrap a runnable.
+
+        Args:
+            runnable: Chat model, or a tool-bound / structured-output runnable
+            scheduler: Scheduler of the runnable's provider
+            priority: Priority class of the runnable's requests
+        """
+        self.runnable = runnable
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        """Invoke the wrapped runnable once the scheduler admits the request."""
+        tokens = estimate_tokens(input)
+        output = self.scheduler.run(
+            lambda: self.runnable.invoke(input, config, **kwargs), tokens, self.priority
+        )
+        actual = usage_tokens(output)
+        if actual is not None:
+            self.scheduler.record_usage(tokens, actual)
+        return output
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        """Asynchronously invoke the wrapped runnable once the scheduler admits the request."""
+        tokens = estimate_tokens(input)
+        output = await self.scheduler.arun(
+            lambda: self.runnable.ainvoke(input, config, **kwargs), tokens, self.priority
+        )
+        actual = usage_tokens(output)
+        if actual is not None:
+            self.scheduler.record_usage(tokens, actual)
+        return output
+
+    def bind_tools(self, *args: Any, **kwargs: Any) -> "ScheduledRunnable":
+        """Bind tools to the wrapped model, keeping the scheduling."""
+        return ScheduledRunnable(self.runnable.bind_tools(*args, **kwargs), self.scheduler, self.priority)
+
+    def with_structured_output(self, *args: Any, **kwargs: Any) -> "ScheduledRunnable":
+        """Bind a structured output schema to the wrapped model, keeping the scheduling."""
+        return ScheduledRunnable(self.runnable.with_structured_output(*args, **kwargs), self.scheduler, self.priority)
+
+    def __getattr__(self, name: str) -> Any:
+        """Expose the wrapped runnable's attributes (e.g. model_name)."""
+        if name == "runnable":
+            raise AttributeError(name)
+        return getattr(self.runnable, name)
@@ -0,0 +1,100 @@
+"""Single-Flight Coalescing of Duplicate Async Work.
+
+When the supervisor launches several researchers at once they frequently hit
+the same popular pages at the same moment. This module provides a process-wide
+in-flight registry: the first caller for a key does the work, and concurrent
+callers with the same key wait for that result instead of starting a duplicate
+LLM call.
+
+The registry is thread-safe and works across event loops, because sync tool
+nodes run their async pipelines on separate loops in LangGraph worker threads.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from typing_extensions import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Result handed to waiters when the leading call was cancelled, telling them to retry
+_RETRY = object()
+
+def _settle(future: Future, result: object = None, exception: Optional[BaseException] = None) -> None:
+    """Complete a shared future unless it is already done."""
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+class SingleFlight:
+    """Registry that coalesces concurrent calls sharing the same key."""
+
+    def __init__(self):
+        """Create an empty registry with zeroed counters."""
+        self.executed = 0
+        self.coalesced = 0
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or wait for the identical call that is already running.
+
+        Args:
+            key: Identity of the work, e.g. a content hash
+            fn: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of fn, possibly computed by another caller
+        """
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    self.executed += 1
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    leader = False
+
+            if not leader:
+                # Shielded so a cancelled waiter does not cancel the future the others share
+                result = await asyncio.shield(asyncio.wrap_future(future))
+                if result is _RETRY:
+                    continue
+                return result
+
+            try:
+                result = await fn()
+            except Exception as e:
+                _settle(future, exception=e)
+                raise
+            except BaseException:
+                # Cancelled leader: let waiters start their own attempt
+                _settle(future, _RETRY)
+                raise
+            else:
+                _settle(future, result)
+                return result
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Report how much duplicate work was avoided.
+
+        Returns:
+            Dictionary with executed and coalesced call counts and calls in flight
+        """
+        with self._lock:
+            in_flight = len(self._inflight)
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+        }
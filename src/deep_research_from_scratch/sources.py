@@ -0,0 +1,307 @@
+"""Canonical URLs and the Run-Level Source Index.
+
+Search results for the same page routinely arrive under different URLs:
+tracking parameters, fragments, trailing slashes, http vs https and www.
+variants. This module normalizes URLs to a canonical form and keeps an index
+mapping each canonical URL to the first result seen for it and a stable source
+id. Deduplication, the per-run summary memo and citation numbering all go
+through this index, so a page is summarized once and cited once.
+
+An index is scoped to a run: code can open an explicit scope with
+source_index_scope(), otherwise one index is kept per LangGraph thread_id,
+and runs without a thread_id get an index of their own for the lifetime of
+their root run.
+"""
+
+import contextvars
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import ensure_config
+from langchain_core.tracers.context import register_configure_hook
+from typing_extensions import Any, Iterator, List, Optional
+
+# ===== CONFIGURATION =====
+
+# Query parameters that only track where a visitor came from and never change the page
+tracking_params = {
+    "ref", "ref_src", "ref_url", "referrer", "source",
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "spm",
+}
+
+# Query parameter prefixes treated as tracking parameters
+tracking_param_prefixes = ("utm_",)
+
+# Maximum number of run-level indexes kept for LangGraph threads before the oldest is dropped
+max_tracked_runs = 256
+
+# ===== URL CANONICALIZATION =====
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so variants of the same page compare equal.
+
+    Forces https, lower-cases the host, strips a leading "www.", default ports,
+    fragments, tracking parameters and trailing slashes, and sorts the
+    remaining query parameters.
+
+    Args:
+        url: URL as returned by the search API
+
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in tracking_params and not key.lower().startswith(tracking_param_prefixes)
+    )
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+# ===== SOURCE INDEX =====
+
+class SourceIndex:
+    """Run-level index from canonical URLs to their first result and source id.
+
+    Source ids are assigned in order of first appearance and never change, so
+    the same page carries the same citation number across every search in the
+    run. The index also memoizes the processed (summarized) form of each page.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, url: str, result: Optional[dict] = None) -> dict:
+        """Register a URL, keeping the first result seen for its canonical form.
+
+        Args:
+            url: URL of the search result
+            result: Search result for the URL
+
+        Returns:
+            Index entry with "id", "url" (first URL seen) and "canonical_url"
+        """
+        canonical_url = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(canonical_url)
+            if entry is None:
+                entry = {
+                    "id": len(self._entries) + 1,
+                    "url": url,
+                    "canonical_url": canonical_url,
+                    "title": (result or {}).get("title", ""),
+                    "processed": None,
+                }
+                self._entries[canonical_url] = entry
+            return entry
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Find the index entry for any variant of a URL.
+
+        Args:
+            url: URL in any of its variant forms
+
+        Returns:
+            Index entry, or None if the page has not been seen in this run
+        """
+        with self._lock:
+            return self._entries.get(canonicalize_url(url))
+
+    def resolve(self, url: str) -> str:
+        """Map any variant of a URL to the URL first seen for that page.
+
+        Args:
+            url: URL in any of its variant forms
+
+        Returns:
+            First URL seen for the page, or the URL unchanged if unknown
+        """
+        entry = self.lookup(url)
+        return entry["url"] if entry else url
+
+    def get_processed(self, url: str) -> Optional[dict]:
+        """Return the processed result memoized for a page in this run, if any."""
+        entry = self.lookup(url)
+        return entry["processed"] if entry else None
+
+    def set_processed(self, url: str, processed: dict) -> None:
+        """Memoize the processed result for a page so later searches reuse it."""
+        self.register(url)["processed"] = processed
+
+    def sources(self) -> List[dict]:
+        """List every source in the run, ordered by source id."""
+        with self._lock:
+            return [
+                {"id": entry["id"], "url": entry["url"], "title": entry["title"]}
+                for entry in self._entries.values()
+            ]
+
+    def __len__(self) -> int:
+        """Return the number of distinct pages seen in the run."""
+        return len(self._entries)
+
+# Explicitly scoped index for the current run, if one was opened
+_active_index: contextvars.ContextVar[Optional[SourceIndex]] = contextvars.ContextVar(
+    "source_index", default=None
+)
+
+# Indexes for runs without an explicit scope, keyed by LangGraph thread_id
+_run_indexes: "OrderedDict[str, SourceIndex]" = OrderedDict()
+_run_indexes_lock = threading.Lock()
+
+class RootRunTracker(BaseCallbackHandler):
+    """Maps every active chain and tool run to its root run.
+
+    Runs without a thread_id are told apart by their root run: each root run
+    gets its own source index, dropped when the root run finishes.
+    """
+
+    # Called in the caller's thread or task, so a run is registered before its body runs
+    run_inline = True
+
+    def __init__(self):
+        """Create a tracker with no active runs."""
+        self.roots: dict = {}
+        self.indexes: dict = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: Any, parent_run_id: Any) -> None:
+        with self._lock:
+            self.roots[run_id] = self.roots.get(parent_run_id, parent_run_id or run_id)
+
+    def _end(self, run_id: Any) -> None:
+        with self._lock:
+            if self.roots.pop(run_id, None) == run_id:
+                self.indexes.pop(run_id, None)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        """Register a chain run under its root run."""
+        self._start(run_id, parent_run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        """Register a tool run under its root run."""
+        self._start(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        """Forget a finished chain run, and its root's index if it was the root."""
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        """Forget a failed chain run, and its root's index if it was the root."""
+        self._end(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        """Forget a finished tool run."""
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        """Forget a failed tool run."""
+        self._end(run_id)
+
+    def index_for(self, run_id: Any) -> Optional[SourceIndex]:
+        """Get the source index of the root run a run belongs to, or None for an unknown run."""
+        with self._lock:
+            root = self.roots.get(run_id)
+            if root is None:
+                return None
+            return self.indexes.setdefault(root, SourceIndex())
+
+# Attached to every run, so runs without a thread_id can be told apart
+_root_runs = RootRunTracker()
+_root_runs_var: contextvars.ContextVar[Optional[RootRunTracker]] = contextvars.ContextVar(
+    "source_index_root_runs", default=_root_runs
+)
+register_configure_hook(_root_runs_var, True)
+
+def get_source_index() -> SourceIndex:
+    """Get the source index for the current run.
+
+    Uses the index opened with source_index_scope() when there is one,
+    otherwise the index for the current LangGraph thread_id, and otherwise
+    the index of the current root run. Outside of any run a fresh index is
+    returned, so unrelated requests never share one.
+
+    Returns:
+        Source index shared by every search in the run
+    """
+    index = _active_index.get()
+    if index is not None:
+        return index
+
+    config = ensure_config()
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if thread_id is None:
+        run_id = getattr(config.get("callbacks"), "parent_run_id", None)
+        index = _root_runs.index_for(run_id) if run_id else None
+        return index if index is not None else SourceIndex()
+
+    with _run_indexes_lock:
+        index = _run_indexes.get(thread_id)
+        if index is None:
+            index = _run_indexes[thread_id] = SourceIndex()
+            while len(_run_indexes) > max_tracked_runs:
+                _run_indexes.popitem(last=False)
+        else:
+            _run_indexes.move_to_end(thread_id)
+        return index
+
+@contextmanager
+def source_index_scope() -> Iterator[SourceIndex]:
+    """Open a fresh source index for the code (and graph runs) inside the block.
+
+    Yields:
+        The new source index
+    """
+    index = SourceIndex()
+    token = _active_index.set(index)
+    try:
+        yield index
+    finally:
+        _active_index.reset(token)
+
+# ===== CITATIONS =====
+
+_url_pattern = re.compile(r"https?://[^\s<>()\[\]\"']+")
+
+def unify_cited_urls(text: str, index: Optional[SourceIndex] = None) -> str:
+    """Rewrite every URL in text to the first URL seen for its page.
+
+    Applied to research notes before the final report is written, so variants
+    of the same page collapse to one URL and receive a single citation.
+
+    Args:
+        text: Text containing URLs
+        index: Source index to resolve against (defaults to the current run's)
+
+    Returns:
+        Text with URL variants replaced
+    """
+    index = index if index is not None else get_source_index()
+
+    def replace(match: re.Match) -> str:
+        url = match.group(0)
+        trailing = ""
+        while url and url[-1] in ".,;:!?":
+            url, trailing = url[:-1], url[-1] + trailing
+        return index.resolve(url) + trailing
+
+    return _url_pattern.sub(replace, text)
@@ -32,6 +32,8 @@ class SupervisorState(TypedDict):
     research_iterations: int = 0
     # Raw unprocessed research notes collected from sub-agent research
     raw_notes: Annotated[list[str], operator.add] = []
+    # Date the prompts are formatted with, fixed for the run so prompt prefixes stay cacheable
+    research_date: str
 
 @tool
 class ConductResearch(BaseModel):
@@ -18,12 +18,20 @@ class ResearcherState(TypedDict):
     """
     State for the research agent containing message history and research metadata.
 
-    This state tracks the researcher's conversation, iteration count for limiting
-    tool calls, the research topic being investigated, compressed findings,
-    and raw research notes for detailed analysis.
+    This state tracks the researcher's conversation, the tool calls and tokens
+    spent against the researcher's budgets and its wall-clock deadline, the
+    date its prompts are written for, the research topic being investigated,
+    compressed findings, and raw research notes for detailed analysis.
     """
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
     tool_call_iterations: int
+    tokens_used: int
+    # Wall-clock time (time.time()) by which the research loop must stop
+    deadline: float
+    # Budget that stopped the research loop ("tool_calls", "tokens" or "deadline"), empty if none
+    budget_exhausted: str
+    # Date the prompts are formatted with, fixed for the run so prompt prefixes stay cacheable
+    research_date: str
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
@@ -33,11 +41,13 @@ class ResearcherOutputState(TypedDict):
     Output state for the research agent containing final research results.
 
     This represents the final output of the research process with compressed
-    research findings and all raw notes from the research process.
+    research findings, all raw notes from the research process, and the budget
+    that cut the research short, if any.
     """
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
+    budget_exhausted: str
 
 # ===== STRUCTURED OUTPUT SCHEMAS =====
 
@@ -63,3 +73,13 @@ class Summary(BaseModel):
     """Schema for webpage content summarization."""
     summary: str = Field(description="Concise summary of the webpage content")
     key_excerpts: str = Field(description="Important quotes and excerpts from the content")
+
+class PageSummary(BaseModel):
+    """Schema for the summary of one webpage within a batched summarization request."""
+    page_id: str = Field(description="The id attribute of the webpage being summarized, copied exactly")
+    summary: str = Field(description="Concise summary of the webpage content")
+    key_excerpts: str = Field(description="Important quotes and excerpts from the content")
+
+class PageSummaries(BaseModel):
+    """Schema for batched summarization of several webpages in one request."""
+    summaries: List[PageSummary] = Field(description="One summary per webpage, in the order the webpages were given")
@@ -0,0 +1,485 @@
+"""Tracing and Latency Instrumentation.
+
+A LangChain callback handler that records a span for every graph, graph node,
+model call and tool call of a run, plus explicit spans for the searches and
+page summarizations made inside the research tools. Spans form a tree (each
+span knows its parent), so a run can be broken down into where its time went,
+including the parallel researchers launched by supervisor_tools.
+
+Each span captures its start and end time and status; model spans add tokens
+in and out, prompt-cache reads and writes, and the time to first token when
+the model streams (e.g. under the LangGraph server or stream_mode="messages").
+Search and summarization spans record whether they were served from cache.
+
+Finished spans are appended to a JSON-lines file and aggregated into
+process-wide metrics, which can be served in the Prometheus text format.
+
+Usage:
+    with trace_run("trace.jsonl") as tracer:
+        await agent.ainvoke(...)
+
+or set DEEP_RESEARCH_TRACE_FILE (and optionally DEEP_RESEARCH_METRICS_PORT)
+before importing the package to trace every run.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.errors import GraphBubbleUp
+from typing_extensions import Any, Iterator, Optional, Union
+
+# ===== CONFIGURATION =====
+
+# JSON-lines file every traced run appends its spans to (tracing is off when unset)
+trace_path = os.getenv("DEEP_RESEARCH_TRACE_FILE")
+
+# Port of the Prometheus metrics endpoint started on import (off when unset)
+metrics_port = int(os.getenv("DEEP_RESEARCH_METRICS_PORT", "0")) or None
+
+# Run metadata copied onto subgraph spans, e.g. the topic of each parallel researcher
+traced_metadata_keys = ("research_topic",)
+
+# Histogram buckets for span durations and time to first token, in seconds
+latency_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+metric_help = {
+    "deep_research_spans_total": ("counter", "Finished spans by kind, name and status"),
+    "deep_research_span_duration_seconds": ("histogram", "Span durations by kind and name"),
+    "deep_research_llm_tokens_total": ("counter", "Model tokens by model and type (input, output, cache_read, cache_creation)"),
+    "deep_research_llm_time_to_first_token_seconds": ("histogram", "Time to first streamed token by model"),
+    "deep_research_cache_requests_total": ("counter", "Search and summary cache lookups by result"),
+    "deep_research_scheduler_queue_depth": ("gauge", "Requests waiting for admission by provider"),
+    "deep_research_scheduler_in_flight": ("gauge", "Admitted requests in flight by provider"),
+}
+
+# ===== METRICS =====
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+class Metrics:
+    """Process-wide counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple = latency_buckets):
+        """Create empty metrics with the given histogram bucket bounds (seconds)."""
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._histograms: dict[tuple, list] = {}
+
+    def inc(self, name: str, labels: dict, value: float = 1.0) -> None:
+        """Add to a counter."""
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        """Record a histogram observation."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self, gauges: Optional[dict] = None) -> str:
+        """Render every metric, plus the given gauges ({(name, labels): value}), as Prometheus text."""
+        with self._lock:
+            samples = defaultdict(list)
+            for (name, labels), value in self._counters.items():
+                samples[name].append(f"{name}{_label_text(labels)} {value:g}")
+            for (name, labels), (counts, total, count) in self._histograms.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    samples[name].append(f"{name}_bucket{_label_text(labels + (('le', f'{bound:g}'),))} {bucket_count}")
+                samples[name].append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {count}")
+                samples[name].append(f"{name}_sum{_label_text(labels)} {total:g}")
+                samples[name].append(f"{name}_count{_label_text(labels)} {count}")
+        for (name, labels), value in (gauges or {}).items():
+            samples[name].append(f"{name}{_label_text(labels)} {value:g}")
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, description = metric_help.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(sorted(samples[name]))
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+# Process-wide registry fed by every tracer
+metrics = Metrics()
+
+def record_span_metrics(span: dict) -> None:
+    """Aggregate a finished span into the process-wide metrics."""
+    # Graph, node and model spans are labelled by node path, the others by their own name
+    by_path = span["kind"] in ("graph", "node", "llm") and span["path"]
+    labels = {"kind": span["kind"], "name": span["path"] if by_path else span["name"]}
+    attributes = span["attributes"]
+    metrics.inc("deep_research_spans_total", {**labels, "status": span["status"]})
+    metrics.observe("deep_research_span_duration_seconds", labels, span["duration"])
+
+    if span["kind"] == "llm":
+        model = attributes.get("model") or "unknown"
+        for token_type in ("input", "output", "cache_read", "cache_creation"):
+            if attributes.get(f"{token_type}_tokens"):
+                metrics.inc("deep_research_llm_tokens_total", {"model": model, "type": token_type}, attributes[f"{token_type}_tokens"])
+        if attributes.get("ttft_seconds") is not None:
+            metrics.observe("deep_research_llm_time_to_first_token_seconds", {"model": model}, attributes["ttft_seconds"])
+
+    if "cache_hit" in attributes:
+        metrics.inc("deep_research_cache_requests_total", {**labels, "result": "hit" if attributes["cache_hit"] else "miss"})
+
+def prometheus_text() -> str:
+    """Render the span metrics and the request schedulers' queue gauges as Prometheus text."""
+    from deep_research_from_scratch.scheduler import scheduler_stats
+
+    gauges = {}
+    for provider, stats in scheduler_stats().items():
+        gauges[("deep_research_scheduler_queue_depth", (("provider", provider),))] = stats["queue_depth"]
+        gauges[("deep_research_scheduler_in_flight", (("provider", provider),))] = stats["in_flight"]
+    return metrics.render(gauges)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: Optional[int] = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve the metrics at /metrics from a background thread.
+
+    Args:
+        port: Port to listen on (defaults to metrics_port, or 9464)
+        host: Interface to bind
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer((host, port or metrics_port or 9464), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="deep-research-metrics", daemon=True).start()
+    return server
+
+# ===== TRACER =====
+
+def node_path(metadata: dict) -> Optional[str]:
+    """Label a graph node by its position in nested graphs, e.g. supervisor_tools/llm_call.
+
+    Parallel subgraph runs share a label, so their spans aggregate together.
+    """
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    parts = [part.split(":")[0] for part in namespace.split("|") if part]
+    return "/".join(part for part in parts if not part.isdigit()) or metadata.get("langgraph_node")
+
+def llm_usage(response: Any) -> dict:
+    """Sum the token usage reported by every generation of a model response."""
+    usage = {"input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0, "cache_creation_tokens": 0}
+    for generations in response.generations:
+        for generation in generations:
+            usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            details = usage_metadata.get("input_token_details") or {}
+            usage["input_tokens"] += usage_metadata.get("input_tokens", 0)
+            usage["output_tokens"] += usage_metadata.get("output_tokens", 0)
+            usage["cache_read_tokens"] += details.get("cache_read", 0)
+            usage["cache_creation_tokens"] += details.get("cache_creation", 0)
+    return usage
+
+class Tracer(BaseCallbackHandler):
+    """Records graph, node, model and tool spans of a run from LangChain callbacks."""
+
+    # Called directly in the caller's thread or task, so timestamps and context variables are exact
+    run_inline = True
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, write_metrics: bool = True):
+        """Create a tracer for one run.
+
+        Args:
+            path: JSON-lines file finished spans are appended to (defaults to trace_path;
+                spans are only kept in memory when neither is set)
+            write_metrics: Whether finished spans feed the process-wide metrics
+        """
+        path = path or trace_path
+        self.path = Path(path) if path else None
+        self.write_metrics = write_metrics
+        self.trace_id = uuid.uuid4().hex
+        self.spans: list[dict] = []
+        self._open: dict[str, dict] = {}
+        # Parent run id, name and start time of every run in progress
+        self._runs: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    # --- span bookkeeping ---
+
+    def _resolve_parent(self, parent_run_id: Optional[uuid.UUID]) -> Optional[str]:
+        """Find the nearest open span among a run's ancestors, preferring an explicit span."""
+        current = _current_span.get()
+        if current is not None and current[0] is self and current[1] in self._open:
+            return current[1]
+        run_id = str(parent_run_id) if parent_run_id else None
+        while run_id is not None and run_id not in self._open:
+            run_id = self._runs.get(run_id, (None,))[0]
+        return run_id
+
+    def start_span(
+        self,
+        span_id: str,
+        name: str,
+        kind: str,
+        parent_id: Optional[str],
+        path: Optional[str] = None,
+        start: Optional[float] = None,
+        **attributes: Any,
+    ) -> dict:
+        """Open a span and return its record (explicit spans inherit their parent's path)."""
+        if path is None and parent_id in self._open:
+            path = self._open[parent_id]["path"]
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "kind": kind,
+            "path": path,
+            "start": start or time.time(),
+            "end": None,
+            "duration": None,
+            "status": "ok",
+            "error": None,
+            "attributes": attributes,
+        }
+        with self._lock:
+            self._open[span_id] = span
+        return span
+
+    def end_span(self, span_id: str, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        """Close a span, then export it."""
+        with self._lock:
+            span = self._open.pop(span_id, None)
+            self._runs.pop(span_id, None)
+            if span is None:
+                return
+            span["end"] = time.time()
+            span["duration"] = span["end"] - span["start"]
+            span["attributes"].update(attributes)
+            # Interrupts and Command(goto=...) to a parent graph are control flow, not failures
+            if error is not None and not isinstance(error, GraphBubbleUp):
+                span["status"] = "error"
+                span["error"] = f"{type(error).__name__}: {error}"
+            self.spans.append(span)
+            if self.path is not None:
+                with self.path.open("a") as file:
+                    file.write(json.dumps(span, default=str) + "\n")
+        if self.write_metrics:
+            record_span_metrics(span)
+
+    def _track(self, run_id: uuid.UUID, parent_run_id: Optional[uuid.UUID], name: Optional[str] = None) -> str:
+        run_id = str(run_id)
+        with self._lock:
+            self._runs[run_id] = (str(parent_run_id) if parent_run_id else None, name, time.time())
+        return run_id
+
+    def _forget(self, run_id: uuid.UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        run_id = str(run_id)
+        if run_id in self._open:
+            self.end_span(run_id, error, **attributes)
+        else:
+            with self._lock:
+                self._runs.pop(run_id, None)
+
+    # --- graphs and nodes ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, name=None, **kwargs):
+        """Open a span for a graph run or a graph node, and for a subgraph on its first node."""
+        metadata = metadata or {}
+        span_id = self._track(run_id, parent_run_id, name)
+        node = metadata.get("langgraph_node")
+
+        if parent_run_id is None:
+            self.start_span(span_id, name or "graph", "graph", None)
+        elif node and name == node:
+            # A node's parent run is its graph's run: open a span for subgraphs on their first node
+            parent_id = str(parent_run_id)
+            if parent_id not in self._open and parent_id in self._runs:
+                graph_parent, graph_name, graph_start = self._runs[parent_id]
+                namespace = metadata.get("langgraph_checkpoint_ns") or ""
+                self.start_span(
+                    parent_id, graph_name or "subgraph", "graph", self._resolve_parent(graph_parent),
+                    path=node_path(metadata).rpartition("/")[0] or None, start=graph_start,
+                    namespace=namespace.rpartition("|")[0],
+                    **{key: metadata[key] for key in traced_metadata_keys if key in metadata},
+                )
+            self.start_span(
+                span_id, node, "node", parent_id, path=node_path(metadata),
+                step=metadata.get("langgraph_step"), namespace=metadata.get("langgraph_checkpoint_ns"),
+            )
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        """Close the run's span, if it has one."""
+        self._forget(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        """Close the run's span, if it has one, recording the error."""
+        self._forget(run_id, error)
+
+    # --- model calls ---
+
+    def _start_llm(self, serialized, run_id, parent_run_id, metadata) -> None:
+        metadata = metadata or {}
+        span_id = self._track(run_id, parent_run_id)
+        model = metadata.get("ls_model_name") or (serialized or {}).get("name") or "unknown"
+        self.start_span(
+            span_id, model, "llm", self._resolve_parent(parent_run_id), path=node_path(metadata),
+            model=model, provider=metadata.get("ls_provider"), ttft_seconds=None,
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Open a span for a chat model call."""
+        self._start_llm(serialized, run_id, parent_run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Open a span for a completion model call."""
+        self._start_llm(serialized, run_id, parent_run_id, metadata)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        """Record the time to the first streamed token."""
+        span = self._open.get(str(run_id))
+        if span is not None and span["attributes"].get("ttft_seconds") is None:
+            span["attributes"]["ttft_seconds"] = time.time() - span["start"]
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        """Close the model call's span with its token usage."""
+        self._forget(run_id, **llm_usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        """Close the model call's span, recording the error."""
+        self._forget(run_id, error)
+
+    # --- tool calls ---
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Open a span for a tool call."""
+        span_id = self._track(run_id, parent_run_id)
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self.start_span(span_id, name, "tool", self._resolve_parent(parent_run_id), path=node_path(metadata or {}))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        """Close the tool call's span."""
+        self._forget(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        """Close the tool call's span, recording the error."""
+        self._forget(run_id, error)
+
+# ===== RUN AND SPAN CONTEXT =====
+
+# Tracer added to every run started in this context (see trace_run)
+_tracer_var: ContextVar[Optional[Tracer]] = ContextVar("deep_research_tracer", default=None)
+
+# Innermost explicit span, as (tracer, span id)
+_current_span: ContextVar[Optional[tuple]] = ContextVar("deep_research_span", default=None)
+
+# Attach the context's tracer to every run, or a new one per run when a trace file or
+# the metrics endpoint is configured
+register_configure_hook(
+    _tracer_var, True, Tracer,
+    "DEEP_RESEARCH_METRICS_PORT" if metrics_port and not trace_path else "DEEP_RESEARCH_TRACE_FILE",
+)
+
+@contextmanager
+def trace_run(path: Optional[Union[str, Path]] = None) -> Iterator[Tracer]:
+    """Trace every run started inside the block.
+
+    Args:
+        path: JSON-lines file spans are appended to (defaults to trace_path)
+
+    Yields:
+        The tracer; its spans attribute holds the finished spans
+    """
+    tracer = Tracer(path)
+    token = _tracer_var.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer_var.reset(token)
+
+def _active_tracer() -> Optional[tuple]:
+    """Find the tracer of the current run and the span new spans belong to."""
+    current = _current_span.get()
+    if current is not None:
+        return current
+
+    # Inside a node or tool, the run's callbacks are in the child runnable config
+    config = var_child_runnable_config.get() or {}
+    callbacks = config.get("callbacks")
+    handlers = getattr(callbacks, "handlers", None) or (callbacks if isinstance(callbacks, list) else [])
+    for handler in handlers:
+        if isinstance(handler, Tracer):
+            return handler, handler._resolve_parent(getattr(callbacks, "parent_run_id", None))
+
+    tracer = _tracer_var.get()
+    return (tracer, None) if tracer is not None else None
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[dict]:
+    """Record the enclosed block as a span of the current run.
+
+    Does nothing when the run is not traced. Model calls made inside the block
+    become children of the span.
+
+    Args:
+        name: Span name, e.g. "tavily_search"
+        kind: Span kind, e.g. "search" or "summarization"
+        **attributes: Initial span attributes
+
+    Yields:
+        The span's attributes, which the block may update (e.g. cache_hit)
+    """
+    active = _active_tracer()
+    if active is None:
+        yield attributes
+        return
+
+    tracer, parent_id = active
+    span_id = uuid.uuid4().hex
+    record = tracer.start_span(span_id, name, kind, parent_id, **attributes)
+    token = _current_span.set((tracer, span_id))
+    try:
+        yield record["attributes"]
+    except BaseException as e:
+        tracer.end_span(span_id, e)
+        raise
+    else:
+        tracer.end_span(span_id)
+    finally:
+        _current_span.reset(token)
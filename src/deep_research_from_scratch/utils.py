@@ -5,18 +5,45 @@ This module provides search and content processing utilities for the research ag
 including web search capabilities and content summarization tools.
 """
 
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing_extensions import Annotated, List, Literal
+from typing_extensions import Annotated, Dict, List, Literal, Optional
 
-from langchain.chat_models import init_chat_model 
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool, InjectedToolArg
-from tavily import TavilyClient
 
-from deep_research_from_scratch.state_research import Summary
-from deep_research_from_scratch.prompts import summarize_webpage_prompt
+from deep_research_from_scratch.cache import get_search_cache, get_summary_cache, summary_cache_key
+from deep_research_from_scratch.content_processing import (
+    chunk_text,
+    clean_search_results,
+    collapse_near_duplicates,
+    count_tokens,
+    filter_page_content,
+)
+from deep_research_from_scratch.models import (
+    get_async_tavily_client,
+    get_chat_model,
+    get_structured_output_model,
+    get_tavily_client,
+)
+from deep_research_from_scratch.scheduler import get_scheduler
+from deep_research_from_scratch.singleflight import SingleFlight
+from deep_research_from_scratch.sources import SourceIndex, get_source_index
+from deep_research_from_scratch.state_research import PageSummaries, Summary
+from deep_research_from_scratch.tracing import span
+from deep_research_from_scratch.prompts import (
+    reduce_webpage_summaries_prompt,
+    summarize_multiple_webpages_prompt,
+    summarize_webpage_prompt,
+)
+
+logger = logging.getLogger(__name__)
 
 # ===== UTILITY FUNCTIONS =====
 
@@ -37,13 +64,130 @@ def get_current_dir() -> Path:
     except NameError:  # __file__ is not defined
         return Path.cwd()
 
+def run_async(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Uses asyncio.run when no event loop is active in the current thread (scripts,
+    LangGraph worker threads). When a loop is already running (e.g. Jupyter), the
+    coroutine is run on a fresh loop in a helper thread instead, carrying over
+    the caller's context variables.
+
+    Args:
+        coro: Coroutine to execute
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
 # ===== CONFIGURATION =====
 
-summarization_model = init_chat_model(model="openai:gpt-4.1-mini")
-tavily_client = TavilyClient()
+# Model used to summarize webpages (built lazily by the model registry)
+summarization_model_config = {"model": "openai:gpt-4.1-mini"}
+
+def __getattr__(name: str):
+    """Build the legacy module-level model and clients lazily on first access."""
+    if name == "summarization_model":
+        return get_chat_model(**summarization_model_config)
+    if name == "tavily_client":
+        return get_tavily_client()
+    if name == "async_tavily_client":
+        return get_async_tavily_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Maximum number of Tavily requests in flight at once for a single batch of queries
+max_concurrent_searches = 5
+
+# Maximum number of webpage summarizations in flight at once for a single batch of results
+max_concurrent_summarizations = 5
+
+# Seconds allowed for summarizing a single page before falling back to truncated content
+summarization_timeout = 60.0
+
+# Pages above this many tokens are summarized chunk by chunk and the partial summaries merged
+summarization_chunking_threshold = 12000
+
+# Target size in tokens of each chunk when summarizing an oversized page
+summarization_chunk_tokens = 6000
+
+# Pack several short pages into one summarization request instead of one request per page
+packed_summarization = True
+
+# Pages up to this many tokens are eligible for packing
+packed_summarization_max_page_tokens = 3000
+
+# Maximum total page tokens packed into a single request
+packed_summarization_batch_tokens = 12000
+
+# Maximum number of pages packed into a single request
+packed_summarization_max_pages = 5
+
+# Process-wide registry coalescing identical summarizations from parallel researchers
+summarization_flights = SingleFlight()
 
 # ===== SEARCH FUNCTIONS =====
 
+async def atavily_search_multiple(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_raw_content: bool = True,
+    max_concurrency: Optional[int] = None,
+    use_cache: bool = True,
+) -> List[dict]:
+    """Perform search using Tavily API for multiple queries concurrently.
+
+    All queries are issued at once, bounded by a semaphore so large batches
+    do not flood the API. Queries already in the persistent search cache are
+    served locally and never reach Tavily.
+
+    Args:
+        search_queries: List of search queries to execute
+        max_results: Maximum number of results per query
+        topic: Topic filter for search results
+        include_raw_content: Whether to include raw webpage content
+        max_concurrency: Maximum number of searches in flight at once
+            (defaults to max_concurrent_searches)
+        use_cache: Whether to read from and write to the persistent search cache
+
+    Returns:
+        List of search result dictionaries, in the same order as search_queries
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or max_concurrent_searches))
+    cache = get_search_cache() if use_cache else None
+
+    async def search_one(query: str) -> dict:
+        with span("tavily_search", "search", query=query, cache_hit=False) as attributes:
+            if cache is not None:
+                cached = await cache.aget(query, max_results, topic, include_raw_content)
+                if cached is not None:
+                    attributes["cache_hit"] = True
+                    return cached
+
+            async with semaphore:
+                start = time.perf_counter()
+                result = await get_scheduler("tavily").arun(
+                    lambda: get_async_tavily_client().search(
+                        query,
+                        max_results=max_results,
+                        include_raw_content=include_raw_content,
+                        topic=topic
+                    )
+                )
+
+            if cache is not None:
+                await cache.aput(query, max_results, topic, include_raw_content, result, latency=time.perf_counter() - start)
+            return result
+
+    # gather preserves input order regardless of completion order
+    return list(await asyncio.gather(*(search_one(query) for query in search_queries)))
+
 def tavily_search_multiple(
     search_queries: List[str], 
     max_results: int = 3, 
@@ -52,6 +196,9 @@ def tavily_search_multiple(
 ) -> List[dict]:
     """Perform search using Tavily API for multiple queries.
 
+    Synchronous wrapper around atavily_search_multiple, so queries still run
+    concurrently.
+
     Args:
         search_queries: List of search queries to execute
         max_results: Maximum number of results per query
@@ -61,97 +208,444 @@ def tavily_search_multiple(
     Returns:
         List of search result dictionaries
     """
+    return run_async(atavily_search_multiple(
+        search_queries,
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=include_raw_content,
+    ))
 
-    # Execute searches sequentially. Note: yon can use AsyncTavilyClient to parallelize this step.
-    search_docs = []
-    for query in search_queries:
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
+def format_summary(summary: Summary) -> str:
+    """Format a structured summary into the tagged text consumed by the researcher.
+
+    Args:
+        summary: Structured summary returned by the summarization model
+
+    Returns:
+        Formatted summary with key excerpts
+    """
+    return (
+        f"<summary>\n{summary.summary}\n</summary>\n\n"
+        f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+    )
+
+def truncate_webpage_content(webpage_content: str, max_chars: int = 1000) -> str:
+    """Truncate raw webpage content, used as a fallback when summarization fails.
+
+    Args:
+        webpage_content: Raw webpage content
+        max_chars: Maximum number of characters to keep
+
+    Returns:
+        Content truncated to max_chars, with an ellipsis if anything was cut
+    """
+    return webpage_content[:max_chars] + "..." if len(webpage_content) > max_chars else webpage_content
+
+def webpage_summary_key(webpage_content: str) -> str:
+    """Build the summary cache key for a page under the current prompt and model.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+
+    Returns:
+        Content-addressed cache key
+    """
+    return summary_cache_key(webpage_content, summarize_webpage_prompt, repr(sorted(summarization_model_config.items())))
+
+def packed_webpage_summary_key(webpage_content: str) -> str:
+    """Build the summary cache key for a page summarized in a packed request.
+
+    Packed summaries come from a different prompt, so they are kept apart from
+    single-page summaries.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+
+    Returns:
+        Content-addressed cache key
+    """
+    return summary_cache_key(
+        webpage_content, summarize_multiple_webpages_prompt, repr(sorted(summarization_model_config.items()))
+    )
+
+async def ainvoke_summarization_model(prompt: str, timeout: float) -> Summary:
+    """Run one structured summarization request with a timeout.
+
+    Args:
+        prompt: Fully formatted summarization prompt
+        timeout: Seconds to wait for the model
+
+    Returns:
+        Structured summary
+    """
+    structured_model = get_structured_output_model(Summary, priority="bulk", **summarization_model_config)
+    return await asyncio.wait_for(
+        structured_model.ainvoke([HumanMessage(content=prompt)]),
+        timeout=timeout,
+    )
+
+async def agenerate_webpage_summary(webpage_content: str, timeout: float) -> Summary:
+    """Summarize a page in one request, or map-reduce it if it is oversized.
+
+    Pages up to summarization_chunking_threshold tokens are summarized directly.
+    Larger pages are split into chunks of about summarization_chunk_tokens,
+    the chunks are summarized in parallel, and the partial summaries are merged
+    into a single Summary. Chunks that fail are left out of the merge.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+        timeout: Seconds to wait for each model request
+
+    Returns:
+        Structured summary of the whole page
+    """
+    if count_tokens(webpage_content) <= summarization_chunking_threshold:
+        return await ainvoke_summarization_model(
+            summarize_webpage_prompt.format(webpage_content=webpage_content, date=get_today_str()),
+            timeout,
         )
-        search_docs.append(result)
 
-    return search_docs
+    # Map: summarize each chunk independently
+    semaphore = asyncio.Semaphore(max(1, max_concurrent_summarizations))
+
+    async def summarize_chunk(chunk: str) -> Summary:
+        async with semaphore:
+            return await ainvoke_summarization_model(
+                summarize_webpage_prompt.format(webpage_content=chunk, date=get_today_str()),
+                timeout,
+            )
+
+    chunks = chunk_text(webpage_content, summarization_chunk_tokens)
+    results = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks), return_exceptions=True)
+    partial_summaries = [result for result in results if isinstance(result, Summary)]
+    if not partial_summaries:
+        raise next(result for result in results if isinstance(result, BaseException))
+
+    # Reduce: merge the partial summaries into one
+    formatted_partials = "\n\n".join(
+        f"<section_{i}>\n{format_summary(summary)}\n</section_{i}>"
+        for i, summary in enumerate(partial_summaries, 1)
+    )
+    return await ainvoke_summarization_model(
+        reduce_webpage_summaries_prompt.format(partial_summaries=formatted_partials, date=get_today_str()),
+        timeout,
+    )
 
 def summarize_webpage_content(webpage_content: str) -> str:
     """Summarize webpage content using the configured summarization model.
 
+    Synchronous wrapper around asummarize_webpage_content.
+
     Args:
         webpage_content: Raw webpage content to summarize
 
     Returns:
         Formatted summary with key excerpts
     """
-    try:
-        # Set up structured output model for summarization
-        structured_model = summarization_model.with_structured_output(Summary)
-
-        # Generate summary
-        summary = structured_model.invoke([
-            HumanMessage(content=summarize_webpage_prompt.format(
-                webpage_content=webpage_content, 
-                date=get_today_str()
-            ))
-        ])
-
-        # Format summary with clear structure
-        formatted_summary = (
-            f"<summary>\n{summary.summary}\n</summary>\n\n"
-            f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
-        )
+    return run_async(asummarize_webpage_content(webpage_content))
+
+async def asummarize_webpage_content(
+    webpage_content: str,
+    timeout: Optional[float] = None,
+    query: Optional[str] = None,
+) -> str:
+    """Summarize webpage content asynchronously with a per-request timeout.
+
+    Previously summarized content is served from the summary cache, and a
+    summarization of the same content already running elsewhere in the process
+    is awaited instead of duplicated. Oversized pages are map-reduced.
+
+    With a query, a page over relevance_filter_token_budget is first trimmed
+    to its passages most relevant to the query, and only those are summarized.
+    Cache and in-flight keys are taken from the trimmed content, so a summary
+    built for one query is only reused by queries that select the same passages.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+        timeout: Seconds to wait for each model request (defaults to summarization_timeout)
+        query: Search query the page was retrieved for, used by the relevance filter
+
+    Returns:
+        Formatted summary with key excerpts, or truncated content on failure
+    """
+    with span("summarize_webpage", "summarization", cache_hit=False) as attributes:
+        cache = get_summary_cache()
+        content = filter_page_content(webpage_content, query)
+        key = webpage_summary_key(content)
+        cached = await cache.aget(key)
+        if cached is not None:
+            attributes["cache_hit"] = True
+            return format_summary(Summary(**cached))
 
-        return formatted_summary
+        timeout = timeout or summarization_timeout
 
-    except Exception as e:
-        print(f"Failed to summarize webpage: {str(e)}")
-        return webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
+        async def generate_summary() -> str:
+            try:
+                summary = await agenerate_webpage_summary(content, timeout)
+                await cache.aput(key, summary.model_dump())
 
-def deduplicate_search_results(search_results: List[dict]) -> dict:
-    """Deduplicate search results by URL to avoid processing duplicate content.
+                return format_summary(summary)
+
+            except TimeoutError:
+                logger.warning("Timed out summarizing webpage after %ss", timeout)
+                return truncate_webpage_content(webpage_content)
+            except Exception as e:
+                logger.warning("Failed to summarize webpage: %s", e)
+                return truncate_webpage_content(webpage_content)
+
+        return await summarization_flights.run(key, generate_summary)
+
+def deduplicate_search_results(search_results: List[dict], source_index: Optional[SourceIndex] = None) -> dict:
+    """Deduplicate search results by canonical URL to avoid processing duplicate content.
+
+    Every result is registered in the run's source index, so URL variants of the
+    same page (tracking parameters, fragments, www./http variants) collapse to
+    the first URL seen for it in the run, and each result carries its stable
+    source id.
 
     Args:
         search_results: List of search result dictionaries
+        source_index: Source index to register results in (defaults to the current run's)
 
     Returns:
         Dictionary mapping URLs to unique results
     """
+    index = source_index if source_index is not None else get_source_index()
     unique_results = {}
 
     for response in search_results:
         for result in response['results']:
-            url = result['url']
-            if url not in unique_results:
-                unique_results[url] = result
+            entry = index.register(result['url'], result)
+            if entry['url'] not in unique_results:
+                unique_results[entry['url']] = {**result, 'source_id': entry['id']}
 
     return unique_results
 
-def process_search_results(unique_results: dict) -> dict:
-    """Process search results by summarizing content where available.
+async def asummarize_packed_pages(pages: Dict[str, str], timeout: float) -> Dict[str, Summary]:
+    """Summarize several short pages in a single structured request.
+
+    Args:
+        pages: Dictionary mapping URLs to raw page content
+        timeout: Seconds to wait for the model
+
+    Returns:
+        Dictionary mapping URLs to summaries; pages the model skipped are absent
+    """
+    # Pages are referenced by short ids rather than URLs, which models copy back reliably
+    urls_by_id = {f"page_{i}": url for i, url in enumerate(pages, 1)}
+    webpages = "\n\n".join(
+        f'<webpage id="{page_id}">\n{pages[url]}\n</webpage>'
+        for page_id, url in urls_by_id.items()
+    )
+
+    structured_model = get_structured_output_model(PageSummaries, priority="bulk", **summarization_model_config)
+    with span("summarize_pages", "summarization", pages=len(pages)):
+        response = await asyncio.wait_for(
+            structured_model.ainvoke([
+                HumanMessage(content=summarize_multiple_webpages_prompt.format(
+                    webpages=webpages,
+                    date=get_today_str()
+                ))
+            ]),
+            timeout=timeout,
+        )
+
+    return {
+        urls_by_id[page.page_id]: Summary(summary=page.summary, key_excerpts=page.key_excerpts)
+        for page in response.summaries
+        if page.page_id in urls_by_id
+    }
+
+async def asummarize_pages(
+    pages: Dict[str, str],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    query: Optional[str] = None,
+) -> Dict[str, str]:
+    """Summarize a batch of pages, packing short ones into shared requests.
+
+    Pages up to packed_summarization_max_page_tokens that are not already cached
+    are packed greedily into requests of at most packed_summarization_batch_tokens
+    and packed_summarization_max_pages. A packed page already being summarized
+    elsewhere in the process is awaited rather than packed again. Larger pages
+    and lone short pages go through asummarize_webpage_content. Pages of a
+    packed request that timed out fall back to truncated content; pages the
+    response left out or whose request failed are retried on their own, in
+    whatever remains of the batch's timeout.
+
+    Args:
+        pages: Dictionary mapping URLs to raw page content
+        max_concurrency: Maximum number of summarization requests in flight at once
+            (defaults to max_concurrent_summarizations)
+        timeout: Per-request timeout in seconds (defaults to summarization_timeout)
+        query: Search query the pages were retrieved for, used by the relevance filter
+
+    Returns:
+        Dictionary mapping URLs to formatted summaries
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or max_concurrent_summarizations))
+    timeout = timeout or summarization_timeout
+    cache = get_summary_cache()
+    summaries = {}
+
+    # Split pages into packing batches and pages summarized on their own
+    batches, single_pages = [], {}
+    batch, batch_tokens = {}, 0
+    for url, content in pages.items():
+        page_tokens = count_tokens(content) if packed_summarization else None
+        if page_tokens is None or page_tokens > packed_summarization_max_page_tokens:
+            single_pages[url] = content
+            continue
+
+        cached = await cache.aget(webpage_summary_key(content)) or await cache.aget(packed_webpage_summary_key(content))
+        if cached is not None:
+            summaries[url] = format_summary(Summary(**cached))
+            continue
+
+        if batch and (batch_tokens + page_tokens > packed_summarization_batch_tokens
+                      or len(batch) >= packed_summarization_max_pages):
+            batches.append(batch)
+            batch, batch_tokens = {}, 0
+        batch[url] = content
+        batch_tokens += page_tokens
+    if batch:
+        batches.append(batch)
+
+    async def summarize_single(url: str, content: str, deadline: Optional[float] = None) -> None:
+        async with semaphore:
+            remaining = timeout if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                summaries[url] = truncate_webpage_content(content)
+                return
+            summaries[url] = await asummarize_webpage_content(content, timeout=remaining, query=query)
+
+    async def summarize_batch(batch: Dict[str, str]) -> None:
+        if len(batch) == 1:
+            await summarize_single(*next(iter(batch.items())))
+            return
+
+        # One packed request covers the pages this batch leads; pages already in
+        # flight elsewhere are awaited through summarization_flights instead
+        leading, packed_request = {}, None
+        # Retries of pages left out of the packed response share the batch's timeout
+        deadline = time.monotonic() + timeout
+
+        async def request_packed() -> Dict[str, Summary]:
+            async with semaphore:
+                try:
+                    return await asummarize_packed_pages(leading, timeout)
+                except TimeoutError:
+                    logger.warning("Timed out summarizing packed webpages after %ss", timeout)
+                    raise
+                except Exception as e:
+                    logger.warning("Failed to summarize packed webpages: %r", e)
+                    return {}
+
+        async def summarize_packed(url: str, content: str) -> None:
+            key = packed_webpage_summary_key(content)
+
+            async def generate_summary() -> Optional[Summary]:
+                nonlocal packed_request
+                leading[url] = content
+                if packed_request is None:
+                    packed_request = asyncio.ensure_future(request_packed())
+                summary = (await packed_request).get(url)
+                if summary is not None:
+                    await cache.aput(key, summary.model_dump())
+                return summary
+
+            try:
+                summary = await summarization_flights.run(key, generate_summary)
+            except TimeoutError:
+                summaries[url] = truncate_webpage_content(content)
+                return
+            if summary is None:
+                # Pages missing from the packed response fall back to the single-page path
+                await summarize_single(url, content, deadline)
+            else:
+                summaries[url] = format_summary(summary)
+
+        await asyncio.gather(*(summarize_packed(url, content) for url, content in batch.items()))
+
+    await asyncio.gather(
+        *(summarize_batch(batch) for batch in batches),
+        *(summarize_single(url, content) for url, content in single_pages.items()),
+    )
+    return summaries
+
+async def aprocess_search_results(
+    unique_results: dict,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    source_index: Optional[SourceIndex] = None,
+    query: Optional[str] = None,
+) -> dict:
+    """Process search results by summarizing all pages concurrently.
+
+    Pages already processed earlier in the run (under any URL variant) reuse
+    the result memoized in the source index. Short pages may share a single
+    summarization request (see asummarize_pages).
 
     Args:
         unique_results: Dictionary of unique search results
+        max_concurrency: Maximum number of summarization requests in flight at once
+            (defaults to max_concurrent_summarizations)
+        timeout: Per-request summarization timeout in seconds
+            (defaults to summarization_timeout)
+        source_index: Source index holding the run's memoized pages
+            (defaults to the current run's)
+        query: Search query the results were retrieved for, used by the relevance filter
 
     Returns:
-        Dictionary of processed results with summaries
+        Dictionary of processed results with summaries, in the same order as unique_results
     """
-    summarized_results = {}
+    index = source_index if source_index is not None else get_source_index()
+
+    # Summarize raw content for every page not already processed in this run
+    summaries = await asummarize_pages(
+        {
+            url: result['raw_content']
+            for url, result in unique_results.items()
+            if result.get("raw_content") and index.get_processed(url) is None
+        },
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+        query=query,
+    )
 
+    processed = {}
     for url, result in unique_results.items():
-        # Use existing content if no raw content for summarization
-        if not result.get("raw_content"):
-            content = result['content']
-        else:
-            # Summarize raw content for better processing
-            content = summarize_webpage_content(result['raw_content'])
+        processed_result = index.get_processed(url)
+
+        if processed_result is None:
+            processed_result = {
+                'title': result['title'],
+                # Use existing content if no raw content for summarization
+                'content': summaries.get(url, result['content'])
+            }
+            index.set_processed(url, processed_result)
+
+        processed_result = {**processed_result, 'source_id': result.get('source_id')}
+        # Keep URLs of collapsed near-duplicates so they can still be cited
+        if result.get('aliases'):
+            processed_result['aliases'] = result['aliases']
+        processed[url] = processed_result
+
+    return processed
+
+def process_search_results(unique_results: dict) -> dict:
+    """Process search results by summarizing content where available.
+
+    Synchronous wrapper around aprocess_search_results, so pages are still
+    summarized concurrently.
 
-        summarized_results[url] = {
-            'title': result['title'],
-            'content': content
-        }
+    Args:
+        unique_results: Dictionary of unique search results
 
-    return summarized_results
+    Returns:
+        Dictionary of processed results with summaries
+    """
+    return run_async(aprocess_search_results(unique_results))
 
 def format_search_output(summarized_results: dict) -> str:
     """Format search results into a well-structured string output.
@@ -168,8 +662,12 @@ def format_search_output(summarized_results: dict) -> str:
     formatted_output = "Search results: \n\n"
 
     for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_output += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
+        # Number by run-level source id so a page keeps one citation number across searches
+        formatted_output += f"\n\n--- SOURCE {result.get('source_id') or i}: {result['title']} ---\n"
+        formatted_output += f"URL: {url}\n"
+        if result.get('aliases'):
+            formatted_output += f"ALSO PUBLISHED AT: {', '.join(result['aliases'])}\n"
+        formatted_output += "\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         formatted_output += "-" * 80 + "\n"
 
@@ -177,13 +675,14 @@ def format_search_output(summarized_results: dict) -> str:
 
 # ===== RESEARCH TOOLS =====
 
-@tool(parse_docstring=True)
-def tavily_search(
+async def atavily_search(
     query: str,
-    max_results: Annotated[int, InjectedToolArg] = 3,
-    topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
 ) -> str:
-    """Fetch results from Tavily search API with content summarization.
+    """Search with Tavily and summarize the results, asynchronously.
+
+    Async implementation of the tavily_search tool, awaited by tool.ainvoke.
 
     Args:
         query: A single search query to execute
@@ -194,22 +693,51 @@ def tavily_search(
         Formatted string of search results with summaries
     """
     # Execute search for single query
-    search_results = tavily_search_multiple(
+    search_results = await atavily_search_multiple(
         [query],  # Convert single query to list for the internal function
         max_results=max_results,
         topic=topic,
         include_raw_content=True,
     )
 
-    # Deduplicate results by URL to avoid processing duplicate content
+    # Deduplicate results by canonical URL to avoid processing duplicate content
     unique_results = deduplicate_search_results(search_results)
 
-    # Process results with summarization
-    summarized_results = process_search_results(unique_results)
+    # Strip navigation, banners and link lists; near-empty pages skip summarization
+    unique_results = clean_search_results(unique_results)
+
+    # Collapse mirrors and syndicated copies so each page is summarized once
+    unique_results = collapse_near_duplicates(unique_results)
+
+    # Process results with summarization; pages over the relevance budget are
+    # trimmed to the passages relevant to the query before they are summarized
+    summarized_results = await aprocess_search_results(unique_results, query=query)
 
     # Format output for consumption
     return format_search_output(summarized_results)
 
+@tool(parse_docstring=True)
+def tavily_search(
+    query: str,
+    max_results: Annotated[int, InjectedToolArg] = 3,
+    topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
+) -> str:
+    """Fetch results from Tavily search API with content summarization.
+
+    Args:
+        query: A single search query to execute
+        max_results: Maximum number of results to return
+        topic: Topic to filter results by ('general', 'news', 'finance')
+
+    Returns:
+        Formatted string of search results with summaries
+    """
+    return run_async(atavily_search(query, max_results=max_results, topic=topic))
+
+# Let tool.ainvoke await the search on the caller's event loop instead of
+# running the synchronous function (and a fresh event loop) in a worker thread
+tavily_search.coroutine = atavily_search
+
 @tool(parse_docstring=True)
 def think_tool(reflection: str) -> str:
     """Tool for strategic reflection on research progress and decision-making.
@@ -0,0 +1,45 @@
+import asyncio
+import itertools
+
+from deep_research_from_scratch import cache
+
+
+def fake_clock(monkeypatch):
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_search_cache_hits_keep_entries_from_lru_eviction(monkeypatch, tmp_path):
+    fake_clock(monkeypatch)
+    search_cache = cache.SearchCache(tmp_path / "search.sqlite", max_entries=2)
+
+    async def main():
+        await search_cache.aput("a", 3, "general", True, {"query": "a"})
+        await search_cache.aput("b", 3, "general", True, {"query": "b"})
+        assert await search_cache.aget("a", 3, "general", True) == {"query": "a"}
+        await search_cache.aput("c", 3, "general", True, {"query": "c"})
+
+    asyncio.run(main())
+
+    assert search_cache.get("a", 3, "general", True) == {"query": "a"}
+    assert search_cache.get("b", 3, "general", True) is None
+    assert search_cache.stats()["evictions"] == 1
+
+
+def test_summary_cache_disk_hits_keep_entries_from_lru_eviction(monkeypatch, tmp_path):
+    fake_clock(monkeypatch)
+    summary_cache = cache.SummaryCache(tmp_path / "summary.sqlite", max_memory_entries=1, max_disk_entries=2)
+
+    async def main():
+        await summary_cache.aput("a", {"summary": "a"})
+        await summary_cache.aput("b", {"summary": "b"})
+        assert await summary_cache.aget("a") == {"summary": "a"}
+        assert await summary_cache.aget("a") == {"summary": "a"}
+        await summary_cache.aput("c", {"summary": "c"})
+
+    asyncio.run(main())
+
+    stats = summary_cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+    assert summary_cache.get("b") is None
+    assert summary_cache.get("a") == {"summary": "a"}
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+from deep_research_from_scratch.content_processing import (
+    clean_search_results,
+    collapse_near_duplicates,
+    count_tokens,
+    filter_page_content,
+    near_duplicate_min_tokens,
+    strip_boilerplate,
+    tokenize,
+)
+from deep_research_from_scratch.offline import fake_page_footer, fake_page_header
+
+ARTICLE = (Path(__file__).parents[1] / "notebooks" / "files" / "coffee_shops_sf.md").read_text()
+
+
+def test_strips_chrome_lines():
+    page = "\n".join([
+        "Skip to main content",
+        "We use cookies to improve your experience.",
+        "Accept all cookies",
+        "# Brewing Guide",
+        "Grind the beans just before brewing.",
+        "Share on Twitter",
+        "Share:",
+        "© 2024 Example Media. All rights reserved.",
+    ])
+
+    assert strip_boilerplate(page) == "# Brewing Guide\nGrind the beans just before brewing."
+
+
+def test_keeps_prose_mentioning_boilerplate_phrases():
+    prose = [
+        "Share prices fell sharply after the announcement.",
+        "Sign up rates for the trial doubled in March.",
+        "Previous article authors disagreed on the method.",
+        "The privacy policy of the app was updated in 2023 to cover biometric data.",
+        "JavaScript is the most widely used language on the web.",
+        "Copyright 1998 legislation extended protection terms by twenty years, "
+        "which critics argued mostly benefited large studios rather than authors.",
+        "Readers who accept all terms of use without reading them are the norm, the study found.",
+    ]
+
+    assert strip_boilerplate("\n".join(prose)) == "\n".join(prose)
+
+
+def make_page(topics, paragraphs_per_topic=20):
+    return "\n\n".join(
+        f"Paragraph {i} on {topic}: " + " ".join(f"{topic} detail {j}." for j in range(30))
+        for topic in topics
+        for i in range(paragraphs_per_topic)
+    )
+
+
+def test_filter_page_content_keeps_relevant_passages_within_budget():
+    page = make_page(["espresso", "parking", "weather"])
+
+    filtered = filter_page_content(page, "espresso", token_budget=1000)
+
+    assert count_tokens(page) > 1000 >= count_tokens(filtered)
+    assert "espresso" in filtered
+    assert "parking" not in filtered and "weather" not in filtered
+
+
+def test_filter_page_content_leaves_small_pages_and_missing_queries_alone():
+    page = make_page(["espresso", "parking"], paragraphs_per_topic=1)
+
+    assert filter_page_content(page, "espresso", token_budget=1000) == page
+    assert filter_page_content(make_page(["espresso"]), None, token_budget=1000) == make_page(["espresso"])
+
+
+def results(pages):
+    return clean_search_results({url: {"url": url, "raw_content": content} for url, content in pages.items()})
+
+
+def test_collapses_mirrors_and_syndicated_copies_of_a_short_article():
+    collapsed = collapse_near_duplicates(results({
+        "https://original.example.com": ARTICLE,
+        "https://mirror.example.com": fake_page_header + ARTICLE + fake_page_footer,
+        "https://syndicated.example.com": (
+            "# Syndicated from Example Coffee Blog\n" + ARTICLE
+            + "\nOriginally published at example.com. Read more stories."
+        ),
+    }))
+
+    assert list(collapsed) == ["https://original.example.com"]
+    assert collapsed["https://original.example.com"]["aliases"] == [
+        "https://mirror.example.com",
+        "https://syndicated.example.com",
+    ]
+
+
+def test_keeps_distinct_pages():
+    sections = ARTICLE.split("### ")
+    pages = {
+        "https://a.example.com": "### ".join(sections[:4]),
+        "https://b.example.com": "# More coffee\n### " + "### ".join(sections[4:]),
+        "https://c.example.com": make_page(["espresso"]),
+    }
+
+    collapsed = collapse_near_duplicates(results(pages))
+
+    assert list(collapsed) == list(pages)
+    assert not any("aliases" in result for result in collapsed.values())
+
+
+def test_passes_short_pages_through():
+    short = " ".join(f"word{i}" for i in range(near_duplicate_min_tokens - 1))
+    pages = {"https://a.example.com": {"raw_content": short}, "https://b.example.com": {"raw_content": short}}
+
+    assert len(tokenize(short)) < near_duplicate_min_tokens
+    assert collapse_near_duplicates(pages) == pages
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+from tavily import AsyncTavilyClient
+
+from deep_research_from_scratch import http_transport
+
+
+class RecordingInterceptor:
+    def __init__(self):
+        self.requests = []
+
+    async def handle_async_request(self, request, send):
+        self.requests.append(request)
+        return httpx.Response(200, json={"query": "espresso", "results": []}, request=request)
+
+
+def test_tavily_requests_use_the_clients_own_api_key(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "environment-key")
+    monkeypatch.delenv("TAVILY_HTTP_PROXY", raising=False)
+    monkeypatch.delenv("TAVILY_HTTPS_PROXY", raising=False)
+    interceptor = RecordingInterceptor()
+    monkeypatch.setattr(http_transport, "interceptor", interceptor)
+    client = http_transport.attach_tavily_http_client(AsyncTavilyClient(api_key="client-key"))
+
+    asyncio.run(client.search("espresso"))
+
+    (request,) = interceptor.requests
+    assert request.headers["Authorization"] == "Bearer client-key"
+    assert str(request.url) == "https://api.tavily.com/search"
+
+
+def test_tavily_clients_without_the_expected_internals_are_left_unchanged():
+    class OtherClient:
+        pass
+
+    client = OtherClient()
+
+    assert http_transport.attach_tavily_http_client(client) is client
+    assert not hasattr(client, "_client_creator")
+
+
+def test_connection_pool_stats_survive_changed_internals(monkeypatch):
+    monkeypatch.setattr(http_transport, "_http_client", httpx.Client())
+    monkeypatch.setattr(http_transport, "_requests_by_host", {"api.tavily.com": 2})
+
+    assert http_transport.connection_pool_stats() == {
+        "api.tavily.com": {"requests": 2, "connections": 0, "idle_connections": 0}
+    }
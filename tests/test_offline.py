@@ -0,0 +1,17 @@
+import gc
+
+from deep_research_from_scratch import cache
+from deep_research_from_scratch.offline import install_offline_stand_ins
+
+
+def test_offline_caches_live_in_a_scratch_dir_until_restored(monkeypatch):
+    monkeypatch.delenv("DEEP_RESEARCH_CACHE_DIR", raising=False)
+    persistent_dir = cache.cache_dir
+
+    restore = install_offline_stand_ins()
+    scratch_dir = cache.cache_dir
+    gc.collect()
+
+    assert scratch_dir != persistent_dir and scratch_dir.exists()
+    restore()
+    assert cache.cache_dir == persistent_dir and not scratch_dir.exists()
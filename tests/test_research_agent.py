@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from deep_research_from_scratch import research_agent
+
+
+def search_result(topic, num_sources=3):
+    sources = "".join(
+        f"\n\n--- SOURCE {i}: {topic} source {i} ---\nURL: https://example.com/{topic}/{i}\n\n"
+        f"SUMMARY:\n<summary>{f'Findings about {topic} from source {i}. ' * 40}</summary>\n\n" + "-" * 80 + "\n"
+        for i in range(1, num_sources + 1)
+    )
+    return "Search results for the query:" + sources
+
+
+def search_round(topic, call_id):
+    call = AIMessage(content="", tool_calls=[{"name": "tavily_search", "args": {"query": topic}, "id": call_id}])
+    return [call, ToolMessage(content=search_result(topic), name="tavily_search", tool_call_id=call_id)]
+
+
+def history():
+    return (
+        [HumanMessage(content="Research espresso.")]
+        + search_round("beans", "call_1")
+        + search_round("grinders", "call_2")
+        + search_round("machines", "call_3")
+    )
+
+
+def test_compact_messages_leaves_short_histories_alone():
+    messages = history()
+
+    assert research_agent.compact_messages(messages) is messages
+
+
+def test_compact_messages_digests_old_results_and_keeps_tool_call_pairing(monkeypatch):
+    monkeypatch.setattr(research_agent, "compaction_threshold_tokens", 1000)
+    messages = history()
+    originals = [message.content for message in messages]
+
+    compacted = research_agent.compact_messages(messages)
+
+    assert [message.content for message in messages] == originals
+    assert [type(message) for message in compacted] == [type(message) for message in messages]
+    call_ids = [call["id"] for message in compacted if isinstance(message, AIMessage) for call in message.tool_calls]
+    result_ids = [message.tool_call_id for message in compacted if isinstance(message, ToolMessage)]
+    assert call_ids == result_ids == ["call_1", "call_2", "call_3"]
+
+    digests = [message for message in compacted[:-1] if isinstance(message, ToolMessage)]
+    assert all(message.content.startswith("[Compacted search results") for message in digests)
+    assert "URL: https://example.com/beans/1" in digests[0].content
+    # The latest round is sent verbatim even though the history is still over the threshold
+    assert compacted[-1].content == messages[-1].content
+    assert research_agent.count_tokens(str(compacted[-1].content)) > research_agent.compaction_threshold_tokens
+
+
+def test_compact_messages_digests_oldest_results_first(monkeypatch):
+    messages = history()
+    sizes = [research_agent.count_tokens(str(message.content)) for message in messages]
+    monkeypatch.setattr(research_agent, "compaction_threshold_tokens", sum(sizes) - sizes[2] // 2)
+
+    compacted = research_agent.compact_messages(messages)
+
+    assert compacted[2].content != messages[2].content
+    assert compacted[4] is messages[4]
+    assert compacted[6] is messages[6]
+
+
+def think_calls(count):
+    tool_calls = [{"name": "think_tool", "args": {"reflection": f"step {i}"}, "id": f"think_{i}"} for i in range(count)]
+    return [AIMessage(content="", tool_calls=tool_calls)]
+
+
+def run_tool_node(**state):
+    update = asyncio.run(research_agent.tool_node(state))
+    return update, research_agent.should_resume({**state, **update})
+
+
+def test_should_resume_continues_while_budgets_remain():
+    update, route = run_tool_node(researcher_messages=think_calls(1), deadline=time.time() + 60)
+
+    assert update["budget_exhausted"] == ""
+    assert route == "llm_call"
+
+
+@pytest.mark.parametrize(
+    ("budget", "state"),
+    [
+        ("tool_calls", {"tool_call_iterations": research_agent.max_tool_calls - 1}),
+        ("tokens", {"tokens_used": research_agent.max_researcher_tokens}),
+        ("deadline", {"deadline": time.time() - 1}),
+    ],
+)
+def test_should_resume_compresses_once_a_budget_runs_out(budget, state):
+    state = {"deadline": time.time() + 60, **state}
+    update, route = run_tool_node(researcher_messages=think_calls(2), **state)
+
+    assert update["budget_exhausted"] == budget
+    assert route == "compress_research"
+    assert [message.tool_call_id for message in update["researcher_messages"]] == ["think_0", "think_1"]
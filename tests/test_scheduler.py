@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from deep_research_from_scratch import scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler, "time", fake)
+    # Jitter takes the lower bound so backoff and cooldown delays are exact
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: low)
+    return fake
+
+
+def enqueue(provider_scheduler, priority):
+    waiter, _ = provider_scheduler._enqueue(priority, 0, None, asynchronous=False)
+    return waiter
+
+
+def test_token_bucket_refills_continuously(clock):
+    bucket = scheduler.TokenBucket(60)
+
+    assert bucket.wait_time(60, clock.now) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(1, clock.now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, clock.now + 0.5) == pytest.approx(0.5)
+    # Amounts above capacity wait for a full bucket instead of forever
+    assert bucket.wait_time(600, clock.now + 0.5) == pytest.approx(59.5)
+    bucket.consume(-10)
+    assert bucket.level == pytest.approx(10.5)
+
+
+def test_waiting_requests_are_admitted_by_priority(clock):
+    provider_scheduler = scheduler.ProviderScheduler("test", max_concurrent_requests=1)
+    provider_scheduler.acquire()
+    bulk = enqueue(provider_scheduler, "bulk")
+    normal = enqueue(provider_scheduler, "normal")
+    critical = enqueue(provider_scheduler, "critical")
+
+    granted = []
+    for _ in range(3):
+        provider_scheduler.release()
+        granted.append([w.priority for w in (bulk, normal, critical) if w.granted])
+
+    assert granted == [["critical"], ["normal", "critical"], ["bulk", "normal", "critical"]]
+    assert provider_scheduler.stats()["max_queue_depth"] == 3
+
+
+def test_aging_lets_long_waiting_bulk_requests_overtake_critical_ones(clock):
+    provider_scheduler = scheduler.ProviderScheduler("test", max_concurrent_requests=1)
+    provider_scheduler.acquire()
+    bulk = enqueue(provider_scheduler, "bulk")
+    clock.now += 2 * scheduler.priority_aging_seconds + 1
+    critical = enqueue(provider_scheduler, "critical")
+
+    provider_scheduler.release()
+
+    assert bulk.granted and not critical.granted
+    assert provider_scheduler.stats()["wait_seconds"]["bulk"] == pytest.approx(2 * scheduler.priority_aging_seconds + 1)
+
+
+def test_retry_after_holds_the_whole_provider_in_cooldown(clock):
+    provider_scheduler = scheduler.ProviderScheduler("test")
+
+    delay = provider_scheduler.retry_delay(ProviderError(429, {"retry-after": "5"}), attempt=0)
+    waiter, wait = provider_scheduler._enqueue("critical", 0, None, asynchronous=False)
+
+    assert delay == 0.0
+    assert wait == pytest.approx(5.0)
+    assert not waiter.granted
+    clock.now += 5
+    assert provider_scheduler._poll(waiter) is None
+    assert waiter.granted
+    assert provider_scheduler.stats()["throttled"] == 1
+
+
+def test_run_retries_transient_errors_with_exponential_backoff(clock):
+    provider_scheduler = scheduler.ProviderScheduler("test", max_concurrent_requests=1)
+    failures = [ProviderError(503), ProviderError(503)]
+
+    def request():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert provider_scheduler.run(request) == "ok"
+    assert clock.sleeps == [scheduler.backoff_base / 2, scheduler.backoff_base]
+    stats = provider_scheduler.stats()
+    assert stats["retries"] == 2 and stats["admitted"] == 3 and stats["in_flight"] == 0
+
+
+def test_run_gives_up_after_max_retries_and_on_non_retryable_errors(clock, monkeypatch):
+    monkeypatch.setattr(scheduler, "max_retries", 2)
+    provider_scheduler = scheduler.ProviderScheduler("test", max_concurrent_requests=1)
+    calls = []
+
+    def unavailable():
+        calls.append("unavailable")
+        raise ProviderError(503)
+
+    def bad_request():
+        calls.append("bad_request")
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        provider_scheduler.run(unavailable)
+    with pytest.raises(ProviderError):
+        provider_scheduler.run(bad_request)
+
+    assert calls == ["unavailable"] * 3 + ["bad_request"]
+    assert provider_scheduler.stats()["in_flight"] == 0
+
+
+def test_arun_retries_throttled_requests_after_the_cooldown(clock):
+    provider_scheduler = scheduler.ProviderScheduler("test", max_concurrent_requests=1)
+    failures = [ProviderError(429, {"retry-after": "0"})]
+
+    async def request():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert asyncio.run(provider_scheduler.arun(request, priority="bulk")) == "ok"
+    stats = provider_scheduler.stats()
+    assert stats["throttled"] == 1 and stats["admitted"] == 2 and stats["in_flight"] == 0
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from deep_research_from_scratch.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", work) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert calls == 1
+    assert flights.stats() == {"executed": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_cancelled_waiter_does_not_affect_leader_or_other_waiters():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        cancelled_waiter = asyncio.create_task(flights.run("key", work))
+        waiter = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0.02)
+        cancelled_waiter.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled_waiter
+        return await leader, await waiter
+
+    assert asyncio.run(main()) == ("result", "result")
+    assert flights.stats()["executed"] == 1
+
+
+def test_waiters_retry_when_the_leader_is_cancelled():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "result"
+    assert flights.stats()["executed"] == 2
@@ -0,0 +1,41 @@
+import asyncio
+
+from langgraph.graph import START, StateGraph
+from typing_extensions import TypedDict
+
+from deep_research_from_scratch.sources import get_source_index
+
+
+class State(TypedDict):
+    url: str
+    source_id: int
+
+
+def build_graph():
+    async def register(state: State) -> dict:
+        return {"source_id": get_source_index().register(state["url"])["id"]}
+
+    builder = StateGraph(State)
+    builder.add_node("first", register)
+    builder.add_node("second", lambda state: {"source_id": get_source_index().register("https://b.example.com")["id"]})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    return builder.compile()
+
+
+def test_runs_without_thread_id_get_separate_indexes():
+    graph = build_graph()
+
+    async def main():
+        return await asyncio.gather(
+            graph.ainvoke({"url": "https://a.example.com"}),
+            graph.ainvoke({"url": "https://c.example.com"}),
+        )
+
+    # Each run numbers its own sources: the second node's page is source 2 in both
+    assert [result["source_id"] for result in asyncio.run(main())] == [2, 2]
+
+
+def test_nodes_of_one_run_share_an_index():
+    graph = build_graph()
+    assert asyncio.run(graph.ainvoke({"url": "https://b.example.com"}))["source_id"] == 1
@@ -0,0 +1,75 @@
+import asyncio
+
+from deep_research_from_scratch import content_processing, utils
+from deep_research_from_scratch.offline import offline_mode
+
+
+def make_page(topics, paragraphs_per_topic=20):
+    return "\n\n".join(
+        f"Paragraph {i} on {topic}: " + " ".join(f"{topic} detail {j}." for j in range(30))
+        for topic in topics
+        for i in range(paragraphs_per_topic)
+    )
+
+
+def test_filtered_summaries_are_cached_per_selected_passages(monkeypatch):
+    monkeypatch.setattr(content_processing, "relevance_filter_token_budget", 1000)
+    page = make_page(["espresso", "parking"])
+
+    with offline_mode():
+        cache = utils.get_summary_cache()
+
+        async def summarize(query):
+            await utils.asummarize_webpage_content(page, query=query)
+            return cache.stats()["misses"]
+
+        misses = [asyncio.run(summarize(query)) for query in ("espresso", "espresso", "parking")]
+
+    # The same query reuses its summary; a query selecting other passages gets its own
+    assert misses == [1, 1, 2]
+
+
+def short_pages():
+    return {f"https://example.com/{i}": f"Page {i} about espresso. " * 40 for i in range(3)}
+
+
+def test_timed_out_packed_request_falls_back_to_truncation(monkeypatch):
+    single_calls = []
+
+    async def packed_timeout(pages, timeout):
+        raise TimeoutError
+
+    async def summarize_single(content, timeout=None, query=None):
+        single_calls.append(timeout)
+        return "summary"
+
+    monkeypatch.setattr(utils, "asummarize_packed_pages", packed_timeout)
+    monkeypatch.setattr(utils, "asummarize_webpage_content", summarize_single)
+    pages = short_pages()
+
+    with offline_mode():
+        summaries = asyncio.run(utils.asummarize_pages(pages, timeout=5.0))
+
+    assert single_calls == []
+    assert summaries == {url: utils.truncate_webpage_content(content) for url, content in pages.items()}
+
+
+def test_pages_left_out_of_a_packed_response_retry_within_the_batch_timeout(monkeypatch):
+    single_calls = []
+
+    async def packed_failure(pages, timeout):
+        await asyncio.sleep(0.2)
+        raise ValueError("malformed response")
+
+    async def summarize_single(content, timeout=None, query=None):
+        single_calls.append(timeout)
+        return "summary"
+
+    monkeypatch.setattr(utils, "asummarize_packed_pages", packed_failure)
+    monkeypatch.setattr(utils, "asummarize_webpage_content", summarize_single)
+
+    with offline_mode():
+        summaries = asyncio.run(utils.asummarize_pages(short_pages(), timeout=1.0))
+
+    assert set(summaries.values()) == {"summary"}
+    assert len(single_calls) == 3 and all(timeout <= 0.8 for timeout in single_calls)